@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark des moteurs de migration console.* sur un corpus synthétique
+Compare le chemin historique (re.sub règle par règle) aux nouveaux moteurs et
+écrit les mesures (Mo/s, appels/s) dans un fichier JSON comparable entre runs
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+from console_migration.catalog import DEFAULT_CATALOG
+from console_migration.corpus import SyntheticCorpus, parse_size, rule_samples
+from console_migration.driver import CONSOLE_CALL, index_rule_sets
+from console_migration.engine import sequential_sub
+from console_migration.rewriter import GenericRules
+from console_migration.rules import BLANK_LINES_PATTERN, compile_rule_sets
+
+DEFAULT_OUTPUT = '.cache/benchmarks/console-migration.json'
+BENCHMARK_FORMAT = 1
+
+
+def sequential_engine(rule_sets):
+    """Chemin historique : un re.sub par règle, dans l'ordre des scripts"""
+    def apply(content):
+        for rules in rule_sets:
+            for replacements, flags in rules.tables:
+                content = sequential_sub(replacements, content, flags)
+            if rules.collapse_blank_lines:
+                content = re.sub(BLANK_LINES_PATTERN, '\n\n', content)
+        return content
+    return apply
+
+
+def _collapse_all(content):
+    return re.sub(BLANK_LINES_PATTERN, '\n\n', content)
+
+
+def combined_engine(rule_sets):
+    """Tables combinées et préfiltrées (RuleSet.apply)"""
+    def apply(content):
+        for rules in rule_sets:
+            content = rules.apply(content)
+        return content
+    return apply
+
+
+def generic_engine(rule_sets, path):
+    """Tables combinées puis réécriture générique des appels restants"""
+    generic = GenericRules(path)
+    combined = combined_engine(rule_sets)
+    return lambda content: generic.apply(combined(content))
+
+
+ENGINES = ('sequential', 'combined', 'generic')
+
+
+def build_engines(names, rules_by_path):
+    """{cible: {moteur: fonction}}"""
+    engines = {}
+    for path, rule_sets in rules_by_path.items():
+        available = {
+            'sequential': sequential_engine(rule_sets),
+            'combined': combined_engine(rule_sets),
+            'generic': generic_engine(rule_sets, path),
+        }
+        engines[path] = {name: available[name] for name in names}
+    return engines
+
+
+def run_benchmark(corpus, engines, repeat=1):
+    """Chronomètre chaque moteur sur chaque fichier (génération exclue)"""
+    stats = {name: {'seconds': 0.0, 'changed_files': 0} for name in next(iter(engines.values()))}
+    totals = {'files': 0, 'bytes': 0, 'call_sites': 0, 'mismatches': 0}
+    for target, _path, content in corpus:
+        totals['files'] += 1
+        totals['bytes'] += len(content.encode('utf-8'))
+        totals['call_sites'] += len(CONSOLE_CALL.findall(content))
+        outputs = {}
+        for name, apply in engines[target].items():
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                output = apply(content)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            stats[name]['seconds'] += best
+            stats[name]['changed_files'] += output != content
+            outputs[name] = output
+        # Les tables combinées doivent reproduire le chemin historique, au
+        # nettoyage près : il ne touche plus que les lignes vides voisines des
+        # modifications, là où le chemin historique traitait tout le fichier
+        if 'sequential' in outputs and 'combined' in outputs:
+            totals['mismatches'] += (_collapse_all(outputs['sequential'])
+                                     != _collapse_all(outputs['combined']))
+
+    megabytes = totals['bytes'] / (1024 * 1024)
+    for entry in stats.values():
+        seconds = entry['seconds'] or 1e-9
+        entry['mb_per_s'] = round(megabytes / seconds, 3)
+        entry['calls_per_s'] = round(totals['call_sites'] / seconds, 1)
+        entry['seconds'] = round(entry['seconds'], 6)
+    return {'totals': totals, 'engines': stats}
+
+
+def compare(report, previous):
+    """Lignes de comparaison avec un rapport précédent (ratio de débit)"""
+    lines = []
+    for name, entry in report['engines'].items():
+        before = previous.get('engines', {}).get(name)
+        if before and before.get('mb_per_s'):
+            ratio = entry['mb_per_s'] / before['mb_per_s']
+            lines.append(f"   {name:<11} {before['mb_per_s']:9.2f} -> {entry['mb_per_s']:9.2f} Mo/s  (x{ratio:.2f})")
+    return lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=100,
+                        help='Nombre de fichiers générés, 1 à 10000 (défaut: 100)')
+    parser.add_argument('--size', default='10k',
+                        help='Taille par fichier, ou intervalle min:max (défaut: 10k, max 1m)')
+    parser.add_argument('--density', type=float, default=2.0,
+                        help='Appels console.* par Ko (défaut: 2)')
+    parser.add_argument('--seed', type=int, default=0, help='Graine du générateur')
+    parser.add_argument('--engines', default=','.join(ENGINES),
+                        help=f'Moteurs comparés (défaut: {",".join(ENGINES)})')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Répétitions par fichier, meilleur temps retenu (défaut: 1)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT,
+                        help=f'Fichier JSON des résultats (défaut: {DEFAULT_OUTPUT})')
+    parser.add_argument('--compare', default=None,
+                        help='Rapport JSON précédent à comparer')
+    parser.add_argument('--write-corpus', default=None, metavar='DIR',
+                        help='Écrit aussi le corpus généré sous DIR')
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.files <= 10000:
+        parser.error('--files doit être compris entre 1 et 10000')
+    low, _, high = args.size.partition(':')
+    try:
+        args.min_size = parse_size(low)
+        args.max_size = parse_size(high) if high else args.min_size
+    except ValueError as exc:
+        parser.error(str(exc))
+    if not 10 * 1024 <= args.min_size <= args.max_size <= 1024 * 1024:
+        parser.error('--size doit rester entre 10k et 1m')
+    args.engines = [name.strip() for name in args.engines.split(',') if name.strip()]
+    unknown = set(args.engines) - set(ENGINES)
+    if unknown:
+        parser.error(f'Moteurs inconnus: {", ".join(sorted(unknown))}')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rule_sets = compile_rule_sets(DEFAULT_CATALOG.rule_sets())
+    rules_by_path = index_rule_sets(rule_sets)
+    samples = rule_samples(rule_sets)
+    corpus = SyntheticCorpus(sorted(rules_by_path), files=args.files, min_size=args.min_size,
+                             max_size=args.max_size, density=args.density, seed=args.seed,
+                             samples=samples)
+    if args.write_corpus:
+        corpus.write(args.write_corpus)
+
+    print(f"⏱️  {args.files} fichiers de {args.min_size // 1024}-{args.max_size // 1024} Ko, "
+          f"{args.density:g} appels/Ko, moteurs: {', '.join(args.engines)}")
+    result = run_benchmark(corpus, build_engines(args.engines, rules_by_path), args.repeat)
+    report = {
+        'format': BENCHMARK_FORMAT,
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'parameters': {
+            'files': args.files, 'min_size': args.min_size, 'max_size': args.max_size,
+            'density': args.density, 'seed': args.seed, 'repeat': args.repeat,
+        },
+        **result,
+    }
+
+    totals = result['totals']
+    print(f"📦 {totals['bytes'] / (1024 * 1024):.2f} Mo, {totals['call_sites']} appels console.*")
+    for name, entry in result['engines'].items():
+        print(f"   {name:<11} {entry['seconds']:8.3f} s  {entry['mb_per_s']:9.2f} Mo/s  "
+              f"{entry['calls_per_s']:11.0f} appels/s")
+    if totals['mismatches']:
+        print(f"❌ {totals['mismatches']} fichiers diffèrent entre sequential et combined")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            lines = compare(report, json.load(f))
+        if lines:
+            print(f"\n📈 Comparaison avec {args.compare}")
+            print('\n'.join(lines))
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 Résultats écrits dans {args.output}")
+    return 1 if totals['mismatches'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
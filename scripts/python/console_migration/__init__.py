@@ -0,0 +1,56 @@
+"""
+Outillage partagé des scripts de migration console.* -> logger structuré
+
+Les noms exportés sont importés à leur premier accès : importer un
+sous-module (console_migration.catalog, ...) ne charge pas tout le paquet.
+"""
+
+import importlib
+
+# Nom exporté -> sous-module qui le définit
+_EXPORTS = {
+    'CombinedReplacer': 'engine',
+    'ConsoleCall': 'scanner',
+    'DEFAULT_CATALOG': 'catalog',
+    'DEFAULT_REGISTRY': 'registry',
+    'EditScript': 'edits',
+    'GenericRules': 'rewriter',
+    'IgnoreMatcher': 'walker',
+    'LiteralIndex': 'prefilter',
+    'LoopLogRules': 'loops',
+    'PatternRegistry': 'registry',
+    'RuleCatalog': 'catalog',
+    'RuleProfiler': 'profiler',
+    'RuleSet': 'rules',
+    'ScanError': 'scanner',
+    'ScopeIndex': 'scopes',
+    'aggregate_loop_logs': 'loops',
+    'analyze_pattern': 'complexity',
+    'analyze_rule_sets': 'complexity',
+    'byte_safe': 'bytemode',
+    'compile_rule_sets': 'rules',
+    'console_call_edits': 'rewriter',
+    'count_console_calls': 'verify',
+    'find_console_calls': 'scanner',
+    'group_duplicates': 'cache',
+    'rewrite_console_calls': 'rewriter',
+    'run_guarded': 'watchdog',
+    'run_verify': 'verify',
+    'sequential_sub': 'engine',
+    'walk_files': 'walker',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,204 @@
+"""
+Mode octets : règles appliquées sur le contenu brut des fichiers
+
+Les sources sont presque entièrement ASCII : décoder 40 à 100 Ko en str pour
+les réencoder aussitôt ne sert qu'aux quelques zones modifiées. En mode
+octets, les patterns d'une table sont aussi compilés en bytes UTF-8 et
+relevés sur le contenu lu tel quel (projeté par mmap au-delà de
+MMAP_THRESHOLD). Les modifications sont appliquées et écrites en octets ;
+seuls les littéraux trouvés par le préfiltre sont décodés.
+
+Un pattern n'est admis que si son sens ne change pas entre str et bytes
+UTF-8 (byte_safe) : littéraux, accentués compris (un caractère devient sa
+suite d'octets), groupes, alternances, ancres de ligne, références
+arrière ; classes ASCII seulement sous une répétition non bornée, où elles
+consomment les mêmes caractères entiers. \\s, \\w et \\d ont un sens Unicode
+en str mais ASCII en bytes : ils sont refusés. Les patterns propres au
+pilote (appels console.*, lignes vides) reconnaissent explicitement les
+blancs Unicode encodés (SPACE_BYTES), sans passe de vérification sur le
+fichier. Un fichier dont un jeu de règles n'est pas admis (réécriture
+générique, table non indépendante) ou dont les modifications se
+chevauchent repasse par str.
+
+Le contenu n'est pas validé : des octets qui ne sont pas de l'UTF-8 valide
+restent tels quels au lieu de faire échouer le fichier.
+"""
+
+import mmap
+import os
+import re
+from contextlib import contextmanager
+
+try:
+    from re import _constants, _parser
+except ImportError:  # Implémentation de Python sans sre accessible
+    _constants = _parser = None
+
+from .cache import content_digest
+from .edits import EditScript
+from .rules import SPACE_BYTES, collapse_blank_runs, follows
+
+# Au-delà (octets), le fichier est projeté en mémoire plutôt que lu
+MMAP_THRESHOLD = 1 << 20
+
+# CONSOLE_CALL sur les octets, blancs Unicode compris comme \s en str
+CONSOLE_CALL_BYTES = re.compile(rb'console\.(?:log|warn|error|info|debug)' + SPACE_BYTES + rb'*\(')
+
+# Ancres de largeur nulle au même sens en str et en bytes
+_SAFE_AT = {'AT_BEGINNING', 'AT_BEGINNING_STRING', 'AT_BEGINNING_LINE',
+            'AT_END', 'AT_END_STRING', 'AT_END_LINE'}
+# Un caractère quelconque : un octet en bytes, sûr seulement sous répétition
+_SINGLE = {'IN', 'ANY', 'NOT_LITERAL'}
+
+
+def _class_safe(name, value):
+    """Vrai si l'élément reconnaît les mêmes caractères ASCII en str et en bytes,
+    et tous les caractères non ASCII ou aucun"""
+    if name == 'ANY':
+        return True
+    if name == 'NOT_LITERAL':
+        return value < 128
+    for op, item in value:
+        op = str(op)
+        if op == 'LITERAL' and item >= 128:
+            return False
+        if op == 'RANGE' and item[1] >= 128:
+            return False
+        # CATEGORY (\s, \w, \d) : sens Unicode en str, ASCII en bytes
+        if op not in ('NEGATE', 'LITERAL', 'RANGE'):
+            return False
+    return True
+
+
+def _sequence_safe(items):
+    for op, value in items:
+        name = str(op)
+        if name == 'LITERAL' or name == 'GROUPREF':
+            continue
+        if name == 'AT':
+            if str(value) not in _SAFE_AT:
+                return False
+        elif name in ('MAX_REPEAT', 'MIN_REPEAT'):
+            low, high, item = value
+            if len(item) == 1 and str(item[0][0]) in _SINGLE:
+                # Sans borne et au plus un minimum d'un : octets et caractères
+                # se comptent pareil, la répétition consomme des caractères entiers
+                if (high != _constants.MAXREPEAT or low > 1
+                        or not _class_safe(str(item[0][0]), item[0][1])):
+                    return False
+            elif not _sequence_safe(item):
+                return False
+        elif name == 'SUBPATTERN':
+            if not _sequence_safe(value[3]):
+                return False
+        elif name == 'BRANCH':
+            if not all(_sequence_safe(branch) for branch in value[1]):
+                return False
+        elif name == 'ASSERT' or name == 'ASSERT_NOT':
+            # Regard arrière : largeur comptée en caractères
+            direction, item = value
+            if direction < 0 or not _sequence_safe(item):
+                return False
+        else:
+            # IN, ANY, NOT_LITERAL isolés, CATEGORY, AT_BOUNDARY...
+            return False
+    return True
+
+
+def byte_safe(pattern, flags=0):
+    """Vrai si pattern, encodé en UTF-8, reconnaît en bytes exactement les mêmes étendues"""
+    if _parser is None or flags & re.IGNORECASE:
+        return False
+    try:
+        parsed = _parser.parse(pattern, flags)
+    except Exception:
+        return False
+    if parsed.state.flags & re.IGNORECASE:
+        return False
+    return _sequence_safe(parsed)
+
+
+def byte_ready(rule_sets):
+    """Vrai si tous les jeux de règles peuvent être relevés sur les octets"""
+    return all(getattr(rules, 'byte_ready', False) for rules in rule_sets)
+
+
+@contextmanager
+def open_source(path, threshold=MMAP_THRESHOLD):
+    """Contenu brut de path : bytes, ou mmap en lecture au-delà de threshold"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < threshold or not size:
+            yield f.read()
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+def apply_rule_sets_bytes(data, rule_sets):
+    """Applique des jeux byte_ready à data (octets UTF-8), comme apply_rule_sets
+
+    Renvoie (octets migrés, noms des jeux appliqués, erreurs), ou None si
+    des modifications se chevauchent : le fichier doit repasser par str, qui
+    applique les jeux en conflit sur le texte réécrit et signale le conflit.
+    """
+    applied = []
+    errors = []
+    script = EditScript()
+    pending = []
+    for rules in rule_sets:
+        if pending and not (follows(pending, rules) and rules.can_apply(data)):
+            data = script.apply(data)
+            script, pending = EditScript(), []
+        if not rules.can_apply(data):
+            errors.append(f'Logger non importé ({rules.name})')
+            continue
+        edits = rules.edits(data)
+        if edits.conflicts or not script.merge(edits):
+            return None
+        pending.append(rules)
+        applied.append(rules.name)
+        if rules.collapse_blank_lines:
+            # Autour des seules modifications de ce jeu, comme apply_rule_sets
+            spans = []
+            data = collapse_blank_runs(script.apply(data, spans, set(edits)), spans)[0]
+            script, pending = EditScript(), []
+    return script.apply(data), applied, errors
+
+
+def migrate_bytes(data, rule_sets, result, digest):
+    """Remplit result pour data (octets ou mmap) ; renvoie les octets migrés
+
+    None si le fichier doit passer par str : result n'est alors pas modifié.
+    """
+    if not byte_ready(rule_sets):
+        return None
+    outcome = apply_rule_sets_bytes(data, rule_sets)
+    if outcome is None:
+        return None
+    migrated, applied, errors = outcome
+    if migrated is data:
+        changed = False
+    else:
+        # Une projection mmap ne se compare pas à des bytes : copie, seulement
+        # quand des modifications ont été appliquées
+        changed = migrated != (data if isinstance(data, bytes) else data[:])
+    result.update(
+        rule_sets=applied,
+        errors=errors,
+        changed=changed,
+        has_console=data.find(b'console.') >= 0,
+        console_before=len(CONSOLE_CALL_BYTES.findall(data)),
+        console_after=len(CONSOLE_CALL_BYTES.findall(migrated)),
+    )
+    if not errors:
+        if not changed:
+            result['clean_digest'] = digest
+        else:
+            again = apply_rule_sets_bytes(migrated, rule_sets)
+            if again is not None and again[0] == migrated:
+                result['clean_digest'] = content_digest(migrated)
+    return migrated
@@ -0,0 +1,136 @@
+"""
+Cache incrémental des fichiers déjà migrés
+
+Une entrée (empreinte du contenu, empreinte des règles) signifie que ce contenu
+est stable sous ces règles : les réappliquer ne le modifierait pas. Un fichier
+trouvé dans le cache est donc ignoré sans être décodé ni parcouru.
+
+Les mêmes empreintes regroupent les fichiers identiques d'une exécution
+(group_duplicates) : les copies de sauvegarde ou d'export ne sont traitées
+qu'une fois.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import defaultdict
+
+DEFAULT_CACHE_PATH = '.cache/console-migration.json'
+# À incrémenter quand le moteur change de comportement
+CACHE_VERSION = 1
+
+
+def content_digest(data):
+    """Empreinte d'un contenu brut (bytes)"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def group_duplicates(paths, root='.', key=None):
+    """Regroupe les chemins (relatifs à root) de contenu identique
+
+    Renvoie [[représentant, copies...]] dans l'ordre de paths. Seuls les
+    fichiers dont la taille est partagée sont lus et hachés. key(path), si
+    fourni, sépare en plus les chemins traités différemment (règles par
+    chemin). Un fichier illisible reste seul dans son groupe.
+    """
+    paths = list(dict.fromkeys(paths))
+    by_size = defaultdict(list)
+    for path in paths:
+        try:
+            size = os.stat(os.path.join(root, path)).st_size
+        except OSError:
+            size = None
+        by_size[size, key(path) if key is not None else None].append(path)
+
+    groups = {}
+    for (size, _key), candidates in by_size.items():
+        if size is None or len(candidates) == 1:
+            for path in candidates:
+                groups[path] = [path]
+            continue
+        by_digest = {}
+        for path in candidates:
+            try:
+                with open(os.path.join(root, path), 'rb') as f:
+                    digest = content_digest(f.read())
+            except OSError:
+                groups[path] = [path]
+                continue
+            if digest in by_digest:
+                by_digest[digest].append(path)
+            else:
+                by_digest[digest] = groups[path] = [path]
+    return [groups[path] for path in paths if path in groups]
+
+
+def fan_out(results, groups):
+    """Un résultat par chemin, trié : les copies d'un groupe reprennent celui
+    de leur représentant, avec 'same_as'"""
+    expanded = []
+    for result, group in zip(results, groups):
+        expanded.append(result)
+        expanded.extend(dict(result, path=other, same_as=group[0]) for other in group[1:])
+    expanded.sort(key=lambda result: result['path'])
+    return expanded
+
+
+def rules_fingerprint(rule_sets):
+    """Empreinte d'une liste ordonnée de jeux de règles"""
+    digest = hashlib.sha256(f'v{CACHE_VERSION}'.encode())
+    for rules in rule_sets:
+        digest.update(rules.fingerprint.encode())
+    return digest.hexdigest()
+
+
+class MigrationCache:
+    """Cache persistant sur disque, indexé par (contenu, règles)"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == CACHE_VERSION:
+            self.entries = data.get('entries', {})
+
+    def lookup(self, digest, fingerprint):
+        """Informations mémorisées pour ce contenu, ou None"""
+        return self.entries.get(f'{digest}:{fingerprint}')
+
+    def store(self, digest, fingerprint, info):
+        key = f'{digest}:{fingerprint}'
+        if self.entries.get(key) != info:
+            self.entries[key] = info
+            self.dirty = True
+
+    def record(self, result):
+        """Mémorise le contenu final d'un résultat de migration s'il est stable"""
+        if result.get('clean_digest'):
+            self.store(result['clean_digest'], result['fingerprint'], {
+                'has_console': result['has_console'],
+                'console': result['console_after'],
+            })
+
+    def save(self):
+        """Écrit le cache (remplacement atomique) s'il a changé"""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.console-migration.')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'entries': self.entries}, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.dirty = False
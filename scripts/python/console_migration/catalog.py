@@ -0,0 +1,249 @@
+"""
+Catalogue déclaratif des règles de migration
+
+Les règles vivent dans scripts/python/rules/<étape>.json, une étape par
+script historique, indexées par service : chemin cible, prérequis et tables
+ordonnées de {pattern, replacement}. Chaque étape déclare les étapes qui
+doivent passer avant elle ("requires") : les jeux de règles d'un fichier
+sont rendus dans cet ordre, et demander une étape entraîne ses prérequis.
+
+Au premier chargement, les fichiers JSON sont lus, analysés (complexity,
+indépendance et préfiltre de chaque table) et compilés en un artefact
+marshal ; les chargements suivants relisent l'artefact tant que ni les
+fichiers JSON ni le code d'analyse n'ont changé. Les RuleSet ne sont
+matérialisés qu'à la demande, pour les seuls fichiers traités : une
+exécution sur un fichier ne construit ni ne compile les règles des autres.
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import re
+import sys
+
+from .fileio import atomic_write
+from .rules import RuleSet
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'rules')
+# Racine du dépôt (scripts/python/../..), quel que soit le répertoire courant
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(RULES_DIR)))
+# Ordre historique : premier pass, migration complète, puis restants
+STAGES = ('console_to_logger', 'remaining_services', 'remaining_console')
+DEFAULT_CATALOG_PATH = '.cache/console-migration-rules.bin'
+CATALOG_FORMAT = 4
+# Modules dont la logique produit l'analyse stockée dans l'artefact
+# (indépendance, alternance combinée, préfiltre, constructions risquées)
+ANALYSIS_MODULES = ('complexity.py', 'engine.py', 'prefilter.py', 'rules.py')
+
+_analysis_digest = None
+
+_FLAGS = {'MULTILINE': re.MULTILINE, 'IGNORECASE': re.IGNORECASE, 'DOTALL': re.DOTALL}
+
+
+def _flags(names):
+    flags = 0
+    for name in names:
+        if name not in _FLAGS:
+            raise ValueError(f'Flag inconnu: {name}')
+        flags |= int(_FLAGS[name])
+    return flags
+
+
+def analysis_digest():
+    """Empreinte du code des modules d'analyse : l'artefact est reconstruit
+    dès que l'un d'eux change, sans incrémenter CATALOG_FORMAT à la main"""
+    global _analysis_digest
+    if _analysis_digest is None:
+        digest = hashlib.blake2b(digest_size=16)
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for name in ANALYSIS_MODULES:
+            with open(os.path.join(directory, name), 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read())
+        _analysis_digest = digest.hexdigest()
+    return _analysis_digest
+
+
+def read_stage(path, stage):
+    """(étapes requises, groupes (étape, service, chemin, tables, blank_lines, logger))
+    d'un fichier JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+    groups = []
+    for name, service in document['services'].items():
+        tables = [
+            ([(rule['pattern'], rule['replacement']) for rule in table['rules']],
+             _flags(table.get('flags', ())))
+            for table in service['tables']
+        ]
+        groups.append((stage, name, service['path'], tables,
+                       bool(service.get('collapse_blank_lines')),
+                       bool(service.get('requires_logger'))))
+    return list(document.get('requires', ())), groups
+
+
+def stage_order(dependencies, wanted=None):
+    """Étapes wanted (toutes par défaut) et leurs prérequis, chacune après ses prérequis
+
+    dependencies : {étape: [étapes requises]}, dans l'ordre de déclaration,
+    conservé entre étapes indépendantes. Lève ValueError pour une étape
+    inconnue ou des dépendances cycliques.
+    """
+    order = []
+    visiting = []
+
+    def visit(stage):
+        if stage in order:
+            return
+        if stage not in dependencies:
+            raise ValueError(f'Étape inconnue: {stage}')
+        if stage in visiting:
+            cycle = visiting[visiting.index(stage):] + [stage]
+            raise ValueError(f"Dépendances cycliques: {' -> '.join(cycle)}")
+        visiting.append(stage)
+        for required in dependencies[stage]:
+            visit(required)
+        visiting.pop()
+        order.append(stage)
+
+    for stage in wanted if wanted is not None else ():
+        if stage not in dependencies:
+            raise ValueError(f'Étape inconnue: {stage}')
+    selected = set(dependencies if wanted is None else wanted)
+    for stage in dependencies:
+        if stage in selected:
+            visit(stage)
+    return order
+
+
+class RuleCatalog:
+    """Règles déclaratives, compilées en artefact et matérialisées à la demande"""
+
+    def __init__(self, rules_dir=RULES_DIR, stages=STAGES, artifact=DEFAULT_CATALOG_PATH,
+                 read_only=False):
+        self.rules_dir = rules_dir
+        self.stages = tuple(stages)
+        self.artifact = artifact
+        # Artefact relu s'il est à jour, jamais créé ni réécrit
+        self.read_only = read_only
+        self._dependencies = None
+        self._groups = None
+        self._findings = None
+        self._rule_sets = {}
+
+    def _sources(self):
+        """Signature des fichiers JSON : (étape, taille, mtime), interpréteur et
+        code des modules d'analyse"""
+        signature = [(CATALOG_FORMAT, *sys.version_info[:2]), analysis_digest()]
+        for stage in self.stages:
+            stat = os.stat(os.path.join(self.rules_dir, f'{stage}.json'))
+            signature.append((stage, stat.st_size, stat.st_mtime_ns))
+        return signature
+
+    def _build(self):
+        # Import différé : l'analyse n'est utile qu'à la compilation du catalogue
+        from .complexity import analyze_pattern
+
+        dependencies = {}
+        groups_by_stage = {}
+        for stage in self.stages:
+            dependencies[stage], groups_by_stage[stage] = read_stage(
+                os.path.join(self.rules_dir, f'{stage}.json'), stage)
+        groups = [group for stage in stage_order(dependencies) for group in groups_by_stage[stage]]
+        findings = []
+        for stage, name, path, tables, blank, logger in groups:
+            for index, (replacements, flags) in enumerate(tables):
+                for rule, (pattern, _replacement) in enumerate(replacements):
+                    for finding in analyze_pattern(pattern, flags, f'{stage}:{name}#{index}[{rule}]'):
+                        findings.append((stage, name, str(finding)))
+        # Indépendance, alternance combinée et préfiltre calculés une fois pour toutes
+        compiled = []
+        for stage, name, path, tables, blank, logger in groups:
+            rules = RuleSet(name, path, tables, collapse_blank_lines=blank, requires_logger=logger)
+            compiled.append((stage, name, path, tables, blank, logger, rules.summaries()))
+        return dependencies, compiled, findings
+
+    def load(self):
+        """Charge l'artefact s'il est à jour, sinon le reconstruit depuis le JSON
+        (et le réécrit, sauf en lecture seule)"""
+        if self._groups is not None:
+            return self
+        sources = self._sources()
+        if self.artifact:
+            try:
+                with open(self.artifact, 'rb') as f:
+                    signature, dependencies, groups, findings = marshal.load(f)
+                if signature == sources:
+                    self._dependencies, self._groups, self._findings = dependencies, groups, findings
+                    return self
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+        self._dependencies, self._groups, self._findings = self._build()
+        if self.artifact and not self.read_only:
+            try:
+                directory = os.path.dirname(self.artifact)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                atomic_write(self.artifact, marshal.dumps(
+                    (sources, self._dependencies, self._groups, self._findings)))
+            except OSError:
+                pass  # Répertoire en lecture seule : le catalogue reste utilisable
+        return self
+
+    def order(self, stages=None):
+        """Étapes demandées et leurs prérequis, dans l'ordre d'exécution"""
+        self.load()
+        return stage_order(self._dependencies, stages)
+
+    def targets(self):
+        """Fichiers cibles couverts par au moins un groupe de règles"""
+        self.load()
+        return sorted({group[2] for group in self._groups})
+
+    def _materialize(self, group):
+        stage, name, path, tables, blank, logger, summaries = group
+        rules = self._rule_sets.get((stage, name))
+        if rules is None:
+            rules = self._rule_sets[(stage, name)] = RuleSet(
+                name, path, tables, collapse_blank_lines=blank, requires_logger=logger,
+                summaries=summaries)
+        return rules
+
+    def rule_set(self, stage, name):
+        """RuleSet d'un service dans une étape"""
+        self.load()
+        for group in self._groups:
+            if group[0] == stage and group[1] == name:
+                return self._materialize(group)
+        raise KeyError(f'{stage}:{name}')
+
+    def stage(self, stage):
+        """RuleSet d'une étape, dans l'ordre du fichier JSON"""
+        self.load()
+        return [self._materialize(group) for group in self._groups if group[0] == stage]
+
+    def rule_sets(self, paths=None, stages=None):
+        """RuleSet dans l'ordre des étapes, limités aux fichiers paths si donnés
+
+        stages restreint aux étapes nommées et à leurs prérequis.
+        """
+        self.load()
+        wanted = None if paths is None else set(paths)
+        selected = None if stages is None else set(self.order(stages))
+        return [self._materialize(group) for group in self._groups
+                if (wanted is None or group[2] in wanted)
+                and (selected is None or group[0] in selected)]
+
+    def findings(self, paths=None):
+        """Constructions risquées relevées à la compilation, pour ces fichiers"""
+        self.load()
+        wanted = None if paths is None else set(paths)
+        targets = {(group[0], group[1]): group[2] for group in self._groups}
+        return [text for stage, name, text in self._findings
+                if wanted is None or targets[(stage, name)] in wanted]
+
+
+# Catalogue partagé par les scripts : artefact sous la racine du dépôt, relu
+# s'il est à jour mais jamais écrit (importer un script ne crée aucun fichier)
+DEFAULT_CATALOG = RuleCatalog(artifact=os.path.join(REPO_ROOT, DEFAULT_CATALOG_PATH),
+                              read_only=True)
@@ -0,0 +1,211 @@
+"""
+Analyse statique de la complexité des patterns
+
+Détecte, sur l'arbre produit par le parseur de re, les constructions qui
+peuvent faire exploser le retour arrière de sre :
+
+- quantificateurs imbriqués ambigus : une répétition non bornée dans une
+  autre, qui peut consommer ce qui relancerait l'itération englobante
+  (« (\\w+\\s?)+ », « (a*)* »), ou qui peut reconnaître ce qui la suit dans
+  le corps répété (« (.*,)*x », « (.*a){12}b ») — un grand nombre fixe
+  d'itérations compte comme une répétition non bornée ;
+- alternance ambiguë sous un quantificateur : deux branches qui peuvent
+  commencer par le même caractère (« (\\w+:|\\d+=)* »).
+
+L'analyse travaille sur les premiers caractères possibles de chaque élément,
+évalués sur un alphabet témoin : elle est prudente (quelques faux positifs
+possibles) mais ne rate pas les formes classiques.
+"""
+
+import string
+
+try:
+    from re import _constants, _parser
+except ImportError:  # Implémentation de Python sans sre accessible
+    _constants = _parser = None
+
+# Alphabet témoin : ASCII imprimable, retour à la ligne et quelques accents
+PROBE = frozenset(string.printable + 'éèàçùÉÀ«»…✅❌🔍')
+NESTED = 'quantificateurs imbriqués'
+# À partir de ce nombre fixe d'itérations, un corps répété est traité comme
+# une répétition non bornée
+REPEAT_COUNT_LIMIT = 4
+AMBIGUOUS = 'alternance ambiguë'
+
+_CATEGORIES = {
+    'CATEGORY_DIGIT': str.isdigit,
+    'CATEGORY_NOT_DIGIT': lambda char: not char.isdigit(),
+    'CATEGORY_SPACE': str.isspace,
+    'CATEGORY_NOT_SPACE': lambda char: not char.isspace(),
+    'CATEGORY_WORD': lambda char: char.isalnum() or char == '_',
+    'CATEGORY_NOT_WORD': lambda char: not (char.isalnum() or char == '_'),
+    'CATEGORY_LINEBREAK': lambda char: char == '\n',
+    'CATEGORY_NOT_LINEBREAK': lambda char: char != '\n',
+}
+
+
+class Finding:
+    """Construction risquée trouvée dans un pattern"""
+
+    __slots__ = ('label', 'kind', 'detail', 'pattern')
+
+    def __init__(self, label, kind, detail, pattern):
+        self.label = label
+        self.kind = kind
+        self.detail = detail
+        self.pattern = pattern
+
+    def __repr__(self):
+        return f'Finding({self.label!r}, {self.kind!r})'
+
+    def __str__(self):
+        preview = self.pattern if len(self.pattern) <= 70 else self.pattern[:67] + '...'
+        return f'{self.label}: {self.kind} ({self.detail}) dans {preview}'
+
+
+def _in_class(items, char):
+    negate = False
+    matched = False
+    for op, value in items:
+        name = str(op)
+        if name == 'NEGATE':
+            negate = True
+        elif name == 'LITERAL':
+            matched |= char == chr(value)
+        elif name == 'RANGE':
+            matched |= value[0] <= ord(char) <= value[1]
+        elif name == 'CATEGORY':
+            matched |= _CATEGORIES.get(str(value), lambda _: True)(char)
+    return matched != negate
+
+
+class _Analyzer:
+
+    def __init__(self, flags):
+        self.dotall = bool(flags & _constants.SRE_FLAG_DOTALL)
+        self.findings = []
+        self._classes = {}
+
+    def first(self, items):
+        """(premiers caractères possibles, séquence pouvant être vide)"""
+        chars = set()
+        for op, value in items:
+            item_chars, nullable = self.first_item(str(op), value)
+            chars |= item_chars
+            if not nullable:
+                return chars, False
+        return chars, True
+
+    def first_item(self, name, value):
+        if name == 'LITERAL':
+            return {chr(value)}, False
+        if name == 'NOT_LITERAL':
+            return set(PROBE - {chr(value)}), False
+        if name == 'ANY':
+            return set(PROBE if self.dotall else PROBE - {'\n'}), False
+        if name == 'IN':
+            # Même classe évaluée une seule fois par pattern
+            key = repr(value)
+            chars = self._classes.get(key)
+            if chars is None:
+                chars = self._classes[key] = {char for char in PROBE if _in_class(value, char)}
+            return chars, False
+        if name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            low, _high, item = value
+            chars, nullable = self.first(item)
+            return chars, nullable or low == 0
+        if name == 'SUBPATTERN':
+            return self.first(value[3])
+        if name == 'ATOMIC_GROUP':
+            return self.first(value)
+        if name == 'BRANCH':
+            chars = set()
+            nullable = False
+            for branch in value[1]:
+                branch_chars, branch_nullable = self.first(branch)
+                chars |= branch_chars
+                nullable |= branch_nullable
+            return chars, nullable
+        if name == 'GROUPREF':
+            return set(PROBE), True
+        # AT, ASSERT, ASSERT_NOT : largeur nulle
+        return set(), True
+
+    def check(self, items, loop, depth):
+        """Parcourt une séquence ; loop = caractères qui peuvent suivre la
+        séquence (relance d'une itération englobante ou suite du pattern)"""
+        items = list(items)
+        # follow[i] : caractères qui peuvent suivre immédiatement l'élément i
+        follow = [None] * len(items)
+        after = set(loop)
+        for index in range(len(items) - 1, -1, -1):
+            follow[index] = after
+            op, value = items[index]
+            chars, nullable = self.first_item(str(op), value)
+            after = chars | after if nullable else set(chars)
+        for index, (op, value) in enumerate(items):
+            self.check_item(str(op), value, follow[index], depth)
+
+    def check_item(self, name, value, loop, depth):
+        if name in ('MAX_REPEAT', 'MIN_REPEAT'):
+            _low, high, item = value
+            if high <= 1:
+                self.check(item, loop, depth)
+                return
+            body_chars, _ = self.first(item)
+            overlap = body_chars & loop
+            if depth and high == _constants.MAXREPEAT and overlap:
+                # Dans un corps répété, une répétition non bornée qui peut
+                # reconnaître ce qui la suit : chaque découpage est essayé
+                self.findings.append((NESTED, f"répétition relancée par {_show(overlap)}"))
+            # Un grand nombre fixe d'itérations coûte autant qu'une répétition
+            # non bornée : (.*a){12} essaie tous les découpages en 12 morceaux
+            risky = high == _constants.MAXREPEAT or high >= REPEAT_COUNT_LIMIT
+            self.check(item, loop | body_chars, depth + 1 if risky else depth)
+        elif name == 'SUBPATTERN':
+            self.check(value[3], loop, depth)
+        elif name == 'BRANCH':
+            branches = [self.first(branch)[0] for branch in value[1]]
+            if depth:
+                for index, chars in enumerate(branches):
+                    for other in branches[index + 1:]:
+                        if chars & other:
+                            self.findings.append((AMBIGUOUS, f"branches débutant par {_show(chars & other)}"))
+                            break
+            for branch in value[1]:
+                self.check(branch, loop, depth)
+        # ATOMIC_GROUP, POSSESSIVE_REPEAT : pas de retour arrière à l'intérieur
+
+
+def _show(chars):
+    sample = ''.join(sorted(chars)[:6])
+    return repr(sample + ('…' if len(chars) > 6 else ''))
+
+
+def analyze_pattern(pattern, flags=0, label=''):
+    """Constructions risquées du pattern ([Finding], vide si aucune)"""
+    if _parser is None:
+        return []
+    try:
+        parsed = _parser.parse(pattern, flags)
+    except Exception:
+        return []
+    analyzer = _Analyzer(flags | parsed.state.flags)
+    analyzer.check(parsed, set(), 0)
+    seen = set()
+    findings = []
+    for kind, detail in analyzer.findings:
+        if (kind, detail) not in seen:
+            seen.add((kind, detail))
+            findings.append(Finding(label, kind, detail, pattern))
+    return findings
+
+
+def analyze_rule_sets(rule_sets):
+    """Analyse toutes les règles des jeux donnés ; [Finding]"""
+    findings = []
+    for rules in rule_sets:
+        for index, (replacements, flags) in enumerate(getattr(rules, 'tables', ())):
+            for rule, (pattern, _replacement) in enumerate(replacements):
+                findings.extend(analyze_pattern(pattern, flags, f'{rules.name}#{index}[{rule}]'))
+    return findings
@@ -0,0 +1,251 @@
+"""
+Corpus TypeScript synthétique pour les benchmarks
+
+Génère des fichiers de service à la forme de ContextCacheService.ts ou
+SQLEngineService.ts : une classe, des méthodes asynchrones, du code métier
+sans intérêt et, à la densité demandée, des appels console.* — pour moitié
+des exemples qui correspondent aux règles écrites à la main, pour moitié des
+appels quelconques (templates, [Tag], erreurs) que seul le moteur générique
+traite. La génération est déterministe pour une graine donnée.
+"""
+
+import os
+import random
+import re
+
+try:
+    from re import _parser
+except ImportError:  # Implémentation de Python sans sre accessible
+    _parser = None
+
+# Caractères essayés pour une classe niée ou « . »
+_SAMPLE_CHARS = 'a0 _x-.:;,()[]{}\'"`/\\\n'
+
+# Blocs de code métier équilibrés, tirés au hasard entre les appels
+_FILLER = [
+    "    const cacheKey = this.buildKey(entityType, entityId);\n"
+    "    const entry = this.cache.get(cacheKey);",
+    "    if (!entry || entry.expiresAt < Date.now()) {\n"
+    "      return null;\n"
+    "    }",
+    "    const result = await this.storage.query(sql, params);\n"
+    "    const rows = result.rows.filter((row) => row.status !== 'archived');",
+    "    this.stats.hits += rows.length;",
+    "    for (const row of rows) {\n"
+    "      this.index.set(row.id, { ...row, updatedAt: new Date() });\n"
+    "    }",
+    "    // Invalide les entrées dépendantes avant de renvoyer le résultat\n"
+    "    const dependencies = this.graph.dependentsOf(entityId) ?? [];\n"
+    "    await Promise.all(dependencies.map((id) => this.invalidate(id)));",
+    "    const query = `SELECT * FROM ${table} WHERE id = $1 AND status != 'deleted'`;",
+]
+_GENERIC_CALLS = [
+    "    console.log('[{cls}] Traitement terminé:', rows.length);",
+    "    console.log(`[{cls}] Requête ${{queryId}} exécutée en ${{Date.now() - startTime}}ms`);",
+    "    console.error('[{cls}] Erreur lors du traitement:', error);",
+    "    console.warn(`⚠️ Cache expiré pour ${{cacheKey}}`);",
+    "    console.log('✅ Entrées rechargées:', entries.length, 'éléments');",
+    "    console.debug('[{cls}] Détails', JSON.stringify(params));",
+]
+
+
+def _sample(items, groups):
+    """Texte reconnu par une séquence analysée (répétitions au minimum, première
+    branche), ou None si un élément n'a pas d'exemple évident
+
+    groups reçoit le texte de chaque groupe numéroté, pour les références
+    arrière qui suivent.
+    """
+    pieces = []
+    for op, value in items:
+        name = str(op)
+        if name == 'LITERAL':
+            pieces.append(chr(value))
+        elif name in ('AT', 'ASSERT', 'ASSERT_NOT'):
+            continue  # Largeur nulle : vérifié ensuite par l'appelant
+        elif name in ('IN', 'ANY', 'NOT_LITERAL'):
+            char = _class_sample(name, value)
+            if char is None:
+                return None
+            pieces.append(char)
+        elif name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            low, _high, item = value
+            piece = _sample(item, groups)
+            if piece is None:
+                return None
+            pieces.append(piece * low)
+        elif name == 'SUBPATTERN':
+            group, _add, _del, item = value
+            piece = _sample(item, groups)
+            if piece is None:
+                return None
+            if group is not None:
+                groups[group] = piece
+            pieces.append(piece)
+        elif name == 'ATOMIC_GROUP':
+            piece = _sample(value, groups)
+            if piece is None:
+                return None
+            pieces.append(piece)
+        elif name == 'BRANCH':
+            piece = _sample(value[1][0], groups)
+            if piece is None:
+                return None
+            pieces.append(piece)
+        elif name == 'GROUPREF' and value in groups:
+            pieces.append(groups[value])
+        else:
+            # GROUPREF_EXISTS...
+            return None
+    return ''.join(pieces)
+
+
+def _class_sample(name, value):
+    """Un caractère reconnu par « . », [^c] ou une classe"""
+    if name == 'ANY':
+        return 'a'
+    if name == 'NOT_LITERAL':
+        return 'a' if value != ord('a') else 'b'
+    pattern = re.compile(_class_source(value))
+    return next((char for char in _SAMPLE_CHARS if pattern.match(char)), None)
+
+
+def _class_source(items):
+    parts = []
+    negate = ''
+    for op, item in items:
+        op = str(op)
+        if op == 'NEGATE':
+            negate = '^'
+        elif op == 'LITERAL':
+            parts.append(re.escape(chr(item)))
+        elif op == 'RANGE':
+            parts.append(f'{re.escape(chr(item[0]))}-{re.escape(chr(item[1]))}')
+        elif op == 'CATEGORY':
+            parts.append(_CATEGORIES.get(str(item), r'\w'))
+    return f'[{negate}{"".join(parts)}]'
+
+
+_CATEGORIES = {
+    'CATEGORY_DIGIT': r'\d', 'CATEGORY_NOT_DIGIT': r'\D',
+    'CATEGORY_SPACE': r'\s', 'CATEGORY_NOT_SPACE': r'\S',
+    'CATEGORY_WORD': r'\w', 'CATEGORY_NOT_WORD': r'\W',
+}
+
+
+def pattern_sample(pattern, flags=0):
+    """Un texte (le plus court possible) que pattern devrait reconnaître, ou None
+
+    Les assertions sont ignorées : l'appelant vérifie le texte avec pattern.
+    """
+    if _parser is None:
+        return None
+    try:
+        return _sample(_parser.parse(pattern, flags), {})
+    except Exception:
+        return None
+
+
+def sample_match(pattern, flags=0):
+    """Un texte que pattern reconnaît, ou None si l'échantillon échoue"""
+    text = pattern_sample(pattern, flags)
+    return text if text is not None and re.search(pattern, text, flags) else None
+
+
+def rule_samples(rule_sets):
+    """Exemples d'appels reconnus par les règles, par fichier cible"""
+    samples = {}
+    for rules in rule_sets:
+        for replacements, flags in rules.tables:
+            for pattern, _replacement in replacements:
+                text = sample_match(pattern, flags)
+                # Une ligne de code plausible, sans ancre de début de ligne
+                if text and text.lstrip().startswith('console.'):
+                    samples.setdefault(rules.path, []).append(text.strip())
+    return samples
+
+
+def parse_size(text):
+    """'10k', '1m', '2048' -> octets"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([kKmM]?)[bBoO]?\s*', str(text))
+    if match is None:
+        raise ValueError(f'Taille invalide: {text}')
+    factor = {'': 1, 'k': 1024, 'm': 1024 * 1024}[match.group(2).lower()]
+    return int(float(match.group(1)) * factor)
+
+
+class SyntheticCorpus:
+    """Fichiers de service synthétiques, générés un par un (mémoire bornée)
+
+    density : appels console.* par Ko de source.
+    """
+
+    def __init__(self, targets, files=100, min_size=10 * 1024, max_size=None,
+                 density=2.0, seed=0, samples=None):
+        self.targets = list(targets)
+        self.files = files
+        self.min_size = min_size
+        self.max_size = max_size or min_size
+        self.density = density
+        self.seed = seed
+        self.samples = samples or {}
+
+    def __len__(self):
+        return self.files
+
+    def __iter__(self):
+        for index in range(self.files):
+            yield self.generate(index)
+
+    def generate(self, index):
+        """(cible, chemin synthétique, contenu) du fichier index"""
+        rng = random.Random(f'{self.seed}:{index}')
+        target = self.targets[index % len(self.targets)]
+        size = rng.randint(self.min_size, self.max_size)
+        base = os.path.splitext(os.path.basename(target))[0]
+        cls = base[0].upper() + base[1:]
+        path = f'{os.path.dirname(target)}/synthetic/{base}{index:05d}.ts'
+
+        samples = self.samples.get(target, [])
+        lines = [
+            "import { logger } from '../utils/logger';",
+            "import type { IStorage } from '../storage-poc';",
+            '',
+            f'export class {cls} {{',
+            '  private cache = new Map<string, CacheEntry>();',
+            '',
+        ]
+        length = sum(len(line) + 1 for line in lines)
+        calls = 0
+        method = 0
+        while length < size:
+            method += 1
+            block = [f'  async operation{method}(entityType: string, entityId: string): Promise<unknown> {{',
+                     '    const startTime = Date.now();']
+            for _ in range(rng.randint(6, 20)):
+                # Un appel dès que le fichier passe sous la densité visée
+                if calls < self.density * (length + 80) / 1024:
+                    calls += 1
+                    if samples and rng.random() < 0.5:
+                        block.append('    ' + rng.choice(samples))
+                    else:
+                        block.append(rng.choice(_GENERIC_CALLS).format(cls=cls))
+                else:
+                    block.append(rng.choice(_FILLER))
+                length += len(block[-1]) + 1
+            block += ['    return { entityType, entityId };', '  }', '']
+            lines.extend(block)
+            length += sum(len(line) + 1 for line in block[:2] + block[-3:])
+        lines.append('}')
+        return target, path, '\n'.join(lines) + '\n'
+
+    def write(self, root):
+        """Écrit le corpus sous root ; renvoie les chemins relatifs créés"""
+        paths = []
+        for _target, path, content in self:
+            full = os.path.join(root, path)
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, 'w', encoding='utf-8') as f:
+                f.write(content)
+            paths.append(path)
+        return paths
@@ -0,0 +1,266 @@
+"""
+Démon de migration sur socket Unix
+
+Le démon charge une fois le catalogue compilé et le registre de patterns,
+puis sert les requêtes des éditeurs et des hooks pre-commit sans qu'aucun ne
+repaie le démarrage de Python ni la compilation des règles. Le protocole est
+du JSON délimité par des retours à la ligne : une requête par ligne, une
+réponse par ligne, sur la même connexion.
+
+Requête : {"id": ..., "op": "migrate" | "verify" | "ping" | "shutdown",
+           "path": "server/services/x.ts", "content": "...", "dry_run": false}
+
+- path seul : le fichier est lu (et réécrit, sauf dry_run) sous la racine ;
+- path et content : le tampon est traité avec les règles de path, rien
+  n'est écrit, la réponse porte le contenu migré.
+
+Réponse : {"id": ..., "ok": true, "result": {...}, "content": "..."}
+ou {"id": ..., "ok": false, "error": "..."}.
+
+Chaque connexion est servie par un thread ; le travail part sur un pool de
+processus dont chaque ouvrier garde ses règles compilées en mémoire. Les
+requêtes d'une connexion sont soumises au pool dès leur lecture et les
+réponses renvoyées dans l'ordre des requêtes : un lot envoyé sur une seule
+connexion (pre-commit) occupe tous les ouvriers.
+"""
+
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+
+from .catalog import DEFAULT_CATALOG_PATH, RuleCatalog
+from .driver import CONSOLE_CALL, apply_rule_sets, migrate_file
+from .rules import compile_rule_sets
+
+DEFAULT_SOCKET_PATH = '.cache/console-migration.sock'
+OPERATIONS = ('migrate', 'verify', 'ping', 'shutdown')
+
+# État des ouvriers du pool (fixé par _init_worker)
+_worker_state = None
+
+
+class RequestError(ValueError):
+    """Requête invalide : opération inconnue, chemin hors de la racine..."""
+
+
+def _init_worker(root, artifact, generic, stages=None, loop_logs=False):
+    global _worker_state
+    _worker_state = (root, RuleCatalog(artifact=artifact), generic, stages, loop_logs, {})
+
+
+def _rules_for(path):
+    _root, catalog, generic, stages, loop_logs, rules_by_path = _worker_state
+    rule_sets = rules_by_path.get(path)
+    if rule_sets is None:
+        rule_sets = catalog.rule_sets([path], stages=stages)
+        if generic:
+            from .rewriter import GenericRules
+
+            rule_sets = rule_sets + [GenericRules(path)]
+        if loop_logs:
+            from .loops import LoopLogRules
+
+            rule_sets = rule_sets + [LoopLogRules(path)]
+        rule_sets = rules_by_path[path] = compile_rule_sets(rule_sets)
+    return rule_sets
+
+
+def _migrate(path, content, dry_run):
+    root = _worker_state[0]
+    if content is None:
+        return migrate_file(root, path, _rules_for(path), dry_run), None
+    conflicts = []
+    migrated, applied, errors = apply_rule_sets(content, _rules_for(path), conflicts=conflicts)
+    result = {
+        'path': path,
+        'rule_sets': applied,
+        'errors': errors,
+        'conflicts': conflicts,
+        'changed': migrated != content,
+        'cached': False,
+        'has_console': 'console.' in content,
+        'console_before': len(CONSOLE_CALL.findall(content)),
+        'console_after': len(CONSOLE_CALL.findall(migrated)),
+    }
+    return result, migrated
+
+
+def _verify(path, content):
+    from .verify import verify_data, verify_file
+
+    if content is None:
+        return verify_file(_worker_state[0], path), None
+    return verify_data(path, content.encode('utf-8')), None
+
+
+def check_path(path):
+    """Chemin relatif normalisé, sans sortie de la racine"""
+    if not isinstance(path, str) or not path:
+        raise RequestError('path manquant')
+    normalized = os.path.normpath(path).replace(os.sep, '/')
+    if os.path.isabs(normalized) or normalized == '..' or normalized.startswith('../'):
+        raise RequestError(f'Chemin hors de la racine: {path}')
+    return normalized
+
+
+def _ready(response):
+    return lambda: response
+
+
+def _response(request_id, future):
+    """Réponse d'une requête soumise au pool, une fois son travail terminé"""
+    try:
+        result, migrated = future.result()
+    except Exception as exc:
+        # ScanError, règle en échec, ouvrier mort... : seule cette requête échoue
+        return {'id': request_id, 'ok': False, 'error': f'{type(exc).__name__}: {exc}'}
+    response = {'id': request_id, 'ok': True, 'result': result}
+    if migrated is not None:
+        response['content'] = migrated
+    return response
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        # Réponses attendues dans l'ordre des requêtes, écrites par un second
+        # thread pendant que celui-ci continue de lire et de soumettre
+        pending = queue.Queue()
+        writer = threading.Thread(target=self._write, args=(pending,), daemon=True)
+        writer.start()
+        try:
+            for line in self.rfile:
+                if line.strip():
+                    pending.put(self.server.submit(line))
+        finally:
+            pending.put(None)
+            writer.join()
+
+    def _write(self, pending):
+        while True:
+            wait = pending.get()
+            if wait is None:
+                return
+            response = wait()
+            try:
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                self.wfile.flush()
+            except OSError:
+                return  # Client parti : les requêtes restantes finissent sans réponse
+
+
+class MigrationDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serveur de migration : un thread par connexion, un pool de processus"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, root='.', jobs=None, generic=False,
+                 artifact=None, stages=None, loop_logs=False):
+        # Import différé : un client du démon n'a pas besoin du pool
+        from concurrent.futures import ProcessPoolExecutor
+
+        artifact = artifact or os.path.join(root, DEFAULT_CATALOG_PATH)
+        catalog = RuleCatalog(artifact=artifact)
+        # Compilées une fois dans le parent, transmises déjà compilées aux ouvriers
+        compile_rule_sets(catalog.rule_sets(stages=stages))
+        self.root = root
+        self.requests = 0
+        # Compteur partagé par les threads des connexions
+        self._requests_lock = threading.Lock()
+        self.executor = ProcessPoolExecutor(
+            max_workers=jobs or os.cpu_count() or 1,
+            initializer=_init_worker,
+            initargs=(root, artifact, generic, stages, loop_logs),
+        )
+        # Ouvriers démarrés (fork) avant les threads du serveur
+        self.executor.submit(int).result()
+        _remove_stale_socket(socket_path)
+        directory = os.path.dirname(socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Socket réservé à l'utilisateur : les requêtes peuvent réécrire des fichiers
+        umask = os.umask(0o077)
+        try:
+            super().__init__(socket_path, _Handler)
+        finally:
+            os.umask(umask)
+        self.socket_path = socket_path
+
+    def respond(self, line):
+        """Réponse (dict) à une ligne de requête"""
+        return self.submit(line)()
+
+    def submit(self, line):
+        """Soumet une ligne de requête au pool sans attendre son résultat
+
+        Renvoie une fonction sans argument qui attend et renvoie la réponse (dict).
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError('Requête JSON attendue (objet)')
+            request_id = request.get('id')
+            op = request.get('op', 'migrate')
+            if op not in OPERATIONS:
+                raise RequestError(f'Opération inconnue: {op}')
+            if op == 'ping':
+                return _ready({'id': request_id, 'ok': True, 'result': {'requests': self.requests}})
+            if op == 'shutdown':
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                return _ready({'id': request_id, 'ok': True, 'result': {}})
+            path = check_path(request.get('path'))
+            content = request.get('content')
+            if content is not None and not isinstance(content, str):
+                raise RequestError('content doit être une chaîne')
+            with self._requests_lock:
+                self.requests += 1
+            if op == 'verify':
+                future = self.executor.submit(_verify, path, content)
+            else:
+                future = self.executor.submit(_migrate, path, content, bool(request.get('dry_run')))
+        except (RequestError, json.JSONDecodeError) as exc:
+            return _ready({'id': request_id, 'ok': False, 'error': str(exc)})
+        except Exception as exc:
+            # Requête impossible à soumettre (pool arrêté...) : la connexion continue
+            return _ready({'id': request_id, 'ok': False, 'error': f'{type(exc).__name__}: {exc}'})
+        return lambda: _response(request_id, future)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(socket_path):
+    """Supprime un socket laissé par un démon arrêté ; refuse s'il répond encore"""
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise OSError(f'Un démon écoute déjà sur {socket_path}')
+
+
+def call(socket_path, requests, timeout=30.0):
+    """Envoie des requêtes (dicts) au démon ; renvoie les réponses dans l'ordre"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        payload = b''.join(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n'
+                           for request in requests)
+        client.sendall(payload)
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile('rb') as stream:
+            return [json.loads(line) for line in stream if line.strip()]
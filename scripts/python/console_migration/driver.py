@@ -0,0 +1,284 @@
+"""
+Pilote de migration à l'échelle du dépôt
+
+Découvre les fichiers sources contenant encore des console.*, les répartit sur
+un pool de processus et fusionne les résultats dans l'ordre des chemins.
+"""
+
+import os
+import re
+from contextlib import contextmanager
+
+from .cache import content_digest, fan_out, group_duplicates, rules_fingerprint
+from .edits import EditScript, describe_conflict
+from .fileio import atomic_write
+from .profiler import RuleProfiler
+from .rules import collapse_blank_runs, compile_rule_sets, follows
+from .scanner import ScanError
+from .walker import (
+    EXCLUDED_DIRS, PROJECT_EXCLUDES, IgnoreMatcher, filter_paths, parse_ignore, walk_files,
+)
+
+SOURCE_DIRS = ('server', 'client', 'shared')
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js')
+
+CONSOLE_CALL = re.compile(r'console\.(?:log|warn|error|info|debug)\s*\(')
+
+# État partagé par les processus du pool (fixé par _init_worker)
+_worker_state = None
+
+
+def discover_files(root='.', dirs=SOURCE_DIRS, extensions=SOURCE_EXTENSIONS, git=False):
+    """Liste triée des fichiers candidats, chemins relatifs à root
+
+    Parcours de l'arbre, .gitignore et exclusions du projet appliqués (voir
+    walker) ; avec git, liste lue par git ls-files, sans parcours.
+    """
+    if git:
+        from .gitfiles import tracked_files
+
+        return select_sources(tracked_files(root, dirs), root, dirs, extensions)
+    return walk_files(root, dirs, extensions)
+
+
+def select_sources(paths, root='.', dirs=SOURCE_DIRS, extensions=SOURCE_EXTENSIONS):
+    """Filtre paths (relatifs à root) comme discover_files : mêmes répertoires,
+    extensions et exclusions du projet ; les fichiers absents sont écartés"""
+    candidates = []
+    for path in paths:
+        path = path.replace(os.sep, '/')
+        if path.split('/', 1)[0] in dirs and path.endswith(extensions):
+            candidates.append(path)
+    # git applique déjà le .gitignore : seules les exclusions du projet restent
+    selected = filter_paths(candidates, IgnoreMatcher(parse_ignore(PROJECT_EXCLUDES)))
+    return sorted({path for path in selected if os.path.isfile(os.path.join(root, path))})
+
+
+def index_rule_sets(rule_sets):
+    """Regroupe les jeux de règles par fichier cible, dans l'ordre donné"""
+    by_path = {}
+    for rules in rule_sets:
+        by_path.setdefault(rules.path, []).append(rules)
+    return by_path
+
+
+def migrate_file(root, path, rule_sets, dry_run=False, cache=None, profiler=None,
+                 byte_mode=False, duplicates=()):
+    """Migre un fichier et renvoie son résultat
+
+    Avec un cache, un contenu déjà stable sous ces règles est ignoré sans être
+    décodé ; le résultat est alors reconstitué depuis le cache. Avec un
+    profiler, chaque règle est exécutée et chronométrée séparément. En mode
+    octets, les règles qui le permettent travaillent sur le contenu brut,
+    sans décodage (voir bytemode). duplicates : chemins de même contenu et de
+    mêmes règles, réécrits avec path.
+    """
+    full = os.path.join(root, path)
+    byte_mode = byte_mode and profiler is None
+    if byte_mode:
+        # Import différé : le mode octets n'est chargé que sur demande
+        from .bytemode import migrate_bytes, open_source
+    else:
+        open_source = _read_source
+    with open_source(full) as data:
+        digest = content_digest(data)
+        fingerprint = rules_fingerprint(rule_sets)
+        result = {
+            'path': path,
+            'fingerprint': fingerprint,
+            'rule_sets': [],
+            'errors': [],
+            'conflicts': [],
+            'changed': False,
+            'cached': False,
+            'clean_digest': None,
+        }
+
+        hit = cache.lookup(digest, fingerprint) if cache is not None else None
+        if hit is not None:
+            result.update(
+                cached=True,
+                has_console=hit['has_console'],
+                console_before=hit['console'],
+                console_after=hit['console'],
+                clean_digest=digest,
+            )
+            return result
+
+        migrated = migrate_bytes(data, rule_sets, result, digest) if byte_mode else None
+        if migrated is None:
+            try:
+                content = str(data, 'utf-8')
+            except UnicodeDecodeError as exc:
+                # Fichier laissé tel quel, sans interrompre la migration des autres
+                result.update(errors=[f'Décodage impossible: {exc}'], has_console=True,
+                              console_before=0, console_after=0)
+                return result
+            migrated = _migrate_text(content, rule_sets, result, digest, profiler)
+
+        if result['changed'] and not dry_run:
+            atomic_write(full, migrated)
+            for other in duplicates:
+                atomic_write(os.path.join(root, other), migrated)
+
+    return result
+
+
+@contextmanager
+def _read_source(path):
+    with open(path, 'rb') as f:
+        yield f.read()
+
+
+def _migrate_text(content, rule_sets, result, digest, profiler=None):
+    """Remplit result pour content (str) ; renvoie le contenu migré encodé"""
+    result['has_console'] = 'console.' in content
+    result['console_before'] = len(CONSOLE_CALL.findall(content))
+
+    migrated, result['rule_sets'], result['errors'] = apply_rule_sets(
+        content, rule_sets, profiler, result['conflicts'])
+    result['changed'] = migrated != content
+    result['console_after'] = len(CONSOLE_CALL.findall(migrated))
+
+    data = migrated.encode('utf-8')
+    if not result['errors']:
+        if not result['changed']:
+            result['clean_digest'] = digest
+        elif _is_stable(migrated, rule_sets):
+            result['clean_digest'] = content_digest(data)
+    return data
+
+
+def apply_rule_sets(content, rule_sets, profiler=None, conflicts=None):
+    """Applique les jeux de règles à content (str), dans l'ordre
+
+    Les modifications des jeux successifs sont relevées sur le même texte et
+    fusionnées (EditScript), puis appliquées en un seul join. Le texte n'est
+    reconstruit avant la fin que lorsqu'un jeu doit voir le résultat des
+    précédents : nettoyage des lignes vides, jeu qui reconnaît leur sortie,
+    prérequis qui en dépend, conflit entre modifications. Les conflits sont
+    ajoutés à conflicts (liste) si elle est fournie. Avec un profiler,
+    chaque jeu est appliqué et chronométré séparément.
+
+    Renvoie (contenu migré, noms des jeux appliqués, erreurs).
+    """
+    applied = []
+    errors = []
+    script = EditScript()
+    pending = []
+    for rules in rule_sets:
+        if pending and not (follows(pending, rules) and rules.can_apply(content)):
+            content = script.apply(content)
+            script, pending = EditScript(), []
+        if not rules.can_apply(content):
+            errors.append(f'Logger non importé ({rules.name})')
+            continue
+        try:
+            if profiler is not None:
+                content = profiler.apply(rules, content)
+                applied.append(rules.name)
+                continue
+            edits = rules.edits(content)
+            if edits is not None and not edits.conflicts and script.merge(edits):
+                pending.append(rules)
+            else:
+                if conflicts is not None:
+                    for conflict in (edits.conflicts if edits is not None else []) + script.conflicts:
+                        conflicts.append(describe_conflict(content, conflict))
+                # Application séquentielle, sur le texte déjà modifié
+                content = rules.apply(script.apply(content))
+                script, pending = EditScript(), []
+        except ScanError as exc:
+            # Source non analysable (délimiteur non fermé) : fichier laissé tel quel
+            errors.append(f'Analyse impossible ({rules.name}): {exc}')
+            continue
+        applied.append(rules.name)
+        if rules.collapse_blank_lines and pending:
+            # Autour des seules modifications de ce jeu, comme s'il s'exécutait seul
+            spans = []
+            content = collapse_blank_runs(script.apply(content, spans, set(edits)), spans)[0]
+            script, pending = EditScript(), []
+    return script.apply(content), applied, errors
+
+
+def _is_stable(content, rule_sets):
+    """Vrai si réappliquer les règles ne modifierait plus le contenu"""
+    migrated = content
+    for rules in rule_sets:
+        migrated = rules.apply(migrated)
+    return migrated == content
+
+
+def _init_worker(root, rules_by_path, dry_run, cache, profile=False, byte_mode=False):
+    # Sous fork, les patterns compilés par le parent sont hérités (DEFAULT_REGISTRY)
+    global _worker_state
+    _worker_state = (root, rules_by_path, dry_run, cache, profile, byte_mode)
+
+
+def _migrate_path(group):
+    root, rules_by_path, dry_run, cache, profile, byte_mode = _worker_state
+    path = group[0]
+    profiler = RuleProfiler() if profile else None
+    result = migrate_file(root, path, rules_by_path.get(path, []), dry_run, cache, profiler,
+                          byte_mode, group[1:])
+    if profiler is not None:
+        # Renvoyé au parent avec le résultat, puis fusionné
+        result['profile'] = profiler.stats
+    return result
+
+
+def run_migration(paths, rule_sets, root='.', jobs=None, dry_run=False, cache=None,
+                  profiler=None, byte_mode=False):
+    """Migre paths sur jobs processus ; résultats triés par chemin
+
+    Seuls les fichiers modifiés ou contenant des console.* figurent dans les
+    résultats. Le cache éventuel est mis à jour (mais pas sauvegardé) dans le processus parent,
+    de même que le profiler éventuel, qui reçoit les profils de tous les fichiers.
+    Les fichiers identiques sous les mêmes règles ne sont migrés qu'une fois :
+    chaque copie reçoit le résultat de son représentant, avec 'same_as'.
+    """
+    compile_rule_sets(rule_sets)
+    rules_by_path = index_rule_sets(rule_sets)
+    paths = sorted(paths)
+    jobs = jobs or os.cpu_count() or 1
+    groups = group_duplicates(
+        paths, root, key=lambda path: rules_fingerprint(rules_by_path.get(path, [])))
+
+    if jobs == 1 or len(groups) <= 1:
+        _init_worker(root, rules_by_path, dry_run, cache, profile=profiler is not None,
+                     byte_mode=byte_mode)
+        results = [_migrate_path(group) for group in groups]
+    else:
+        # Import différé : un seul fichier ne paie pas le chargement du pool
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(groups) // (jobs * 4))
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(root, rules_by_path, dry_run, cache, profiler is not None, byte_mode),
+        ) as executor:
+            # map conserve l'ordre d'entrée : la fusion est déterministe
+            results = list(executor.map(_migrate_path, groups, chunksize=chunksize))
+
+    if profiler is not None:
+        for result in results:
+            profiler.merge(result.pop('profile'))
+    results = fan_out(results, groups)
+    if cache is not None:
+        for result in results:
+            cache.record(result)
+
+    return [result for result in results if result['changed'] or result['has_console']]
+
+
+def summarize(results):
+    """Totaux agrégés d'une exécution"""
+    return {
+        'files': len(results),
+        'files_changed': sum(1 for r in results if r['changed']),
+        'files_cached': sum(1 for r in results if r['cached']),
+        'console_before': sum(r['console_before'] for r in results),
+        'console_after': sum(r['console_after'] for r in results),
+        'errors': sum(len(r['errors']) for r in results),
+    }
@@ -0,0 +1,138 @@
+"""
+Scripts d'édition : les règles décrivent leurs modifications sans réécrire le texte
+
+Chaque passe (une table de règles, le réécrivain générique) relève ses
+correspondances sur le texte d'origine sous forme de modifications
+(début, fin, remplacement, origine). Les modifications de toutes les passes
+sont fusionnées dans un EditScript, qui garde des intervalles disjoints triés
+par position : trouver ceux qu'une nouvelle modification touche est une
+recherche dichotomique. Le texte n'est reconstruit qu'une fois, par un seul
+join, au lieu d'une copie complète par passe.
+
+Fusionner une passe plus tardive reproduit l'application séquentielle :
+
+- une modification hors de tout intervalle existant est ajoutée ;
+- une modification entièrement contenue dans une modification antérieure
+  est écartée : ce texte n'existe plus quand la passe s'exécute ;
+- toute autre rencontre (chevauchement partiel, intervalles qui se touchent,
+  modification qui en englobe une autre) est un conflit : le résultat
+  dépendrait de l'ordre des passes. La passe est refusée et le conflit
+  consigné, l'appelant retombe alors sur l'application séquentielle.
+
+Cette équivalence suppose que la passe tardive ne reconnaît pas le texte
+produit par les passes antérieures (voir RuleSet.reads).
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+class EditScript:
+    """Modifications disjointes d'un même texte d'origine, triées par position"""
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+        # (début, fin, remplacement, origine), dans l'ordre du texte
+        self._edits = []
+        # Modifications écartées car contenues dans une modification antérieure
+        self.shadowed = 0
+        # (origine, origine antérieure, début, fin) des passes refusées
+        self.conflicts = []
+
+    def __len__(self):
+        return len(self._edits)
+
+    def __iter__(self):
+        return iter(self._edits)
+
+    def overlapping(self, start, end):
+        """Modifications qui touchent l'intervalle fermé [start, end]"""
+        # Intervalles disjoints triés : les fins sont triées comme les débuts
+        first = bisect_left(self._ends, start)
+        last = bisect_right(self._starts, end)
+        return self._edits[first:last]
+
+    def merge(self, edits):
+        """Ajoute une passe : [(début, fin, remplacement, origine)] disjointes, triées
+
+        Renvoie False, sans rien modifier, si la passe entre en conflit avec
+        une modification déjà présente.
+        """
+        accepted = []
+        shadowed = 0
+        for edit in edits:
+            start, end = edit[0], edit[1]
+            touched = self.overlapping(start, end)
+            if not touched:
+                accepted.append(edit)
+            elif len(touched) == 1 and touched[0][0] <= start and end <= touched[0][1]:
+                shadowed += 1
+            else:
+                self.conflicts.append((edit[3], touched[0][3], start, end))
+                return False
+        if accepted:
+            self._edits = sorted(self._edits + accepted, key=_position) if self._edits else accepted
+            self._starts = [edit[0] for edit in self._edits]
+            self._ends = [edit[1] for edit in self._edits]
+        self.shadowed += shadowed
+        return True
+
+    def apply(self, text, spans=None, tracked=None):
+        """Texte modifié, construit en un seul join (str, ou bytes pour des octets)
+
+        spans (liste) reçoit, dans l'ordre, l'étendue (début, fin) de chaque
+        remplacement dans le texte produit ; seulement celle des
+        modifications de tracked si fourni.
+        """
+        if not self._edits:
+            return text
+        pieces = []
+        pos = 0
+        # Longueur du texte produit jusqu'à pos
+        shift = 0
+        for edit in self._edits:
+            start, end, replacement, _origin = edit
+            pieces.append(text[pos:start])
+            pieces.append(replacement)
+            if spans is not None and (tracked is None or edit in tracked):
+                spans.append((start + shift, start + shift + len(replacement)))
+            shift += len(replacement) - (end - start)
+            pos = end
+        pieces.append(text[pos:])
+        # text[:0] : chaîne ou octets vides, selon ce qui a été relevé
+        return text[:0].join(pieces)
+
+
+def _position(edit):
+    return edit[0]
+
+
+def changed_span(before, after):
+    """Étendue (début, fin) dans after de la zone qui diffère de before
+
+    Préfixe et suffixe communs sont cherchés par dichotomie : les
+    comparaisons de tranches restent en C.
+    """
+    limit = min(len(before), len(after))
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if before[:middle] == after[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    prefix = low
+    low, high = 0, limit - prefix
+    while low < high:
+        middle = (low + high + 1) // 2
+        if before[len(before) - middle:] == after[len(after) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return prefix, len(after) - low
+
+
+def describe_conflict(text, conflict):
+    """Conflit lisible : origines et numéro de ligne dans text"""
+    origin, other, start, _end = conflict
+    return f'{origin} chevauche {other} (ligne {text.count(chr(10), 0, start) + 1})'
@@ -0,0 +1,344 @@
+"""
+Moteur de remplacement en une seule passe
+
+Une table de remplacements [(pattern, remplacement), ...] est compilée en une
+seule alternance à groupes nommés : chaque fichier n'est parcouru qu'une fois
+et chaque occurrence est dirigée vers le remplacement de la règle qui l'a
+reconnue. Le résultat est identique octet pour octet à la boucle séquentielle
+`for old, new in replacements: content = re.sub(old, new, content)` tant que
+la table est indépendante : aucune règle ne reconnaît le texte produit par une
+règle précédente, et les correspondances de deux règles ne se chevauchent pas
+(sinon l'alternance choisit la plus à gauche, la boucle la première règle).
+L'indépendance n'est retenue que lorsqu'elle se prouve sur les textes exacts
+de règles littérales ; dans le doute, le moteur garde la boucle séquentielle.
+"""
+
+import re
+
+from .prefilter import LiteralIndex, literal_text
+from .registry import DEFAULT_REGISTRY
+
+# Références arrière qui deviendraient fausses une fois les groupes renumérotés
+_BACKREF = re.compile(r'\\[1-9]|\(\?P=')
+# Références de groupe dans un gabarit de remplacement
+_TEMPLATE_GROUP_REF = re.compile(r'\\(?:[0-9]|g<)')
+
+_EMPTY_MATCH = re.match('', '')
+
+# Au-delà, relancer l'alternance complète coûte moins que les règles une à une
+SUBSET_RULE_LIMIT = 4
+
+# Un jeton littéral de pattern : caractère échappé non alphanumérique ou
+# caractère ordinaire (hors métacaractères)
+_LITERAL_TOKEN = re.compile(r'\\[^A-Za-z0-9]|[^\\.^$*+?{}()\[\]|]')
+_QUANTIFIERS = '*+?{'
+
+
+def literal_prefix_tokens(pattern):
+    """Découpe le préfixe littéral obligatoire d'un pattern en jetons"""
+    tokens = []
+    pos = 0
+    while True:
+        match = _LITERAL_TOKEN.match(pattern, pos)
+        if match is None:
+            break
+        end = match.end()
+        if end < len(pattern) and pattern[end] in _QUANTIFIERS:
+            break
+        tokens.append(match.group())
+        pos = end
+    return tokens
+
+
+def has_top_level_alternation(pattern):
+    """Vrai si pattern contient un « | » hors de tout groupe et de toute classe"""
+    depth = 0
+    in_class = False
+    pos = 0
+    while pos < len(pattern):
+        char = pattern[pos]
+        if char == '\\':
+            pos += 2
+            continue
+        if in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+            # « ] » juste après « [ » ou « [^ » est un caractère de la classe
+            if pattern.startswith('^', pos + 1):
+                pos += 1
+            if pattern.startswith(']', pos + 1):
+                pos += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+        pos += 1
+    return False
+
+
+def _token_char(token):
+    return token[-1] if token.startswith('\\') else token
+
+
+def factored_alternation(branches):
+    """Alternance factorisée en trie sur les préfixes littéraux
+
+    branches : [(nom_du_groupe, source_du_pattern)] par ordre de priorité.
+    Deux branches commençant par des caractères différents ne peuvent pas
+    correspondre à la même position : on peut donc les regrouper par premier
+    caractère sans changer le résultat, tant qu'aucune branche sans préfixe
+    littéral ne s'intercale entre elles. re conserve ainsi sa recherche rapide
+    sur le préfixe commun (souvent `console\\.`). Une branche avec un « | » de
+    premier niveau n'est pas factorisée : son préfixe ne vaut que pour sa
+    première alternative.
+    """
+    return _factor([
+        (name, [] if has_top_level_alternation(source) else literal_prefix_tokens(source), source)
+        for name, source in branches
+    ])
+
+
+def _factor(branches):
+    parts = []
+    segment = []
+
+    def flush():
+        groups = {}
+        for name, tokens, source in segment:
+            groups.setdefault(_token_char(tokens[0]), []).append(
+                (name, tokens[1:], source[len(tokens[0]):])
+            )
+        for char, members in groups.items():
+            if len(members) == 1:
+                name, tokens, source = members[0]
+                parts.append(re.escape(char) + f'(?P<{name}>{source})')
+            else:
+                parts.append(re.escape(char) + '(?:' + _factor(members) + ')')
+        segment.clear()
+
+    for name, tokens, source in branches:
+        if tokens:
+            segment.append((name, tokens, source))
+        else:
+            flush()
+            parts.append(f'(?P<{name}>{source})')
+    flush()
+    return '|'.join(parts)
+
+
+def _overlap(first, second):
+    """Vrai si une occurrence de second peut recouvrir (même en partie) une
+    occurrence de first : inclusion de l'un dans l'autre, ou fin de l'un
+    identique au début de l'autre"""
+    if second in first or first in second:
+        return True
+    for size in range(1, min(len(first), len(second))):
+        if first.endswith(second[:size]) or second.endswith(first[:size]):
+            return True
+    return False
+
+
+def sequential_sub(replacements, content, flags=0):
+    """Applique la table règle par règle (comportement historique des scripts)"""
+    for old, new in replacements:
+        content = re.sub(old, new, content, flags=flags)
+    return content
+
+
+class CombinedReplacer:
+    """Table de remplacements compilée en une seule expression régulière"""
+
+    def __init__(self, replacements, flags=0, registry=None, name='table', summary=None):
+        self.replacements = [(old, new) for old, new in replacements]
+        self.flags = flags
+        self.name = name
+        self.registry = registry if registry is not None else DEFAULT_REGISTRY
+        self.patterns = [
+            self.registry.compile(old, flags, label=f'{name}[{i}]')
+            for i, (old, _) in enumerate(self.replacements)
+        ]
+
+        if summary is not None:
+            # Analyse déjà faite à la compilation du catalogue : rien à recalculer
+            self._literals = summary['literals']
+            self.combined = self._compile_combined(summary['combined'])
+            self.independent = summary['independent'] and self.combined is not None
+            prefilter = summary['prefilter']
+        else:
+            # Gabarits sans référence de groupe : expansion calculée une seule fois
+            self._literals = []
+            for _, new in self.replacements:
+                if _TEMPLATE_GROUP_REF.search(new):
+                    self._literals.append(None)
+                else:
+                    self._literals.append(_EMPTY_MATCH.expand(new))
+            self.combined = self._compile_combined(self._combined_source())
+            self.independent = self.combined is not None and self._check_independent()
+            prefilter = None
+        # Le préfiltre suppose l'indépendance : sinon une règle pourrait
+        # reconnaître un texte absent du fichier mais produit par une autre
+        self.prefilter = None
+        self._byte_ready = None
+        self._bytes = None
+        if self.independent:
+            self.prefilter = LiteralIndex(self.patterns_source, flags, registry=self.registry,
+                                          summary=prefilter)
+
+    def summary(self):
+        """Résultat de l'analyse de la table, sérialisable (marshal)"""
+        return {
+            'literals': self._literals,
+            'combined': self.combined.pattern if self.combined is not None else None,
+            'independent': self.independent,
+            'prefilter': self.prefilter.summary() if self.prefilter is not None else None,
+        }
+
+    def _combined_source(self):
+        """Construit l'alternance (?P<_r0>...)|(?P<_r1>...)|..., factorisée en trie"""
+        if not self.replacements:
+            return None
+        if any(_BACKREF.search(old) for old, _ in self.replacements):
+            return None
+        branches = [(f'_r{i}', old) for i, (old, _) in enumerate(self.replacements)]
+        if self.flags & (re.IGNORECASE | re.VERBOSE):
+            # Les préfixes littéraux ne sont plus fiables : pas de factorisation
+            return '|'.join(f'(?P<{name}>{old})' for name, old in branches)
+        return factored_alternation(branches)
+
+    def _compile_combined(self, source):
+        if source is None:
+            return None
+        try:
+            combined = self.registry.compile(source, self.flags, label=f'{self.name}[*]')
+        except re.error:
+            # Noms de groupes en double entre deux règles, par exemple
+            return None
+        # Le groupe englobant se ferme en dernier : lastindex désigne la règle
+        self._rule_for_group = {
+            combined.groupindex[f'_r{i}']: i for i in range(len(self.replacements))
+        }
+        return combined
+
+    def _check_independent(self):
+        """Vrai seulement si l'alternance donne à coup sûr le résultat de la
+        boucle séquentielle
+
+        La preuve n'est faite que pour des règles littérales (texte exact) à
+        remplacement littéral non vide : aucune correspondance d'une règle ne
+        recouvre celle d'une autre, ni le texte produit par une règle
+        antérieure. Un remplacement vide rapproche deux textes qu'une règle
+        suivante pourrait reconnaître ensemble. Toute autre table garde la
+        boucle séquentielle.
+        """
+        texts = [literal_text(old, self.flags) for old, _ in self.replacements]
+        if any(not text for text in texts) or any(literal is None for literal in self._literals):
+            return False
+        for i, text in enumerate(texts):
+            output = self._literals[i]
+            for j, other in enumerate(texts):
+                if i != j and _overlap(text, other):
+                    return False
+                if j > i and (not output or _overlap(output, other)):
+                    return False
+        return True
+
+    def _dispatch(self, match):
+        rule = self._rule_for_group[match.lastindex]
+        literal = self._literals[rule]
+        if literal is not None:
+            return literal
+        # La règle seule reconnaît exactement la même étendue à cette position
+        own = self.patterns[rule].match(match.string, match.start())
+        return own.expand(self.replacements[rule][1])
+
+    @property
+    def patterns_source(self):
+        return [old for old, _ in self.replacements]
+
+    def sub(self, content):
+        """Applique toute la table en un seul parcours de content"""
+        if not self.independent:
+            return sequential_sub(self.replacements, content, self.flags)
+
+        candidates = self.prefilter.candidate_rules(content)
+        if not candidates:
+            return content
+        if len(candidates) <= SUBSET_RULE_LIMIT and len(candidates) < len(self.replacements):
+            # Règles indépendantes : seules les candidates peuvent correspondre
+            for rule in candidates:
+                content = self.patterns[rule].sub(self.replacements[rule][1], content)
+            return content
+        return self.combined.sub(self._dispatch, content)
+
+    def outputs(self):
+        """Textes que la table peut produire (gabarit brut s'il référence des groupes)"""
+        return [literal if literal is not None else self.replacements[i][1]
+                for i, literal in enumerate(self._literals)]
+
+    @property
+    def byte_ready(self):
+        """Vrai si la table peut être relevée sur les octets UTF-8 (voir bytemode)"""
+        if self._byte_ready is None:
+            # Import différé : l'analyse n'est utile qu'en mode octets
+            from .bytemode import byte_safe
+
+            self._byte_ready = self.independent and all(
+                byte_safe(old, self.flags) for old, _ in self.replacements)
+        return self._byte_ready
+
+    def _byte_programs(self):
+        """(patterns, alternance, littéraux, gabarits) compilés en bytes UTF-8"""
+        if self._bytes is None:
+            compile = self.registry.compile
+            self._bytes = (
+                [compile(old.encode('utf-8'), self.flags, label=f'{self.name}[{i}]:bytes')
+                 for i, (old, _) in enumerate(self.replacements)],
+                compile(self.combined.pattern.encode('utf-8'), self.flags,
+                        label=f'{self.name}[*]:bytes'),
+                [literal.encode('utf-8') if literal is not None else None
+                 for literal in self._literals],
+                [new.encode('utf-8') for _, new in self.replacements],
+            )
+        return self._bytes
+
+    def collect(self, content, script):
+        """Fusionne dans script (EditScript) les modifications de la table sur content
+
+        Même résultat que sub, sans reconstruire le texte ; réservé aux tables
+        indépendantes (et byte_ready si content est en octets UTF-8). Renvoie
+        False si une modification entre en conflit avec celles déjà
+        présentes dans script.
+        """
+        candidates = self.prefilter.candidate_rules(content)
+        if not candidates:
+            return True
+        if isinstance(content, str):
+            patterns, combined = self.patterns, self.combined
+            literals, templates = self._literals, [new for _, new in self.replacements]
+        else:
+            patterns, combined, literals, templates = self._byte_programs()
+        if len(candidates) <= SUBSET_RULE_LIMIT and len(candidates) < len(self.replacements):
+            # Une passe par règle candidate, comme les sub successifs
+            for rule in candidates:
+                literal = literals[rule]
+                origin = f'{self.name}[{rule}]'
+                edits = [(match.start(), match.end(),
+                          literal if literal is not None else match.expand(templates[rule]), origin)
+                         for match in patterns[rule].finditer(content)]
+                if not script.merge(edits):
+                    return False
+            return True
+        edits = []
+        for match in combined.finditer(content):
+            rule = self._rule_for_group[match.lastindex]
+            replacement = literals[rule]
+            if replacement is None:
+                # La règle seule reconnaît exactement la même étendue à cette position
+                own = patterns[rule].match(content, match.start())
+                replacement = own.expand(templates[rule])
+            edits.append((match.start(), match.end(), replacement, f'{self.name}[{rule}]'))
+        return script.merge(edits)
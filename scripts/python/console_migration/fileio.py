@@ -0,0 +1,52 @@
+"""
+Écriture des fichiers migrés
+
+Un fichier n'est réécrit que si son contenu change : les watchers (tsc, vite,
+tests) ne voient pas passer de modification inutile. L'écriture passe par un
+fichier temporaire du même répertoire renommé sur la cible, si bien qu'un
+lecteur voit toujours l'ancien ou le nouveau contenu complet, jamais un
+fichier tronqué.
+"""
+
+import os
+import stat
+import tempfile
+
+
+def atomic_write(path, data):
+    """Remplace path par data (bytes) en conservant ses permissions"""
+    directory = os.path.dirname(path) or '.'
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = None
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_if_changed(path, content, original=None):
+    """Écrit content (str) dans path s'il diffère ; renvoie True si écrit
+
+    original évite de relire le fichier quand l'appelant l'a déjà en mémoire.
+    """
+    data = content.encode('utf-8')
+    if original is None:
+        try:
+            with open(path, 'rb') as f:
+                unchanged = f.read() == data
+        except FileNotFoundError:
+            unchanged = False
+    else:
+        unchanged = original == content
+    if unchanged:
+        return False
+    atomic_write(path, data)
+    return True
@@ -0,0 +1,63 @@
+"""
+Fichiers modifiés d'après git
+
+En pre-commit et en CI, seuls les fichiers touchés depuis une référence
+(main, origin/main, ...) comptent. La référence est ramenée à son point de
+divergence avec HEAD (merge-base) : les commits arrivés sur main depuis ne
+sont pas attribués à la branche. La liste réunit les commits de la branche,
+l'index (fichiers indexés) et l'arbre de travail, plus les fichiers non
+suivis qui ne sont pas ignorés ; les fichiers supprimés sont écartés.
+"""
+
+import subprocess
+
+
+class GitError(RuntimeError):
+    """git absent, dépôt introuvable ou référence inconnue"""
+
+
+def _git(root, *args):
+    try:
+        completed = subprocess.run(['git', '-C', root, *args], capture_output=True)
+    except FileNotFoundError:
+        raise GitError('git introuvable') from None
+    if completed.returncode:
+        message = completed.stderr.decode('utf-8', 'replace').strip()
+        raise GitError(message or f'git {args[0]} a échoué (code {completed.returncode})')
+    return completed.stdout
+
+
+def _names(output):
+    return [name for name in output.decode('utf-8', 'surrogateescape').split('\0') if name]
+
+
+def changed_files(root, ref, untracked=True):
+    """Chemins (relatifs à root) modifiés depuis ref, triés
+
+    Seuls les fichiers situés sous root sont renvoyés.
+    """
+    base = _git(root, 'merge-base', ref, 'HEAD').decode('ascii').strip()
+    # Sans second commit, git diff compare base à l'arbre de travail : les
+    # modifications indexées et non indexées sont incluses
+    paths = set(_names(_git(root, 'diff', '--name-only', '-z', '--relative',
+                            '--diff-filter=d', base, '--')))
+    if untracked:
+        paths.update(_names(_git(root, 'ls-files', '-z', '--others', '--exclude-standard')))
+    return sorted(paths)
+
+
+def tracked_files(root, dirs=()):
+    """Chemins (relatifs à root) suivis, plus les non suivis non ignorés, triés
+
+    Lus dans l'index de git, sans parcourir l'arbre : dirs restreint la liste
+    à ces sous-répertoires. Un fichier suivi mais supprimé de l'arbre de
+    travail peut y figurer.
+    """
+    return sorted(set(_names(_git(root, 'ls-files', '-z', '--cached', '--others',
+                                  '--exclude-standard', '--', *dirs))))
+
+
+def staged_files(root):
+    """Chemins (relatifs à root) présents dans l'index et modifiés depuis HEAD"""
+    return sorted(_names(_git(root, 'diff', '--name-only', '-z', '--relative',
+                              '--cached', '--diff-filter=d', 'HEAD', '--')))
@@ -0,0 +1,497 @@
+"""
+Agrégation des logs émis dans les boucles
+
+Après migration, un logger.info(...) placé dans un for, un forEach ou un map
+s'exécute à chaque élément et alloue à chaque fois son objet metadata : une
+éviction de cache ou une validation produit autant de logs que d'éléments.
+Chaque appel de ce type devient un compteur et un échantillon borné (les
+SAMPLE_SIZE premiers éléments), puis un seul log récapitulatif émis dans
+le finally qui entoure la boucle :
+
+    let evictionPredictiveCount = 0;
+    const evictionPredictiveSample: Array<Record<string, unknown>> = [];
+    try {
+      for (const item of entries) {
+        evictionPredictiveCount++;
+        if (evictionPredictiveSample.length < 5) evictionPredictiveSample.push({ cacheKey: item.key });
+      }
+    } finally {
+      if (evictionPredictiveCount > 0) {
+        logger.info('Éviction prédictive', {
+          metadata: {
+            service: 'ContextCacheService',
+            count: evictionPredictiveCount,
+            sample: evictionPredictiveSample
+          }
+        });
+      }
+    }
+
+Le récapitulatif est donc émis aussi quand un élément lève une exception,
+avant que celle-ci ne soit journalisée plus haut. Les clés de metadata de
+valeur constante (service, operation, step...) restent dans le
+récapitulatif, les autres forment l'échantillon.
+
+Seuls info et debug sont agrégés, et seulement dans une boucle dont le
+corps ne journalise rien d'autre : un warn ou une error par élément reste
+un incident à part entière, et les logs restés dans la boucle seraient
+sinon réordonnés par rapport au récapitulatif. Sont aussi exclus : les
+boucles for contenant return, throw ou yield, les callbacks async ou
+contenant throw ou yield, les boucles qui sont le corps sans accolades d'un
+if, else ou for, les map dont le résultat est déclaré (const x = ...map(),
+la déclaration ne peut pas entrer dans le try), et les appels qui ne sont
+pas une instruction à part entière ou dont le message n'est pas une chaîne
+constante. Parmi les boucles imbriquées, la plus externe qui remplit ces
+conditions reçoit le récapitulatif.
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+
+from .edits import EditScript
+from .scanner import (
+    ScanError, _split_args, is_statement_start, line_indent, literal_spans, mask_literals, scan_balanced,
+)
+from .scopes import _close_paren, _match_braces
+
+# À incrémenter quand la forme du code généré change (invalide le cache)
+LOOPS_VERSION = 2
+# Éléments gardés dans l'échantillon d'un récapitulatif
+SAMPLE_SIZE = 5
+AGGREGATED_LEVELS = ('info', 'debug')
+
+# Recherchés sur le code dont les littéraux sont blanchis
+_LOGGER_CALL = re.compile(r'(?<![\w$.])logger\s*\.\s*(' + '|'.join(AGGREGATED_LEVELS) + r')\s*\(')
+_FOR = re.compile(r'(?<![\w$.])for(?:\s+await)?\s*\(')
+# Tout appel de journalisation, this.logger.* et console.* compris
+_ANY_LOG = re.compile(r'(?<![\w$])(?:logger|console)\s*\.\s*[A-Za-z_$][\w$]*\s*\(')
+_CALLBACK = re.compile(r'\.\s*(forEach|map)\s*\(')
+_ARROW = re.compile(r'\s*(async\s+)?(?:\([^()]*\)|[A-Za-z_$][\w$]*)\s*(?::[^=(){};]*)?=>\s*')
+_FUNCTION = re.compile(r'\s*(async\s+)?function\s*(?:[A-Za-z_$][\w$]*)?\s*\([^()]*\)[^{;]*\{')
+_EXITS = re.compile(r'(?<![\w$.])(return|throw|yield)(?![\w$])')
+_DECLARATION = re.compile(r'(?:const|let|var)\s')
+_NESTED_FUNCTION = re.compile(r'=>\s*\{|(?<![\w$.])function\b[^{;]*\{')
+# Suite de l'instruction après la boucle : fermantes, point-virgule
+_STATEMENT_TAIL = re.compile(r'[\s)\]]*;?[ \t]*$')
+# Caractère qui prolonge l'expression sur la ligne suivante
+_CONTINUATION = set('.?)]:,+-*/%&|=<>')
+
+_CONSTANT_STRING = re.compile(r"'(?:[^'\\\n]|\\.)*'|\"(?:[^\"\\\n]|\\.)*\"|`(?:[^`\\$]|\\.|\$(?!\{))*`")
+_METADATA = re.compile(r'metadata\s*:\s*\{')
+# Entrée de valeur constante (chaîne, nombre, booléen) : gardée dans le récapitulatif
+_CONSTANT_ENTRY = re.compile(
+    r"""[A-Za-z_$][\w$]*\s*:\s*(?:'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|-?\d[\d_.]*|true|false|null)$""")
+
+
+class Loop:
+    """Boucle for, ou appel forEach / map avec son callback, dans le source"""
+
+    __slots__ = ('kind', 'start', 'line_start', 'line_end', 'body_start', 'body_end', 'concise')
+
+    def __init__(self, kind, start, line_start, line_end, body_start, body_end, concise=False):
+        self.kind = kind
+        # Début de l'instruction et début de sa ligne (déclarations insérées avant)
+        self.start = start
+        self.line_start = line_start
+        # Fin de la dernière ligne de l'instruction (récapitulatif inséré après)
+        self.line_end = line_end
+        # Corps : accolades (ou expression d'un callback concis) exclues
+        self.body_start = body_start
+        self.body_end = body_end
+        self.concise = concise
+
+
+def _previous_significant(code, pos):
+    pos -= 1
+    while pos >= 0 and code[pos].isspace():
+        pos -= 1
+    return code[pos] if pos >= 0 else ''
+
+
+def _next_significant(code, pos):
+    while pos < len(code) and code[pos].isspace():
+        pos += 1
+    return code[pos] if pos < len(code) else ''
+
+
+def _line_end(code, pos):
+    end = code.find('\n', pos)
+    return len(code) if end < 0 else end
+
+
+def _exits(code, start, end, keywords):
+    return any(match.group(1) in keywords for match in _EXITS.finditer(code, start, end))
+
+
+def _for_loops(code, source, braces):
+    for match in _FOR.finditer(code):
+        start = match.start()
+        close = _close_paren(code, match.end() - 1)
+        if close < 0 or not is_statement_start(source, start):
+            continue
+        # Corps sans accolades d'un if / else / for : la boucle ne peut pas être entourée
+        line_start = code.rfind('\n', 0, start) + 1
+        if _previous_significant(code, line_start) not in ('', ';', '{', '}'):
+            continue
+        body = close + 1
+        while body < len(code) and code[body].isspace():
+            body += 1
+        body_end = braces.get(body)
+        if body_end is None or code[body] != '{':
+            continue
+        line_end = _line_end(code, body_end)
+        if code[body_end + 1:line_end].strip():
+            continue
+        if _exits(code, body + 1, body_end, ('return', 'throw', 'yield')):
+            continue
+        yield Loop('for', start, line_start, line_end, body + 1, body_end)
+
+
+def _callback_loops(code, source, braces):
+    for match in _CALLBACK.finditer(code):
+        kind = match.group(1)
+        open_paren = match.end() - 1
+        close = _close_paren(code, open_paren)
+        if close < 0:
+            continue
+        arrow = _ARROW.match(code, open_paren + 1, close)
+        function = None if arrow else _FUNCTION.match(code, open_paren + 1, close)
+        head = arrow or function
+        if head is None or head.group(1):
+            # Pas un callback en ligne, ou callback async : ses logs suivraient l'instruction
+            continue
+        concise = False
+        if function is not None or code.startswith('{', head.end()):
+            body = head.end() - 1 if function is not None else head.end()
+            body_end = braces.get(body)
+            if body_end is None or code[body_end + 1:close].strip():
+                continue
+            body += 1
+        elif kind == 'forEach':
+            # (v, i) => logger.info(...) : le callback n'est que l'appel
+            concise = True
+            body, body_end = head.end(), close
+            while code[body_end - 1].isspace():
+                body_end -= 1
+        else:
+            continue
+        if _exits(code, body, body_end, ('throw', 'yield')):
+            continue
+        # L'instruction commence en tête de la ligne du forEach / map...
+        line_start = code.rfind('\n', 0, match.start()) + 1
+        start = line_start
+        while start < match.start() and code[start] in ' \t':
+            start += 1
+        if _previous_significant(code, line_start) not in ('', ';', '{', '}'):
+            continue
+        if _DECLARATION.match(code, start):
+            # const x = items.map(...) : la déclaration ne peut pas entrer dans le try
+            continue
+        # ... et se termine sur la ligne de sa parenthèse fermante
+        line_end = _line_end(code, close)
+        if not _STATEMENT_TAIL.match(code, close + 1, line_end):
+            continue
+        statement = code[start:line_end]
+        if (statement.count('(') != statement.count(')') or statement.count('[') != statement.count(']')
+                or statement.count('{') != statement.count('}')):
+            continue
+        if _next_significant(code, line_end) in _CONTINUATION:
+            continue
+        yield Loop(kind, start, line_start, line_end, body, body_end, concise)
+
+
+def find_loops(source, code=None):
+    """Boucles candidates de source, triées par début"""
+    code = mask_literals(source) if code is None else code
+    braces = _match_braces(code)
+    loops = list(_for_loops(code, source, braces)) + list(_callback_loops(code, source, braces))
+    loops.sort(key=lambda loop: loop.start)
+    return loops
+
+
+def _crosses_function(code, braces, loop, pos):
+    """Vrai si une fonction imbriquée dans le corps de loop englobe pos"""
+    for match in _NESTED_FUNCTION.finditer(code, loop.body_start, pos):
+        if braces.get(match.end() - 1, -1) > pos:
+            return True
+    return False
+
+
+def _object_entries(source, open_brace):
+    """[(début, fin)] des entrées d'un objet littéral ouvert en open_brace, et sa fermante"""
+    close, commas = scan_balanced(source, open_brace + 1, '}')
+    return _split_args(source, open_brace + 1, close, commas), close
+
+
+def _split_metadata(source, start, end):
+    """(entrées constantes, autres entrées) de { metadata: {...} }, ou None si
+    l'argument a une autre forme"""
+    text = source[start:end]
+    if not text.startswith('{'):
+        return None
+    entries, close = _object_entries(source, start)
+    if close != end - 1 or len(entries) != 1:
+        return None
+    entry_start, entry_end = entries[0]
+    metadata = _METADATA.match(source, entry_start, entry_end)
+    if metadata is None:
+        return None
+    inner, inner_close = _object_entries(source, metadata.end() - 1)
+    if inner_close != entry_end - 1:
+        return None
+    header, sample = [], []
+    for inner_start, inner_end in inner:
+        entry = source[inner_start:inner_end]
+        (header if _CONSTANT_ENTRY.match(entry) else sample).append(entry)
+    return header, sample
+
+
+def _base_name(message):
+    """Préfixe de variables tiré du message : 'Éviction prédictive' -> evictionPredictive"""
+    text = unicodedata.normalize('NFKD', message[1:-1])
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    words = re.findall(r'[A-Za-z0-9]+', text)
+    # « d'injection » : l'élision ne fait pas un mot
+    words = [word for word in words if len(word) > 1][:3] or words[:3]
+    if not words:
+        return 'loopLog'
+    name = words[0].lower() + ''.join(word[0].upper() + word[1:].lower() for word in words[1:])
+    return name if not name[0].isdigit() else f'log{name}'
+
+
+class _Aggregate:
+    """Un appel logger agrégeable : position, niveau, message, metadata, variables"""
+
+    __slots__ = ('start', 'end', 'statement_end', 'statement', 'level', 'message', 'header',
+                 'sample', 'count_name', 'sample_name')
+
+
+def _aggregate(source, code, start):
+    """_Aggregate de l'appel de log commençant en start, ou None s'il ne peut pas l'être"""
+    match = _LOGGER_CALL.match(code, start)
+    if match is None:
+        return None
+    try:
+        close, commas = scan_balanced(source, match.end(), ')')
+    except ScanError:
+        return None  # Appel mal formé : laissé tel quel
+    args = _split_args(source, match.end(), close, commas)
+    if not args or len(args) > 2 or not _CONSTANT_STRING.fullmatch(source, *args[0]):
+        return None
+    split = _split_metadata(source, *args[1]) if len(args) == 2 else ([], [])
+    if split is None:
+        return None
+    aggregate = _Aggregate()
+    aggregate.start = start
+    aggregate.end = close + 1
+    aggregate.statement_end = aggregate.end + 1 if source.startswith(';', aggregate.end) else aggregate.end
+    # Instruction à part entière : seule sur sa ligne, après ; { ou }
+    aggregate.statement = (is_statement_start(source, start)
+                           and not source[aggregate.statement_end:
+                                          _line_end(source, aggregate.statement_end)].strip()
+                           and _previous_significant(code, start) in ('', ';', '{', '}'))
+    aggregate.level = match.group(1)
+    aggregate.message = source[args[0][0]:args[0][1]]
+    aggregate.header, aggregate.sample = split
+    return aggregate
+
+
+def _placeable(code, braces, loop, aggregate):
+    """Vrai si aggregate peut être remplacé dans le corps de loop"""
+    if aggregate is None:
+        return False
+    if loop.concise:
+        # Le callback concis n'est que l'appel
+        return (loop.body_start, loop.body_end) == (aggregate.start, aggregate.end)
+    return aggregate.statement and not _crosses_function(code, braces, loop, aggregate.start)
+
+
+def _groups(source, code, loops, braces):
+    """[(boucle, appels agrégés)] : pour chaque appel, la boucle la plus externe
+    dont le corps ne journalise rien d'autre que des appels agrégeables"""
+    calls = [(match.start(), _aggregate(source, code, match.start()))
+             for match in _ANY_LOG.finditer(code)]
+    groups = []
+    covered = -1
+    for loop in loops:
+        if loop.start < covered:
+            continue  # Dans une boucle déjà retenue
+        inside = [aggregate for start, aggregate in calls
+                  if loop.body_start <= start < loop.body_end]
+        # Un warn ou un autre log laissé par élément serait réordonné par rapport au récapitulatif
+        if inside and all(_placeable(code, braces, loop, aggregate) for aggregate in inside):
+            groups.append((loop, inside))
+            covered = loop.line_end
+    taken = set(re.findall(r'[A-Za-z_$][\w$]*', code))
+    for _loop, aggregates in groups:
+        for aggregate in aggregates:
+            base = _base_name(aggregate.message)
+            suffix = ''
+            index = 1
+            while f'{base}Count{suffix}' in taken or f'{base}Sample{suffix}' in taken:
+                index += 1
+                suffix = str(index)
+            aggregate.count_name = f'{base}Count{suffix}'
+            aggregate.sample_name = f'{base}Sample{suffix}'
+            taken.update((aggregate.count_name, aggregate.sample_name))
+    return groups
+
+
+def _frozen_lines(source, spans, start, end):
+    """Débuts de ligne de [start, end] situés dans une chaîne ou un template"""
+    frozen = set()
+    for span_start, span_end in spans:
+        if span_end <= start or span_start >= end:
+            continue
+        pos = source.find('\n', span_start, span_end)
+        while pos >= 0:
+            frozen.add(pos + 1)
+            pos = source.find('\n', pos + 1, span_end)
+    return frozen
+
+
+def _render(source, loop, aggregates, typed, spans):
+    """Modification d'une boucle : déclarations, boucle dans un try, récapitulatifs
+    dans le finally (émis aussi quand un élément lève une exception)"""
+    indent = line_indent(source, loop.start)
+    step = '\t' if indent.startswith('\t') else '  '
+    inner = indent + step
+    declarations = []
+    summaries = []
+    edits = []
+    for aggregate in aggregates:
+        count, sample = aggregate.count_name, aggregate.sample_name
+        declarations.append(f'{indent}let {count} = 0;\n')
+        statements = [f'{count}++;']
+        entries = [*aggregate.header, f'count: {count}']
+        if aggregate.sample:
+            annotation = ': Array<Record<string, unknown>>' if typed else ''
+            declarations.append(f'{indent}const {sample}{annotation} = [];\n')
+            statements.append(f"if ({sample}.length < {SAMPLE_SIZE}) "
+                              f"{sample}.push({{ {', '.join(aggregate.sample)} }});")
+            entries.append(f'sample: {sample}')
+        if loop.concise:
+            edits.append((aggregate.start, aggregate.end, f"{{ {' '.join(statements)} }}"))
+        else:
+            separator = f'\n{line_indent(source, aggregate.start)}{step}'
+            edits.append((aggregate.start, aggregate.statement_end, separator.join(statements)))
+        body = f',\n{inner}      '.join(entries)
+        summaries.append(
+            f'\n{inner}if ({count} > 0) {{\n'
+            f'{inner}  logger.{aggregate.level}({aggregate.message}, {{\n'
+            f'{inner}    metadata: {{\n'
+            f'{inner}      {body}\n'
+            f'{inner}    }}\n'
+            f'{inner}  }});\n'
+            f'{inner}}}')
+    # Boucle réindentée d'un niveau, sauf les lignes internes aux chaînes et templates
+    frozen = _frozen_lines(source, spans, loop.line_start, loop.line_end)
+    # Ni les lignes internes aux appels remplacés
+    for edit_start, edit_end, _replacement in edits:
+        frozen.update(range(edit_start + 1, edit_end))
+    line = loop.line_start
+    while line < loop.line_end:
+        if line not in frozen and source[line:_line_end(source, line)].strip():
+            edits.append((line, line, step))
+        line = _line_end(source, line) + 1
+    # À même position, l'indentation précède le remplacement de l'appel
+    edits.sort(key=lambda edit: (edit[0], edit[1]))
+    pieces = [*declarations, f'{indent}try {{\n']
+    pos = loop.line_start
+    for edit_start, edit_end, replacement in edits:
+        pieces.append(source[pos:edit_start])
+        pieces.append(replacement)
+        pos = edit_end
+    pieces.append(source[pos:loop.line_end])
+    pieces.append(f'\n{indent}}} finally {{')
+    pieces.extend(summaries)
+    pieces.append(f'\n{indent}}}')
+    return (loop.line_start, loop.line_end, ''.join(pieces), 'loop-logs')
+
+
+def loop_log_edits(source, typed=True):
+    """Modifications (début, fin, remplacement, origine) qui agrègent les logs des boucles
+
+    typed : déclarations annotées (TypeScript).
+    """
+    if 'logger' not in source:
+        return []
+    code = mask_literals(source)
+    loops = find_loops(source, code)
+    if not loops:
+        return []
+    groups = _groups(source, code, loops, _match_braces(code))
+    if not groups:
+        return []
+    # Chaînes et templates : leurs lignes ne sont pas réindentées
+    spans = [(start, end) for start, end in literal_spans(source) if source[start] in '\'"`']
+    return [_render(source, loop, aggregates, typed, spans) for loop, aggregates in groups]
+
+
+def aggregate_loop_logs(source, typed=True):
+    """Agrège les logs des boucles de source ; renvoie (source, nombre de boucles réécrites)"""
+    script = EditScript()
+    edits = loop_log_edits(source, typed)
+    script.merge(edits)
+    return script.apply(source), len(edits)
+
+
+class LoopLogRules:
+    """Agrégation des logs de boucle d'un fichier, utilisable comme un RuleSet"""
+
+    requires_logger = False
+    collapse_blank_lines = False
+
+    def __init__(self, path):
+        self.path = path
+        self.typed = not path.endswith('.js')
+        self.name = 'loop-logs'
+        # Ligne du profil (voir RuleProfiler.apply)
+        self.profile_key = (self.name, 'loops', 'logger.info/debug')
+        self._fingerprint = None
+
+    def compile(self, registry=None):
+        # Patterns de module : rien à compiler par fichier
+        return []
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            payload = json.dumps(['loop-logs', LOOPS_VERSION, SAMPLE_SIZE, self.typed])
+            self._fingerprint = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+    @property
+    def rule_count(self):
+        return 1
+
+    def can_apply(self, content):
+        return True
+
+    def outputs(self):
+        # Code généré à partir du source : rien d'énumérable à l'avance
+        return None
+
+    def reads(self, text):
+        """Vrai si text peut contenir un appel à agréger"""
+        return 'logger' in text
+
+    def edits(self, content):
+        """Modifications des boucles de content (EditScript)"""
+        script = EditScript()
+        script.merge(loop_log_edits(content, self.typed))
+        return script
+
+    def apply(self, content):
+        return aggregate_loop_logs(content, self.typed)[0]
+
+    def subn(self, content):
+        """(contenu réécrit, nombre de boucles réécrites)"""
+        return aggregate_loop_logs(content, self.typed)
+
+
+def loop_log_rule_sets(paths):
+    """Un LoopLogRules par chemin, à placer après la migration"""
+    return [LoopLogRules(path) for path in paths]
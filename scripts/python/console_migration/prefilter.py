@@ -0,0 +1,214 @@
+"""
+Préfiltre littéral des règles
+
+Chaque règle commence presque toujours par un texte fixe (`console.log(\\`[ContextCache]`,
+`console.error('[SQLEngine]`, ...). On extrait de chaque pattern un littéral
+obligatoire, puis on indexe tous ces littéraux dans un automate (un trie compilé
+en une seule expression régulière). Un parcours du fichier suffit à savoir
+quelles règles peuvent s'appliquer ; les autres ne sont pas exécutées.
+"""
+
+import re
+from collections import Counter
+
+try:
+    from re import _parser
+except ImportError:  # Implémentation de Python sans sre accessible
+    _parser = None
+
+# Longueur du préfixe partagé recherché entre les littéraux (`console.`)
+ANCHOR_LENGTH = 8
+# Éléments de largeur nulle : ils ne séparent pas deux caractères littéraux
+_ZERO_WIDTH = ('AT', 'ASSERT', 'ASSERT_NOT')
+
+
+def _parse(pattern, flags):
+    """Arbre du parseur de re, ou None (sre indisponible, pattern invalide,
+    IGNORECASE : les littéraux ne seraient plus exacts)"""
+    if _parser is None or flags & re.IGNORECASE:
+        return None
+    try:
+        parsed = _parser.parse(pattern, flags)
+    except re.error:
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        # (?i) en tête du pattern
+        return None
+    return parsed
+
+
+def _literal_runs(items, runs, current):
+    """Ajoute à runs les suites de LITERAL consécutifs obligatoires de items ;
+    renvoie la suite en cours"""
+    for op, value in items:
+        name = str(op)
+        if name == 'LITERAL':
+            current.append(chr(value))
+        elif name in _ZERO_WIDTH:
+            continue
+        elif name == 'SUBPATTERN' and not value[1] & re.IGNORECASE:
+            # Groupe obligatoire : son contenu prolonge la suite en cours
+            current = _literal_runs(value[-1], runs, current)
+        elif name == 'ATOMIC_GROUP':
+            current = _literal_runs(value, runs, current)
+        elif name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT') and value[0] >= 1:
+            # Au moins une itération : ses littéraux sont obligatoires, mais
+            # pas contigus au reste
+            runs.append(current)
+            runs.append(_literal_runs(value[2], runs, []))
+            current = []
+        else:
+            # Classe, « . », alternance, répétition facultative, référence...
+            runs.append(current)
+            current = []
+    return current
+
+
+def required_literals(pattern, flags=0):
+    """Suites littérales que toute correspondance du pattern contient
+
+    Les littéraux sont lus dans l'arbre du parseur de re : les échappements
+    (\\x27, \\u00e9, \\N{...}, octal) y sont déjà des caractères. Renvoie []
+    si aucun littéral fiable ne peut être extrait (alternance au premier
+    niveau, IGNORECASE) : la règle est alors toujours exécutée.
+    """
+    parsed = _parse(pattern, flags)
+    if parsed is None:
+        return []
+    runs = []
+    runs.append(_literal_runs(parsed, runs, []))
+    return [''.join(run) for run in runs if run]
+
+
+def literal_text(pattern, flags=0):
+    """Texte exact reconnu par un pattern fait uniquement de caractères
+    littéraux, ou None (classe, répétition, assertion, IGNORECASE...)"""
+    parsed = _parse(pattern, flags)
+    if parsed is None or any(str(op) != 'LITERAL' for op, _value in parsed):
+        return None
+    return ''.join(chr(value) for _op, value in parsed)
+
+
+def best_literal(pattern, flags=0):
+    """Le plus long littéral obligatoire du pattern, ou None"""
+    literals = required_literals(pattern, flags)
+    if not literals:
+        return None
+    return max(literals, key=len)
+
+
+def _trie_source(literals):
+    """Expression régulière en forme de trie, la plus longue branche d'abord"""
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node):
+        terminal = '' in node
+        branches = [re.escape(char) + emit(child)
+                    for char, child in sorted(node.items()) if char != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            # Gourmand : la branche la plus longue est tentée en premier
+            return '(?:' + body + ')?'
+        return body
+
+    return emit(trie)
+
+
+class LiteralIndex:
+    """Index multi-littéraux : quelles règles peuvent s'appliquer à un texte"""
+
+    def __init__(self, patterns, flags=0, registry=None, summary=None):
+        self.rule_count = len(patterns)
+        if summary is not None:
+            # Littéraux et automate déjà calculés (catalogue compilé)
+            self.literal_for_rule, self.automaton_source = summary
+        else:
+            self.literal_for_rule = self._anchor_literals([best_literal(p, flags) for p in patterns])
+            self.automaton_source = None
+        # Règles sans littéral : toujours candidates
+        self.always = [i for i, lit in enumerate(self.literal_for_rule) if lit is None]
+
+        self.rules_for_literal = {}
+        for index, literal in enumerate(self.literal_for_rule):
+            if literal is not None:
+                self.rules_for_literal.setdefault(literal, []).append(index)
+
+        literals = sorted(self.rules_for_literal)
+        # Tout littéral trouvé à une position implique ses préfixes au même endroit
+        self.prefixes = {
+            literal: [other for other in literals if literal.startswith(other)]
+            for literal in literals
+        }
+        self.automaton = None
+        self._registry = registry
+        self._byte_automaton = None
+        if literals:
+            if self.automaton_source is None:
+                self.automaton_source = _trie_source(literals)
+            compile = registry.compile if registry is not None else re.compile
+            self.automaton = compile(self.automaton_source, re.DOTALL)
+
+    def summary(self):
+        """(littéral par règle, source de l'automate), réutilisable tel quel"""
+        return [self.literal_for_rule, self.automaton_source]
+
+    @staticmethod
+    def _anchor_literals(literals):
+        """Aligne les littéraux sur leur préfixe le plus fréquent
+
+        Toute sous-chaîne d'un littéral obligatoire est elle aussi obligatoire.
+        Couper `violations.forEach((v, i) => console.log(...` à `console.log(...`
+        donne à l'automate un préfixe commun, que re recherche très vite.
+        """
+        heads = Counter(lit[:ANCHOR_LENGTH] for lit in literals
+                        if lit is not None and len(lit) >= ANCHOR_LENGTH)
+        if not heads:
+            return literals
+        anchor = heads.most_common(1)[0][0]
+        anchored = []
+        for literal in literals:
+            if literal is not None and not literal.startswith(anchor) and anchor in literal:
+                literal = literal[literal.index(anchor):]
+            anchored.append(literal)
+        return anchored
+
+    @property
+    def byte_automaton(self):
+        """Automate compilé en bytes UTF-8 : les littéraux du trie gardent leur sens"""
+        if self._byte_automaton is None and self.automaton is not None:
+            compile = self._registry.compile if self._registry is not None else re.compile
+            self._byte_automaton = compile(self.automaton_source.encode('utf-8'), re.DOTALL)
+        return self._byte_automaton
+
+    def present_literals(self, text):
+        """Ensemble des littéraux indexés présents dans text (str ou octets UTF-8)"""
+        found = set()
+        if self.automaton is None:
+            return found
+        raw = not isinstance(text, str)
+        search = self.byte_automaton.search if raw else self.automaton.search
+        pos = 0
+        while True:
+            match = search(text, pos)
+            if match is None:
+                return found
+            # En bytes, seul le littéral trouvé est décodé
+            literal = match.group().decode('utf-8') if raw else match.group()
+            if literal in self.prefixes and literal not in found:
+                found.update(self.prefixes[literal])
+            # Repartir juste après le début : aucune occurrence ne se chevauche
+            pos = match.start() + 1
+
+    def candidate_rules(self, text):
+        """Indices triés des règles dont le littéral obligatoire est présent"""
+        rules = list(self.always)
+        for literal in self.present_literals(text):
+            rules.extend(self.rules_for_literal[literal])
+        return sorted(rules)
@@ -0,0 +1,115 @@
+"""
+Profil par règle des migrations
+
+En mode profil, chaque règle d'une table est exécutée seule (pattern.subn),
+dans l'ordre historique : le résultat est celui du chemin séquentiel, mais
+chaque règle a son propre chronomètre. Pour chaque règle on cumule le temps,
+le nombre de correspondances, les octets parcourus et les fichiers modifiés ;
+les règles qui ne reconnaissent jamais rien apparaissent avec 0 correspondance.
+"""
+
+import os
+import time
+
+# Racine des piles écrites pour les flamegraphs
+STACK_ROOT = 'console-migration'
+
+_SECONDS, _MATCHES, _BYTES, _FILES = range(4)
+
+
+def _frame(text):
+    """Nom de frame sans « ; » ni retour à la ligne (format collapsed)"""
+    text = ' '.join(text.split()).replace(';', ':')
+    return text if len(text) <= 60 else text[:57] + '...'
+
+
+class RuleProfiler:
+    """Statistiques cumulées par règle, fusionnables entre processus"""
+
+    def __init__(self, before_rule=None):
+        # (jeu, table, règle) -> [secondes, correspondances, octets, fichiers]
+        self.stats = {}
+        # Appelé avec la clé de chaque règle juste avant son exécution
+        self.before_rule = before_rule
+
+    def _record(self, key, seconds, matches, scanned):
+        entry = self.stats.get(key)
+        if entry is None:
+            entry = self.stats[key] = [0.0, 0, 0, 0]
+        entry[_SECONDS] += seconds
+        entry[_MATCHES] += matches
+        entry[_BYTES] += scanned
+        entry[_FILES] += 1 if matches else 0
+
+    def apply(self, rules, content):
+        """Applique rules à content en chronométrant chaque règle"""
+        tables = getattr(rules, 'tables', None)
+        if tables is None:
+            # Réécriture générique, agrégation des boucles : une seule « règle »
+            key = getattr(rules, 'profile_key', None) or (rules.name, 'generic', 'console.*')
+            if self.before_rule is not None:
+                self.before_rule(key)
+            scanned = len(content.encode('utf-8'))
+            start = time.perf_counter()
+            content, count = rules.subn(content)
+            self._record(key, time.perf_counter() - start, count, scanned)
+            return content
+
+        original = content
+        for index, (replacer, (replacements, _flags)) in enumerate(zip(rules.replacers, tables)):
+            table = f'#{index}'
+            for rule, (pattern, (old, new)) in enumerate(zip(replacer.patterns, replacements)):
+                key = (rules.name, table, f'[{rule}] {_frame(old)}')
+                if self.before_rule is not None:
+                    self.before_rule(key)
+                # Texte laissé par les règles précédentes : c'est lui que la règle parcourt
+                scanned = len(content.encode('utf-8'))
+                start = time.perf_counter()
+                content, count = pattern.subn(new, content)
+                self._record(key, time.perf_counter() - start, count, scanned)
+        if rules.collapse_blank_lines:
+            key = (rules.name, 'cleanup', 'blank-lines')
+            if self.before_rule is not None:
+                self.before_rule(key)
+            scanned = len(content.encode('utf-8'))
+            start = time.perf_counter()
+            content, count = rules.cleanup(original, content)
+            self._record(key, time.perf_counter() - start, count, scanned)
+        return content
+
+    def merge(self, stats):
+        """Ajoute les statistiques d'un autre profil (dict ou RuleProfiler)"""
+        stats = getattr(stats, 'stats', stats)
+        for key, values in stats.items():
+            entry = self.stats.setdefault(tuple(key), [0.0, 0, 0, 0])
+            for field, value in enumerate(values):
+                entry[field] += value
+
+    def rows(self):
+        """[(secondes, correspondances, octets, fichiers, clé)] du plus coûteux au moins coûteux"""
+        rows = [(*values, key) for key, values in self.stats.items()]
+        return sorted(rows, key=lambda row: row[0], reverse=True)
+
+    def report(self, top=10):
+        """Affiche les top règles les plus coûteuses et les règles mortes"""
+        rows = self.rows()
+        total = sum(row[_SECONDS] for row in rows)
+        dead = [row for row in rows if not row[_MATCHES]]
+        print(f"\n🔬 {len(rows)} règles profilées, {total * 1000:.1f} ms au total, "
+              f"{len(dead)} sans aucune correspondance")
+        for seconds, matches, scanned, files, key in rows[:top]:
+            print(f"   {seconds * 1000:8.2f} ms  {matches:6d} corr.  {scanned / (1024 * 1024):7.2f} Mo  "
+                  f"{files:4d} fich.  {' '.join(key)}")
+
+    def dump_collapsed(self, path):
+        """Écrit les piles au format « collapsed » (flamegraph.pl, speedscope)
+
+        Le poids de chaque pile est le temps cumulé en microsecondes.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for seconds, _matches, _scanned, _files, key in self.rows():
+                frames = ';'.join(_frame(part) for part in (STACK_ROOT, *key))
+                f.write(f'{frames} {max(1, round(seconds * 1e6))}\n')
@@ -0,0 +1,63 @@
+"""
+Registre des patterns compilés
+
+Chaque pattern (source, flags) est compilé une seule fois, au chargement des
+règles, et conservé par le registre : les scripts ne dépendent plus du cache
+interne de re, limité à 512 entrées. Le registre vit dans le processus :
+les ouvriers démarrés par fork en héritent avec les patterns déjà compilés,
+les autres compilent à leur tour au chargement des règles. Rien n'est écrit
+sur disque : un programme compilé ne se sérialise pas, et recompiler des
+sources relues ne coûte pas moins que les compiler.
+"""
+
+import re
+import time
+
+
+class PatternRegistry:
+    """Patterns compilés une fois, indexés par (source, flags)"""
+
+    def __init__(self):
+        self._patterns = {}
+        self.compile_times = {}
+        self.labels = {}
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def __contains__(self, key):
+        return key in self._patterns
+
+    def compile(self, pattern, flags=0, label=None):
+        """Pattern compilé (compilé et chronométré au premier appel)"""
+        key = (pattern, int(flags))
+        compiled = self._patterns.get(key)
+        if compiled is None:
+            start = time.perf_counter()
+            compiled = re.compile(pattern, flags)
+            self.compile_times[key] = time.perf_counter() - start
+            self._patterns[key] = compiled
+        if label is not None and key not in self.labels:
+            self.labels[key] = label
+        return compiled
+
+    def timings(self):
+        """[(secondes, label, pattern)] du plus coûteux au moins coûteux"""
+        rows = [
+            (seconds, self.labels.get(key, ''), key[0])
+            for key, seconds in self.compile_times.items()
+        ]
+        return sorted(rows, key=lambda row: row[0], reverse=True)
+
+    def report(self, top=10):
+        """Affiche les top patterns les plus longs à compiler"""
+        rows = self.timings()
+        total = sum(row[0] for row in rows)
+        print(f"⏱️  {len(rows)} patterns compilés en {total * 1000:.1f} ms")
+        for seconds, label, pattern in rows[:top]:
+            preview = pattern if len(pattern) <= 70 else pattern[:67] + '...'
+            print(f"   {seconds * 1000:7.2f} ms  {label:<32} {preview}")
+
+
+# Registre partagé par défaut par tous les jeux de règles d'un processus
+DEFAULT_REGISTRY = PatternRegistry()
@@ -0,0 +1,493 @@
+"""
+Réécriture générique des console.* en logger structuré
+
+Les tables des scripts historiques ne couvrent que les appels écrits à la main,
+un par un. Ici chaque appel console.<level>(...) trouvé par le scanner est
+réécrit en un seul parcours : le préfixe [Tag] et la décoration (emoji, « : »
+final) sont retirés du message, les ${...} d'un template literal et les
+arguments suivants deviennent des clés de metadata. Le message reste ainsi
+statique, au format des migrations manuelles. service et operation viennent
+de la classe et de la méthode englobantes (voir scopes.ScopeIndex) :
+
+    logger.info('Message', {
+      metadata: {
+        service: 'EmailService',
+        operation: 'sendSupplierInvitation',
+        contactEmail
+      }
+    });
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+
+from .edits import EditScript
+from .scanner import (
+    ScanError, _previous_significant, _split_args, find_console_calls, is_statement_start, line_indent,
+    mask_literals, scan_balanced, skip_template, split_template,
+)
+from .scopes import ScopeIndex
+
+# À incrémenter quand la forme du code généré change (invalide le cache)
+REWRITER_VERSION = 8
+
+LOGGER_LEVELS = {'log': 'info', 'info': 'info', 'warn': 'warn', 'error': 'error', 'debug': 'debug'}
+# Message utilisé quand le premier argument n'est pas un texte
+DEFAULT_MESSAGES = {'info': 'Information', 'warn': 'Avertissement', 'error': 'Erreur', 'debug': 'Debug'}
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\\n]|\\.)*'|\"(?:[^\"\\\n]|\\.)*\"|`(?:[^`\\$]|\\.|\$(?!\{))*`", re.DOTALL)
+_STARTS_WITH_TEXT = re.compile(r"['\"`]")
+_TAG = re.compile(r'\[([\w .:/-]+)\]\s*')
+# Emoji, puces, séparateurs et \n en tête ; « : », « ... », « = » en fin
+_LEADING_NOISE = re.compile(r"^(?:\\[nt]|\d\ufe0f?\u20e3|[\u2139\u24c2]\ufe0f?|[^\w$\[(«'\"])+")
+_TRAILING_NOISE = re.compile(r"(?:\\[nt]|[\s:=.…\-–—>|])+$")
+_UNESCAPED_QUOTE = re.compile(r"(?<!\\)((?:\\\\)*)'")
+
+_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*$')
+_MEMBER_CHAIN = re.compile(r'[A-Za-z_$][\w$]*(?:\??\.[A-Za-z_$][\w$]*)+$')
+_ERROR_NAME = re.compile(r'(?:e|err|ex|exc|exception|\w*[eE]rror)$')
+_ELAPSED = re.compile(r'(?:Date|performance)\.now\(\)\s*-\s*[\w$.]+$')
+_CONVERSION = re.compile(r'(?:JSON\.stringify|String|Number|Boolean|Math\.round|Math\.floor|Math\.ceil)\(')
+_FORMATTING_CALL = re.compile(
+    r'([\w$.?]+?)\??\.(?:toFixed|toString|toISOString|toLocaleString|toLocaleDateString'
+    r'|join|trim|toUpperCase|toLowerCase|substring|slice)\([^()]*\)$'
+)
+_FALLBACK = re.compile(r'([\w$.?]+?)\s*(?:\?\?|\|\|)\s*[^?|]+$')
+# Unités collées à un ${...} (« ${duration}ms ») : portées par la clé
+_UNIT = re.compile(r'(ms|%)(?![\w])')
+_UNIT_SUFFIXES = {'ms': 'Ms', '%': 'Percent'}
+_EMPTY_BRACKETS = re.compile(r'\(\s*\)|\[\s*\]|"\s*"|\'\s*\'')
+_SPACE_BEFORE_PUNCTUATION = re.compile(r'\s+([,.:;)\]])')
+# « reconnu: ${role}. Redirection » -> « reconnu. Redirection »
+_DANGLING_SEPARATOR = re.compile(r'[:,]\s*(?=[.,;])')
+# console.log('='.repeat(60)) : séparateur visuel, sans contenu
+_SEPARATOR = re.compile(r"""(['"`])[^\w'"`]*\1\.repeat\(\s*\d+\s*\)""")
+# Logger serveur (chemin sans extension), importé par les fichiers de
+# LOGGER_SCOPE qui ne l'importent pas ; il n'est pas chargeable côté client
+LOGGER_MODULE = 'server/utils/logger'
+LOGGER_SCOPE = 'server/'
+# import { a, logger as log } from '...' (hors import type), const { logger: log } = require('...')
+_NAMED_IMPORT = re.compile(r'^import\s*\{([^}]*)\}\s*from\b', re.M)
+_NAMED_REQUIRE = re.compile(r'^(?:const|let|var)\s*\{([^}]*)\}\s*=\s*require\s*\(', re.M)
+# import logger from '...', const logger = ... au niveau du module
+_LOGGER_DECLARATION = re.compile(
+    r'^(?:import\s+logger\s*(?:,|from\b)|(?:export\s+)?(?:const|let|var)\s+logger\b)', re.M)
+# Instruction import statique, sur une ou plusieurs lignes
+_IMPORT_STATEMENT = re.compile(r"""^import(?=[\s{*'"])[^;'"]*?(['"])[^'"\n]*\1[ \t]*;?""", re.M)
+# Module CommonJS : const x = require('...') au niveau du module
+_REQUIRE_STATEMENT = re.compile(
+    r"""^(?:const|let|var)\s[^=;\n]*=\s*require\s*\(\s*(['"])[^'"\n]*\1\s*\)[ \t]*;?""", re.M)
+# Entrée operation d'un objet littéral : « operation: x », « 'operation': x », « operation »
+_OPERATION_ENTRY = re.compile(r"""(['"]?)operation\1\s*(?::|$)""")
+# Membres trop vagues seuls : préfixés par leur objet (error.message -> errorMessage)
+_GENERIC_MEMBERS = {'message', 'id', 'name', 'status', 'code', 'type', 'value', 'data'}
+
+
+def service_from_path(path):
+    """Nom de service déduit du fichier : emailService.ts -> EmailService"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if stem == 'index':
+        stem = os.path.basename(os.path.dirname(path)) or stem
+    parts = [part for part in re.split(r'[^A-Za-z0-9]+', stem) if part]
+    return ''.join(part[0].upper() + part[1:] for part in parts) or 'Application'
+
+
+def _quote(text, quote):
+    """Contenu d'un littéral délimité par quote, ré-écrit entre apostrophes"""
+    if quote == '"':
+        text = text.replace('\\"', '"')
+    elif quote == '`':
+        text = text.replace('\\`', '`').replace('\n', '\\n')
+    if quote != "'":
+        text = _UNESCAPED_QUOTE.sub(r"\1\\'", text)
+    return f"'{text}'"
+
+
+def clean_message(text):
+    """Retire décoration et préfixe [Tag] ; renvoie (message, tag)"""
+    text = _LEADING_NOISE.sub('', text)
+    tag = None
+    match = _TAG.match(text)
+    if match:
+        tag = match.group(1).strip()
+        text = _LEADING_NOISE.sub('', text[match.end():])
+    return _TRAILING_NOISE.sub('', text), tag
+
+
+def metadata_key(expression):
+    """Nom de clé dérivé d'une expression, ou None s'il n'y en a pas d'évident"""
+    expression = expression.strip()
+    if _IDENTIFIER.match(expression):
+        return expression
+    if _MEMBER_CHAIN.match(expression):
+        members = re.split(r'\??\.', expression)
+        if members[-1] == 'length':
+            return members[-2] + 'Count'
+        if members[-1] in _GENERIC_MEMBERS:
+            return members[-2] + members[-1][0].upper() + members[-1][1:]
+        return members[-1]
+    if _ELAPSED.match(expression):
+        return 'duration'
+    match = _CONVERSION.match(expression)
+    if match:
+        # JSON.stringify(x), String(x) ... : clé de l'argument
+        inner = expression[match.end():-1].split(',')[0]
+        return metadata_key(inner)
+    match = _FORMATTING_CALL.match(expression) or _FALLBACK.match(expression)
+    if match:
+        # x.toFixed(2), items.join(', '), x ?? 'n/a' ... : clé du receveur
+        return metadata_key(match.group(1))
+    return None
+
+
+def metadata_entries(expression, taken, default_key='details', key=None):
+    """Lignes de metadata pour un argument (clés uniques dans taken)"""
+    if expression.startswith('...'):
+        # console.log('x', ...items) : les éléments étalés, regroupés en tableau
+        spread = expression[3:].strip()
+        key = _unique(key or metadata_key(spread) or default_key, taken)
+        return [f'{key}: [{expression}]']
+    if key in (None, expression) and _IDENTIFIER.match(expression) and _ERROR_NAME.match(expression):
+        return [
+            f'{_unique("error", taken)}: {expression} instanceof Error ? {expression}.message : String({expression})',
+            f'{_unique("stack", taken)}: {expression} instanceof Error ? {expression}.stack : undefined',
+        ]
+    key = _unique(key or metadata_key(expression) or default_key, taken)
+    return [expression if key == expression else f'{key}: {expression}']
+
+
+def _unique(key, taken):
+    candidate = key
+    suffix = 2
+    while candidate in taken:
+        candidate = f'{key}{suffix}'
+        suffix += 1
+    taken.add(candidate)
+    return candidate
+
+
+def lower_template(template):
+    """Sépare un template literal en message statique et placeholders
+
+    `[SQLEngine] Query ${queryId} executed in ${Date.now() - start}ms` donne
+    ('Query executed in', 'SQLEngine', [('queryId', 'queryId'),
+    ('durationMs', 'Date.now() - start')]).
+    """
+    chunks, expressions = split_template(template)
+    text = [chunks[0]]
+    placeholders = []
+    for (start, end), chunk in zip(expressions, chunks[1:]):
+        expression = template[start:end].strip()
+        key = metadata_key(expression)
+        unit = _UNIT.match(chunk)
+        if unit:
+            chunk = chunk[unit.end():]
+            key = (key or 'value') + _UNIT_SUFFIXES[unit.group(1)]
+        placeholders.append((key, expression))
+        text.append(chunk)
+    static = _EMPTY_BRACKETS.sub('', ' '.join(text))
+    static = _SPACE_BEFORE_PUNCTUATION.sub(r'\1', re.sub(r'\s+', ' ', static))
+    static = _DANGLING_SEPARATOR.sub('', static)
+    message, tag = clean_message(static.strip())
+    return message, tag, placeholders
+
+
+def _message_and_rest(args):
+    """(message source, tag, placeholders, arguments restants) pour un appel"""
+    if not args:
+        return None, None, [], []
+    first = args[0]
+    if _STRING_LITERAL.fullmatch(first):
+        message, tag = clean_message(first[1:-1])
+        return (_quote(message, first[0]) if message else None), tag, [], args[1:]
+    if first.startswith('`'):
+        try:
+            whole = skip_template(first, 0) == len(first)
+        except ScanError:
+            whole = False
+        if whole:
+            message, tag, placeholders = lower_template(first)
+            return (_quote(message, '`') if message else None), tag, placeholders, args[1:]
+    if _SEPARATOR.fullmatch(first):
+        return None, None, [], args[1:]
+    if _STARTS_WITH_TEXT.match(first):
+        # Concaténation : conservée telle quelle
+        return first, None, [], args[1:]
+    return None, None, [], args
+
+
+def _names_operation(expression):
+    """Vrai si expression est un objet littéral avec une clé operation de premier niveau"""
+    if not expression.startswith('{'):
+        return False
+    try:
+        close, commas = scan_balanced(expression, 1, '}')
+    except ScanError:
+        return False
+    return any(_OPERATION_ENTRY.match(expression, start, end)
+               for start, end in _split_args(expression, 1, close, commas))
+
+
+def logger_binding(source):
+    """Nom sous lequel source accède au logger (« logger », ou l'alias d'un
+    import { logger as log }), None s'il ne l'importe ni ne le déclare"""
+    alias = None
+    for match in _NAMED_IMPORT.finditer(source):
+        for item in match.group(1).split(','):
+            words = item.split()
+            if words[:1] == ['type']:
+                continue
+            if words == ['logger']:
+                return 'logger'
+            if len(words) == 3 and words[0] == 'logger' and words[1] == 'as':
+                alias = alias or words[2]
+    for match in _NAMED_REQUIRE.finditer(source):
+        for item in match.group(1).split(','):
+            words = item.replace(':', ' : ').split()
+            if words == ['logger']:
+                return 'logger'
+            if len(words) == 3 and words[0] == 'logger' and words[1] == ':':
+                alias = alias or words[2]
+    if _LOGGER_DECLARATION.search(source):
+        return 'logger'
+    return alias
+
+
+def is_logger_module(path):
+    """Vrai pour le fichier du logger lui-même : ses console.* ne sont pas réécrits"""
+    return os.path.splitext(path)[0] == LOGGER_MODULE
+
+
+def logger_import_module(path):
+    """Chemin relatif du logger importé depuis path, ou None si path n'est pas
+    sous LOGGER_SCOPE (ou est le logger lui-même)"""
+    if not path.startswith(LOGGER_SCOPE) or is_logger_module(path):
+        return None
+    module = posixpath.relpath(LOGGER_MODULE, posixpath.dirname(path))
+    if not module.startswith('.'):
+        module = './' + module
+    return module
+
+
+def logger_import_edit(source, path, origin='generic'):
+    """Modification qui ajoute l'import du logger après les imports de source
+
+    None si path n'est pas sous LOGGER_SCOPE (ou est le logger lui-même).
+    Guillemets et point-virgule suivent le dernier import du fichier ; un
+    module CommonJS (require sans import) reçoit un require.
+    """
+    module = logger_import_module(path)
+    if module is None:
+        return None
+    last = None
+    for last in _IMPORT_STATEMENT.finditer(source):
+        pass
+    commonjs = last is None
+    if commonjs:
+        for last in _REQUIRE_STATEMENT.finditer(source):
+            pass
+    if last is None:
+        # Aucun import : en tête, après une éventuelle ligne #!
+        start = source.find('\n') + 1 if source.startswith('#!') else 0
+        return (start, start, f"import {{ logger }} from '{module}';\n\n", origin)
+    quote = last.group(1)
+    semicolon = ';' if last.group().endswith(';') else ''
+    if commonjs:
+        statement = f'const {{ logger }} = require({quote}{module}{quote}){semicolon}'
+    else:
+        statement = f'import {{ logger }} from {quote}{module}{quote}{semicolon}'
+    return (last.end(), last.end(), '\n' + statement, origin)
+
+
+def render_call(call, source, service, operation=None, logger='logger'):
+    """Code <logger>.<level>(...) remplaçant call, ou None pour le supprimer
+
+    service est celui de la classe englobante ou du fichier ; un préfixe
+    [Tag] du message qui en diffère est gardé dans une clé tag. operation
+    (celle de la portée) est omise si un argument objet nomme déjà la sienne.
+    logger est le nom sous lequel le fichier accède au logger.
+    """
+    level = LOGGER_LEVELS[call.level]
+    message, tag, placeholders, rest = _message_and_rest(call.arg_sources(source))
+    if message is None and not rest and not placeholders:
+        return None
+    if message is None:
+        message = f"'{DEFAULT_MESSAGES[level]}'"
+
+    taken = {'service'}
+    entries = [f"service: '{service}'"]
+    if tag and tag != service:
+        taken.add('tag')
+        entries.append(f"tag: '{tag}'")
+    if operation and not any(_names_operation(expression) for expression in rest):
+        taken.add('operation')
+        entries.append(f"operation: '{operation}'")
+    for key, expression in placeholders:
+        entries.extend(metadata_entries(expression, taken, default_key='value', key=key))
+    for expression in rest:
+        entries.extend(metadata_entries(expression, taken))
+
+    indent = line_indent(source, call.start)
+    body = f',\n{indent}    '.join(entries)
+    semicolon = ';' if call.semicolon else ''
+    return (f"{logger}.{level}({message}, {{\n"
+            f"{indent}  metadata: {{\n"
+            f"{indent}    {body}\n"
+            f"{indent}  }}\n"
+            f"{indent}}}){semicolon}")
+
+
+def console_call_edits(source, service, origin='generic', path=None):
+    """Modifications (début, fin, remplacement, origine) qui réécrivent les console.* de source
+
+    Avec path, les appels passent par le logger que le fichier importe déjà
+    (alias compris) ; s'il n'en importe aucun, l'import du logger serveur est
+    ajouté (voir logger_import_edit).
+
+    Un appel sans contenu (séparateur « ===== ») est supprimé avec sa ligne
+    quand il forme une instruction à lui seul après ; { ou } (pas le corps
+    sans accolades d'un if, else ou for), laissé tel quel sinon.
+    Lève ScanError si le source ne peut pas être découpé.
+    """
+    calls = find_console_calls(source)
+    if not calls:
+        return []
+    logger = 'logger'
+    import_edit = None
+    if path is not None:
+        binding = logger_binding(source)
+        if binding is None:
+            import_edit = logger_import_edit(source, path, origin)
+        else:
+            logger = binding
+    scopes = ScopeIndex(source)
+    code = None
+    edits = []
+    for call in calls:
+        # La classe englobante prime sur le nom du fichier
+        replacement = render_call(call, source, scopes.class_at(call.start) or service,
+                                  scopes.operation_at(call.start), logger)
+        start, end = call.start, call.end
+        if replacement is None:
+            line_end = source.find('\n', end)
+            line_end = len(source) if line_end < 0 else line_end
+            if not is_statement_start(source, start) or source[end:line_end].strip():
+                continue
+            if code is None:
+                # Commentaires blanchis : seul le code précède l'appel
+                code = mask_literals(source)
+            previous = _previous_significant(code, start)
+            if previous >= 0 and code[previous] not in ';{}':
+                # Corps sans accolades : supprimer la ligne rendrait l'instruction suivante conditionnelle
+                continue
+            start = source.rfind('\n', 0, start) + 1
+            if edits:
+                # Appel réécrit plus tôt sur la même ligne : il est conservé
+                start = max(start, edits[-1][1])
+            end = min(line_end + 1, len(source))
+            replacement = ''
+        edits.append((start, end, replacement, origin))
+    if edits and import_edit is not None:
+        edits.append(import_edit)
+        # À même position, l'import précède l'appel
+        edits.sort(key=lambda edit: (edit[0], edit[1]))
+    return edits
+
+
+def rewrite_console_calls(source, service, path=None):
+    """Réécrit tous les console.* de source ; renvoie (source, nombre de modifications)
+
+    path : voir console_call_edits. Lève ScanError si le source ne peut pas
+    être découpé. Si les modifications ne se fusionnent pas (conflit), elles
+    sont appliquées une à une, de la dernière à la première, comme le fait
+    l'application séquentielle des jeux de règles.
+    """
+    edits = console_call_edits(source, service, path=path)
+    script = EditScript()
+    if script.merge(edits):
+        return script.apply(source), len(script)
+    # En partant de la fin, les positions des modifications restantes restent valides
+    for start, end, replacement, _origin in reversed(edits):
+        source = source[:start] + replacement + source[end:]
+    return source, len(edits)
+
+
+class GenericRules:
+    """Réécriture générique d'un fichier, utilisable comme un RuleSet"""
+
+    requires_logger = True
+    collapse_blank_lines = False
+
+    def __init__(self, path, service=None):
+        self.path = path
+        self.service = service or service_from_path(path)
+        self.name = f'generic:{self.service}'
+        # Le logger lui-même n'est pas réécrit : ses appels se rappelleraient
+        self.skipped = is_logger_module(path)
+        # Import ajouté aux fichiers qui n'importent pas le logger (voir logger_import_edit)
+        self.import_module = logger_import_module(path)
+        self.importable = self.import_module is not None
+        self._fingerprint = None
+
+    def compile(self, registry=None):
+        # Rien à compiler : le scanner n'utilise que des patterns de module
+        return []
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            # La réécriture dépend du service et, par l'import ajouté, du
+            # répertoire : seules les copies au même niveau partagent cache et
+            # migration
+            payload = json.dumps(['generic', REWRITER_VERSION, self.service, self.import_module,
+                                  self.skipped])
+            self._fingerprint = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+    @property
+    def rule_count(self):
+        return 1
+
+    def can_apply(self, content):
+        """Faux seulement si content a de vrais appels console.* sans logger
+        importé ni importable"""
+        if self.skipped or self.importable or 'console.' not in content or logger_binding(content):
+            return True
+        try:
+            return not find_console_calls(content)
+        except ScanError:
+            # Signalé par edits
+            return True
+
+    def outputs(self):
+        # Appels rendus à partir du source : rien d'énumérable à l'avance
+        return None
+
+    def reads(self, text):
+        """Vrai si text peut contenir un appel à réécrire"""
+        return not self.skipped and 'console.' in text
+
+    def edits(self, content):
+        """Modifications des appels de content (EditScript ; ScanError si non analysable)"""
+        script = EditScript()
+        if not self.skipped:
+            script.merge(console_call_edits(content, self.service, self.name, self.path))
+        return script
+
+    def apply(self, content):
+        """Contenu réécrit (ScanError si le fichier ne peut être analysé)"""
+        return self.subn(content)[0]
+
+    def subn(self, content):
+        """(contenu réécrit, nombre de modifications)"""
+        if self.skipped:
+            return content, 0
+        return rewrite_console_calls(content, self.service, self.path)
+
+
+def generic_rule_sets(paths):
+    """Un GenericRules par chemin, à placer après les règles manuelles"""
+    return [GenericRules(path) for path in paths]
@@ -0,0 +1,284 @@
+"""
+Jeux de règles de migration par fichier cible
+
+Un RuleSet regroupe, pour un fichier, les tables de remplacements appliquées
+dans l'ordre où les scripts historiques les exécutaient.
+"""
+
+import hashlib
+import json
+
+from .edits import EditScript, changed_span
+from .engine import CombinedReplacer
+from .registry import DEFAULT_REGISTRY
+
+# Nettoyage des lignes vides laissées par les logs supprimés, autour des
+# modifications seulement (voir collapse_blank_runs)
+BLANK_LINES_PATTERN = r'\n\s*\n\s*\n'
+# Les remplacements supposent que le fichier importe déjà le logger
+LOGGER_IMPORT = 'import { logger }'
+
+BLANK_LINES = DEFAULT_REGISTRY.compile(BLANK_LINES_PATTERN, label='blank-lines')
+# Un blanc (str.isspace) encodé en UTF-8 : en bytes, \s ne connaît que l'ASCII
+SPACE_BYTES = (rb'(?:[\t-\r\x1c-\x1f ]|\xc2[\x85\xa0]|\xe1\x9a\x80'
+               rb'|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80)')
+# BLANK_LINES sur les octets (mode octets), blancs Unicode compris
+BLANK_LINES_BYTES = DEFAULT_REGISTRY.compile(
+    rb'\n' + SPACE_BYTES + rb'*\n' + SPACE_BYTES + rb'*\n', label='blank-lines:bytes')
+# Variante pour une fenêtre entièrement ASCII, sans alternative par octet
+BLANK_LINES_ASCII = DEFAULT_REGISTRY.compile(
+    rb'\n[\t-\r\x1c-\x1f ]*\n[\t-\r\x1c-\x1f ]*\n', label='blank-lines:ascii')
+# Blancs ASCII, comparés aux octets (entiers) d'un contenu en bytes
+_ASCII_SPACES = frozenset(b'\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f ')
+# Suite de blancs qui commence en une position, en str et en octets
+_SPACE_RUN = DEFAULT_REGISTRY.compile(r'\s*', label='space-run')
+_SPACE_RUN_BYTES = DEFAULT_REGISTRY.compile(SPACE_BYTES + rb'*', label='space-run:bytes')
+# Blancs non ASCII, par longueur d'encodage, pour reculer d'un caractère
+_WIDE_SPACES = (
+    (3, frozenset([b'\xe1\x9a\x80', b'\xe2\x81\x9f', b'\xe3\x80\x80']
+                  + [b'\xe2\x80' + bytes([c]) for c in (*range(0x80, 0x8b), 0xa8, 0xa9, 0xaf)])),
+    (2, frozenset([b'\xc2\x85', b'\xc2\xa0'])),
+)
+
+
+def _space_before(content, pos):
+    """Longueur du blanc qui finit en pos (0 si aucun)"""
+    if isinstance(content, str):
+        return 1 if pos > 0 and content[pos - 1].isspace() else 0
+    if pos > 0 and content[pos - 1] in _ASCII_SPACES:
+        return 1
+    for width, spaces in _WIDE_SPACES:
+        if pos >= width and content[pos - width:pos] in spaces:
+            return width
+    return 0
+
+
+def _space_run_end(content, pos):
+    """Fin de la suite de blancs qui commence en pos"""
+    run = _SPACE_RUN if isinstance(content, str) else _SPACE_RUN_BYTES
+    return run.match(content, pos).end()
+
+
+def collapse_blank_runs(content, spans):
+    """Réduit à une ligne vide les suites de lignes vides qui touchent spans ;
+    renvoie (contenu, nombre de suites réduites)
+
+    spans : étendues (début, fin) triées des remplacements dans content.
+    Chaque étendue est élargie aux blancs qui l'entourent ; le nettoyage ne
+    porte que sur ces fenêtres. BLANK_LINES ne reconnaît que des blancs :
+    une fenêtre bordée de non-blancs donne le même résultat que le passage
+    sur tout le fichier, sans toucher les lignes vides éloignées des
+    modifications. Le coût suit le nombre de modifications. content peut
+    aussi être en octets.
+    """
+    windows = []
+    for start, end in spans:
+        width = _space_before(content, start)
+        while width:
+            start -= width
+            width = _space_before(content, start)
+        end = _space_run_end(content, end)
+        if windows and start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], end)
+        else:
+            windows.append([start, end])
+    if isinstance(content, str):
+        blank_lines, blank_line = BLANK_LINES, '\n\n'
+    else:
+        blank_lines, blank_line = BLANK_LINES_BYTES, b'\n\n'
+    pieces = []
+    pos = 0
+    total = 0
+    newline = blank_line[:1]
+    for start, end in windows:
+        # Il faut trois fins de ligne pour une suite à réduire
+        if content.count(newline, start, end) < 3:
+            continue
+        window = content[start:end]
+        if blank_lines is BLANK_LINES_BYTES and window.isascii():
+            window, count = BLANK_LINES_ASCII.subn(blank_line, window)
+        else:
+            window, count = blank_lines.subn(blank_line, window)
+        if not count:
+            continue
+        pieces.append(content[pos:start])
+        pieces.append(window)
+        pos = end
+        total += count
+    if not total:
+        return content, 0
+    pieces.append(content[pos:])
+    return content[:0].join(pieces), total
+
+
+class RuleSet:
+    """Tables de remplacements ordonnées pour un fichier cible"""
+
+    def __init__(self, name, path, tables, collapse_blank_lines=False, requires_logger=False,
+                 summaries=None):
+        self.name = name
+        self.path = path
+        # tables : [(replacements, flags), ...]
+        self.tables = [(list(replacements), flags) for replacements, flags in tables]
+        self.collapse_blank_lines = collapse_blank_lines
+        self.requires_logger = requires_logger
+        # Analyse des tables déjà faite (catalogue compilé), une par table
+        self._summaries = summaries
+        self._replacers = None
+        self._fingerprint = None
+        self._composable = None
+
+    def compile(self, registry=None):
+        """Compile les tables via le registre (une seule fois)"""
+        if self._replacers is None:
+            self._replacers = [
+                CombinedReplacer(replacements, flags, registry=registry,
+                                 name=f'{self.name}#{index}',
+                                 summary=self._summaries[index] if self._summaries else None)
+                for index, (replacements, flags) in enumerate(self.tables)
+            ]
+        return self._replacers
+
+    def summaries(self):
+        """Analyse de chaque table compilée, à repasser au constructeur"""
+        return [replacer.summary() for replacer in self.replacers]
+
+    @property
+    def replacers(self):
+        """Tables compilées à la première utilisation"""
+        return self.compile()
+
+    @property
+    def fingerprint(self):
+        """Empreinte stable des règles (clé du cache incrémental)"""
+        if self._fingerprint is None:
+            payload = json.dumps(
+                [self.name, self.path, self.tables, self.collapse_blank_lines, self.requires_logger],
+                ensure_ascii=False,
+            )
+            self._fingerprint = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+    @property
+    def rule_count(self):
+        return sum(len(replacements) for replacements, _ in self.tables)
+
+    def can_apply(self, content):
+        """Vérifie les prérequis du fichier (import du logger) ; content en str ou en octets"""
+        if not self.requires_logger:
+            return True
+        needle = LOGGER_IMPORT if isinstance(content, str) else LOGGER_IMPORT.encode('utf-8')
+        return content.find(needle) >= 0
+
+    def outputs(self):
+        """Textes que les tables peuvent produire"""
+        return [text for replacer in self.replacers for text in replacer.outputs()]
+
+    def reads(self, text):
+        """Vrai si une règle reconnaît quelque chose dans text"""
+        return any(pattern.search(text)
+                   for replacer in self.replacers for pattern in replacer.patterns)
+
+    @property
+    def composable(self):
+        """Vrai si toutes les tables peuvent être relevées sur le texte d'origine
+
+        Chaque table doit être indépendante, et aucune ne doit reconnaître le
+        texte produit par une table précédente.
+        """
+        if self._composable is None:
+            replacers = self.replacers
+            self._composable = all(replacer.independent for replacer in replacers) and not any(
+                pattern.search(text)
+                for i, earlier in enumerate(replacers)
+                for text in earlier.outputs()
+                for later in replacers[i + 1:]
+                for pattern in later.patterns
+            )
+        return self._composable
+
+    @property
+    def byte_ready(self):
+        """Vrai si edits peut travailler directement sur les octets UTF-8"""
+        return self.composable and all(replacer.byte_ready for replacer in self.replacers)
+
+    def edits(self, content):
+        """Modifications de toutes les tables relevées sur content (EditScript)
+
+        None si les tables doivent s'enchaîner sur le texte réécrit. Le script
+        renvoyé porte ses conflits éventuels : il n'est alors pas applicable.
+        Le nettoyage des lignes vides n'en fait pas partie (collapse_blank_runs).
+        """
+        if not self.composable:
+            return None
+        script = EditScript()
+        for replacer in self.replacers:
+            if not replacer.collect(content, script):
+                break
+        return script
+
+    def apply(self, content):
+        """Applique toutes les tables au contenu, dans l'ordre"""
+        script = self.edits(content)
+        spans = []
+        if script is not None and not script.conflicts:
+            content = script.apply(content, spans)
+        else:
+            original = content
+            for replacer in self.replacers:
+                content = replacer.sub(content)
+            if content != original:
+                # Tables enchaînées : la zone modifiée tient lieu d'étendue
+                spans.append(changed_span(original, content))
+        if self.collapse_blank_lines:
+            content = collapse_blank_runs(content, spans)[0]
+        return content
+
+    def cleanup(self, original, content):
+        """Nettoyage des lignes vides de content, résultat des tables sur original
+
+        Mêmes étendues que apply ; renvoie (contenu, nombre de suites réduites).
+        """
+        script = self.edits(original)
+        spans = []
+        if script is not None and not script.conflicts:
+            script.apply(original, spans)
+        elif content != original:
+            spans.append(changed_span(original, content))
+        return collapse_blank_runs(content, spans)
+
+    def __getstate__(self):
+        # Les tables compilées sont reconstruites dans chaque processus
+        state = self.__dict__.copy()
+        state['_replacers'] = None
+        state['_composable'] = None
+        return state
+
+
+# (jeu antérieur, jeu suivant) -> le suivant peut être relevé sur le même texte
+_FOLLOWS = {}
+
+
+def follows(earlier, rules):
+    """Vrai si rules ne reconnaît rien de ce que produisent les jeux earlier
+
+    Ses modifications peuvent alors être relevées sur le même texte que les
+    leurs et fusionnées dans le même EditScript.
+    """
+    for previous in earlier:
+        key = (previous.fingerprint, rules.fingerprint)
+        result = _FOLLOWS.get(key)
+        if result is None:
+            outputs = previous.outputs()
+            result = _FOLLOWS[key] = outputs is not None and not any(
+                rules.reads(text) for text in outputs)
+        if not result:
+            return False
+    return True
+
+
+def compile_rule_sets(rule_sets, registry=None):
+    """Compile tous les jeux de règles au chargement plutôt qu'au premier fichier"""
+    for rules in rule_sets:
+        rules.compile(registry)
+    return rule_sets
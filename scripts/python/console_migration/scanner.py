@@ -0,0 +1,295 @@
+"""
+Analyse lexicale légère de TypeScript/JavaScript
+
+Repère les appels console.(log|warn|error|info|debug)(...) réels en un seul
+parcours linéaire : commentaires, chaînes, template literals (avec leurs
+${...} imbriqués) et expressions régulières sont sautés, les parenthèses sont
+équilibrées et les arguments découpés aux virgules de premier niveau.
+"""
+
+import re
+
+CONSOLE_LEVELS = ('log', 'warn', 'error', 'info', 'debug')
+
+_CONSOLE_OR_SKIP = re.compile(
+    r"console\s*\.\s*(log|warn|error|info|debug)\s*\(|['\"`/]"
+)
+_LITERAL_START = re.compile(r"['\"`/]")
+_BALANCED = re.compile(r"[(){}\[\],'\"`/]")
+_TEMPLATE_STOP = re.compile(r"[`\\]|\$\{")
+_STRINGS = {
+    "'": re.compile(r"'(?:[^'\\\n]|\\.)*'", re.DOTALL),
+    '"': re.compile(r'"(?:[^"\\\n]|\\.)*"', re.DOTALL),
+}
+_REGEX_LITERAL = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[a-z]*")
+_IDENTIFIER_CHARS = re.compile(r'[\w$]')
+
+# Après ces mots-clés, un « / » ouvre une expression régulière
+_REGEX_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new',
+    'delete', 'void', 'throw', 'instanceof', 'yield', 'await',
+}
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+
+
+class ScanError(ValueError):
+    """Source impossible à découper (délimiteur non fermé)"""
+
+
+class ConsoleCall:
+    """Un appel console.<level>(...) trouvé dans le source"""
+
+    __slots__ = ('start', 'end', 'level', 'args', 'open_paren', 'close_paren', 'semicolon')
+
+    def __init__(self, start, end, level, args, open_paren, close_paren, semicolon):
+        self.start = start
+        self.end = end
+        self.level = level
+        # [(début, fin)] de chaque argument, espaces exclus
+        self.args = args
+        self.open_paren = open_paren
+        self.close_paren = close_paren
+        self.semicolon = semicolon
+
+    def arg_sources(self, source):
+        return [source[start:end] for start, end in self.args]
+
+    def __repr__(self):
+        return f'ConsoleCall({self.level!r}, {self.start}:{self.end})'
+
+
+def _previous_significant(source, pos):
+    """Position du dernier caractère non blanc avant pos (ou -1)"""
+    index = pos - 1
+    while index >= 0 and source[index] in ' \t\r\n':
+        index -= 1
+    return index
+
+
+def _regex_allowed(source, pos):
+    """Vrai si un « / » en pos ouvre une expression régulière"""
+    index = _previous_significant(source, pos)
+    if index < 0:
+        return True
+    char = source[index]
+    if char in _REGEX_PRECEDERS:
+        return True
+    if _IDENTIFIER_CHARS.match(char):
+        # Remonter le mot à la main : une recherche [\w$]+$ depuis 0 serait quadratique
+        start = index
+        while start > 0 and _IDENTIFIER_CHARS.match(source[start - 1]):
+            start -= 1
+        return source[start:index + 1] in _REGEX_KEYWORDS
+    return False
+
+
+def skip_string(source, pos):
+    """Fin de la chaîne ouverte en pos (tolère une chaîne non fermée)"""
+    match = _STRINGS[source[pos]].match(source, pos)
+    return match.end() if match else pos + 1
+
+
+def skip_template(source, pos):
+    """Fin du template literal ouvert en pos, ${...} imbriqués compris"""
+    pos += 1
+    while True:
+        match = _TEMPLATE_STOP.search(source, pos)
+        if match is None:
+            raise ScanError(f'template literal non fermé à {pos}')
+        token = match.group()
+        if token == '`':
+            return match.end()
+        if token == '\\':
+            pos = match.end() + 1
+        else:
+            pos = scan_balanced(source, match.end(), '}')[0] + 1
+
+
+def split_template(source, pos=0):
+    """Découpe le template literal ouvert en pos
+
+    Renvoie (textes statiques, [(début, fin)] des expressions ${...}) : il y a
+    toujours un texte statique de plus que d'expressions.
+    """
+    chunks = []
+    expressions = []
+    chunk_start = pos = pos + 1
+    while True:
+        match = _TEMPLATE_STOP.search(source, pos)
+        if match is None:
+            raise ScanError(f'template literal non fermé à {pos}')
+        token = match.group()
+        if token == '\\':
+            pos = match.end() + 1
+            continue
+        chunks.append(source[chunk_start:match.start()])
+        if token == '`':
+            return chunks, expressions
+        close = scan_balanced(source, match.end(), '}')[0]
+        expressions.append((match.end(), close))
+        chunk_start = pos = close + 1
+
+
+def skip_slash(source, pos):
+    """Fin du commentaire, de la regex ou de l'opérateur « / » en pos"""
+    following = source[pos + 1:pos + 2]
+    if following == '/':
+        end = source.find('\n', pos)
+        return len(source) if end < 0 else end
+    if following == '*':
+        end = source.find('*/', pos + 2)
+        if end < 0:
+            raise ScanError(f'commentaire non fermé à {pos}')
+        return end + 2
+    if _regex_allowed(source, pos):
+        match = _REGEX_LITERAL.match(source, pos)
+        if match:
+            return match.end()
+    return pos + 1
+
+
+def scan_balanced(source, pos, close):
+    """Parcourt du code jusqu'au délimiteur close de premier niveau
+
+    Renvoie (position de close, positions des virgules de premier niveau).
+    """
+    depth = 0
+    commas = []
+    search = _BALANCED.search
+    while True:
+        match = search(source, pos)
+        if match is None:
+            raise ScanError(f'{close!r} attendu après {pos}')
+        char = match.group()
+        start = match.start()
+        if char in '([{':
+            depth += 1
+            pos = start + 1
+        elif char in ')]}':
+            if depth == 0:
+                if char != close:
+                    raise ScanError(f'{char!r} inattendu à {start}')
+                return start, commas
+            depth -= 1
+            pos = start + 1
+        elif char == ',':
+            if depth == 0:
+                commas.append(start)
+            pos = start + 1
+        elif char == '`':
+            pos = skip_template(source, start)
+        elif char == '/':
+            pos = skip_slash(source, start)
+        else:
+            pos = skip_string(source, start)
+
+
+def _split_args(source, start, end, commas):
+    bounds = []
+    for comma in commas + [end]:
+        arg_start, arg_end = start, comma
+        while arg_start < arg_end and source[arg_start].isspace():
+            arg_start += 1
+        while arg_end > arg_start and source[arg_end - 1].isspace():
+            arg_end -= 1
+        bounds.append((arg_start, arg_end))
+        start = comma + 1
+    # console.log() et virgule finale : pas d'argument vide
+    return [bound for bound in bounds if bound[0] < bound[1]]
+
+
+def iter_console_calls(source):
+    """Itère sur les appels console.* réels, dans l'ordre du source"""
+    pos = 0
+    search = _CONSOLE_OR_SKIP.search
+    while True:
+        match = search(source, pos)
+        if match is None:
+            return
+        token = match.group()
+        start = match.start()
+        if token in ('"', "'"):
+            pos = skip_string(source, start)
+        elif token == '`':
+            pos = skip_template(source, start)
+        elif token == '/':
+            pos = skip_slash(source, start)
+        elif start > 0 and (_IDENTIFIER_CHARS.match(source[start - 1]) or source[start - 1] == '.'):
+            # myconsole.log(...) ou this.console.log(...)
+            pos = start + 1
+        else:
+            open_paren = match.end() - 1
+            close_paren, commas = scan_balanced(source, match.end(), ')')
+            end = close_paren + 1
+            semicolon = source.startswith(';', end)
+            if semicolon:
+                end += 1
+            args = _split_args(source, match.end(), close_paren, commas)
+            yield ConsoleCall(start, end, match.group(1), args, open_paren, close_paren, semicolon)
+            pos = close_paren + 1
+
+
+def literal_spans(source):
+    """(début, fin) des commentaires, chaînes, templates et regex de source, dans l'ordre"""
+    pos = 0
+    search = _LITERAL_START.search
+    while True:
+        match = search(source, pos)
+        if match is None:
+            return
+        start = match.start()
+        token = match.group()
+        if token == '`':
+            end = skip_template(source, start)
+        elif token == '/':
+            end = skip_slash(source, start)
+            if end == start + 1:
+                # Simple division : rien à blanchir
+                pos = end
+                continue
+        else:
+            end = skip_string(source, start)
+        yield start, end
+        pos = end
+
+
+def mask_literals(source):
+    """Copie de source où commentaires, chaînes, templates et regex sont blanchis
+
+    Les positions et les retours à la ligne sont conservés : des expressions
+    régulières peuvent ensuite chercher la structure du code sans faux positifs.
+    """
+    pieces = []
+    pos = 0
+    for start, end in literal_spans(source):
+        pieces.append(source[pos:start])
+        pieces.append(_blank(source[start:end]))
+        pos = end
+    pieces.append(source[pos:])
+    return ''.join(pieces)
+
+
+def _blank(text):
+    if '\n' not in text:
+        return ' ' * len(text)
+    return re.sub(r'[^\n]', ' ', text)
+
+
+def find_console_calls(source):
+    """Liste des appels console.* réels (voir iter_console_calls)"""
+    return list(iter_console_calls(source))
+
+
+def line_indent(source, pos):
+    """Indentation de la ligne contenant pos"""
+    line_start = source.rfind('\n', 0, pos) + 1
+    index = line_start
+    while index < len(source) and source[index] in ' \t':
+        index += 1
+    return source[line_start:index]
+
+
+def is_statement_start(source, pos):
+    """Vrai si seul du blanc précède pos sur sa ligne"""
+    line_start = source.rfind('\n', 0, pos) + 1
+    return source[line_start:pos].strip() == ''
@@ -0,0 +1,309 @@
+"""
+Index des portées (classes, fonctions, méthodes) d'un fichier TypeScript
+
+Le fichier est parcouru une fois : les littéraux sont blanchis, les accolades
+appariées, puis chaque en-tête de classe ou de fonction nommée est rattaché à
+son corps. Retrouver la méthode ou la classe qui englobe une position est
+ensuite une recherche dichotomique (bisect) suivie de la remontée des parents,
+sans reparcourir le source.
+
+Dans un fichier aux accolades déséquilibrées (« }); » oublié ou doublé par
+une migration manuelle), la fin de chaque portée est retrouvée d'après
+l'indentation (voir _ends_by_indent).
+"""
+
+import re
+from bisect import bisect_right
+
+from .scanner import mask_literals
+
+_NAME = r'[A-Za-z_$][\w$]*'
+_MODIFIERS = r'(?:(?:export|default|public|private|protected|static|async|readonly|override|abstract|get|set)\s+)*'
+_TYPE_PARAMS = r'(?:<[^<>()]*(?:<[^<>()]*>[^<>()]*)*>)?'
+# Annotation de type sur une ligne, virgules seulement entre chevrons
+_ANNOTATION = r'(?::(?:[^=;{}()\[\]<>,\n]|<[^<>\n]*(?:<[^<>\n]*>[^<>\n]*)*>)+?)?'
+# Après les paramètres : corps, ou annotation de retour puis corps
+_BODY_OR_ANNOTATION = re.compile(r'\s*([:{])')
+_TYPE_TOKEN = re.compile(r'=>|[<>()\[\]{}|&?,:;=]')
+# Après ces jetons, une accolade ouvre un type objet et non le corps
+_TYPE_EXPECTED = {':', '=>', '|', '&', '?', ','}
+
+# Les patterns commencent par un littéral : re les cherche sans tester chaque position
+_CLASS = re.compile(rf'class\s+({_NAME})[^{{;]*\{{')
+_FUNCTION = re.compile(rf'function\s*\*?\s*({_NAME})\s*{_TYPE_PARAMS}\s*\(')
+_METHOD = re.compile(rf'^[ \t]*{_MODIFIERS}\*?({_NAME})\s*\??\s*{_TYPE_PARAMS}\s*\(', re.MULTILINE)
+# Corps de fonction anonyme : « => { » ou « function (...) { »
+_ARROW_TOKEN = re.compile(r'=>\s*\{')
+_ANONYMOUS_FUNCTION = re.compile(r'function\s*\*?\s*\(')
+# En-tête qui nomme la fonction, juste avant ses paramètres :
+# const name = async (...) => {  /  name: (...) => {  /  name = function (...) {
+_ARROW_HEAD = re.compile(
+    rf'(?:\b(?:const|let|var)\s+|^[ \t]*{_MODIFIERS})({_NAME})\s*{_ANNOTATION}[:=]\s*'
+    rf'(?:async\s+)?(?:function\s*\*?\s*)?{_TYPE_PARAMS}\s*$',
+    re.MULTILINE,
+)
+_SINGLE_PARAM = re.compile(rf'({_NAME})\s*$')
+_RETURN_ANNOTATION = re.compile(r'\s*:[^=;{}()]*$')
+_IDENTIFIER_CHAR = re.compile(r'[\w$]')
+
+_PARENS = re.compile(r'[()]')
+_LINE_CLOSER = re.compile(r'^([ \t]*)\}', re.MULTILINE)
+
+_NOT_METHODS = {
+    'if', 'for', 'while', 'switch', 'catch', 'with', 'return', 'function',
+    'typeof', 'await', 'new', 'super', 'this',
+}
+
+CLASS = 'class'
+FUNCTION = 'function'
+
+
+def _match_braces(code):
+    """{ position d'une accolade ouvrante: position de sa fermante }"""
+    pairs = {}
+    stack = []
+    for match in re.finditer(r'[{}]', code):
+        if match.group() == '{':
+            stack.append(match.start())
+        elif stack:
+            pairs[stack.pop()] = match.start()
+    return pairs
+
+
+def _indent_width(code, pos):
+    """Largeur de l'indentation de la ligne de pos"""
+    line_start = code.rfind('\n', 0, pos) + 1
+    line = code[line_start:pos]
+    return len(line) - len(line.lstrip(' \t'))
+
+
+def _ends_by_indent(code, openings):
+    """{ ouvrante: fermante } pour un code aux accolades déséquilibrées
+
+    Une portée se termine à la première « } » en début de ligne indentée
+    au plus comme la ligne de son ouvrante, au plus tard avant la portée
+    suivante de même niveau, à défaut en fin de fichier. Un corps ouvert et
+    fermé sur une même ligne garde sa fermante.
+    """
+    braces = _match_braces(code)
+    closers = [(match.end() - 1, len(match.group(1))) for match in _LINE_CLOSER.finditer(code)]
+    positions = [position for position, _ in closers]
+    openings = sorted(openings)
+    indents = [_indent_width(code, opening) for opening in openings]
+    ends = {}
+    for rank, opening in enumerate(openings):
+        close = braces.get(opening, -1)
+        if close >= 0 and '\n' not in code[opening:close]:
+            ends[opening] = close
+            continue
+        indent = indents[rank]
+        end = next((following for following, following_indent in zip(openings[rank + 1:], indents[rank + 1:])
+                    if following_indent <= indent), len(code))
+        # Fin de la ligne précédant l'en-tête suivant
+        end = code.rfind('\n', 0, end)
+        for index in range(bisect_right(positions, opening), len(closers)):
+            if closers[index][0] > end:
+                break
+            if closers[index][1] <= indent:
+                end = closers[index][0]
+                break
+        ends[opening] = end
+    return ends
+
+
+def _balanced(code):
+    depth = 0
+    for match in re.finditer(r'[{}]', code):
+        depth += 1 if match.group() == '{' else -1
+        if depth < 0:
+            return False
+    return depth == 0
+
+
+def _body_brace(code, pos):
+    """Accolade du corps qui suit les paramètres fermés avant pos, ou -1
+
+    Une annotation de retour est sautée, types objet (« : Promise<{ id: string }> »)
+    et types fonction (« : () => void ») compris ; « ; » ou « = » avant le
+    corps signalent une déclaration ou un appel.
+    """
+    match = _BODY_OR_ANNOTATION.match(code, pos)
+    if not match:
+        return -1
+    if match.group(1) == '{':
+        return match.end() - 1
+    depth = 0
+    type_expected = True
+    last = match.end()
+    for token in _TYPE_TOKEN.finditer(code, match.end()):
+        text = token.group()
+        if code[last:token.start()].strip():
+            type_expected = False
+        last = token.end()
+        if text == '{' and depth == 0 and not type_expected:
+            return token.start()
+        if text in '<([{':
+            depth += 1
+            type_expected = True
+        elif text in '>)]}':
+            depth -= 1
+            type_expected = False
+            if depth < 0:
+                return -1
+        elif depth == 0 and text in ';=':
+            return -1
+        else:
+            type_expected = text in _TYPE_EXPECTED
+    return -1
+
+
+def _close_paren(code, pos):
+    """Parenthèse fermante correspondant à celle ouverte en pos, ou -1"""
+    depth = 0
+    for match in _PARENS.finditer(code, pos):
+        if match.group() == '(':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.start()
+    return -1
+
+
+def _open_paren(code, pos):
+    """Parenthèse ouvrante correspondant à celle fermée en pos, ou -1"""
+    depth = 0
+    for index in range(pos, -1, -1):
+        char = code[index]
+        if char == ')':
+            depth += 1
+        elif char == '(':
+            depth -= 1
+            if depth == 0:
+                return index
+    return -1
+
+
+def _preceded_by_identifier(code, pos):
+    return pos > 0 and _IDENTIFIER_CHAR.match(code[pos - 1]) is not None
+
+
+def _arrow_params_start(code, pos):
+    """Début des paramètres de la fonction fléchée dont « => » est en pos"""
+    line_start = code.rfind('\n', 0, pos) + 1
+    last = pos - 1
+    while last >= 0 and code[last] in ' \t\r\n':
+        last -= 1
+    if last >= 0 and code[last] == ')':
+        return _open_paren(code, last)
+    single = _SINGLE_PARAM.search(code, line_start, pos)
+    if single:
+        return single.start()
+    close = code.rfind(')', line_start, pos)
+    if close >= 0 and _RETURN_ANNOTATION.match(code, close + 1, pos):
+        return _open_paren(code, close)
+    return -1
+
+
+def _head_name(code, params_start):
+    """Nom donné par l'en-tête qui précède les paramètres, ou None"""
+    if params_start < 0:
+        return None
+    line_start = code.rfind('\n', 0, params_start) + 1
+    head = _ARROW_HEAD.search(code, line_start, params_start)
+    return head.group(1) if head else None
+
+
+class ScopeIndex:
+    """Portées nommées d'un source, triées par début, avec leur parent"""
+
+    def __init__(self, source):
+        code = mask_literals(source)
+        found = {}
+
+        for match in _CLASS.finditer(code):
+            if not _preceded_by_identifier(code, match.start()):
+                found[match.end() - 1] = (CLASS, match.group(1))
+
+        for pattern in (_FUNCTION, _METHOD):
+            for match in pattern.finditer(code):
+                name = match.group(1)
+                if name in _NOT_METHODS or _preceded_by_identifier(code, match.start()):
+                    continue
+                close = _close_paren(code, match.end() - 1)
+                body = _body_brace(code, close + 1) if close >= 0 else -1
+                if body >= 0 and body not in found:
+                    found[body] = (FUNCTION, name)
+
+        # Fonctions anonymes nommées par leur affectation ou leur propriété
+        for match in _ARROW_TOKEN.finditer(code):
+            name = _head_name(code, _arrow_params_start(code, match.start()))
+            if name and match.end() - 1 not in found:
+                found[match.end() - 1] = (FUNCTION, name)
+        for match in _ANONYMOUS_FUNCTION.finditer(code):
+            if _preceded_by_identifier(code, match.start()):
+                continue
+            name = _head_name(code, match.start())
+            close = _close_paren(code, match.end() - 1)
+            body = _body_brace(code, close + 1) if name and close >= 0 else -1
+            if body >= 0 and body not in found:
+                found[body] = (FUNCTION, name)
+
+        if _balanced(code):
+            braces = _match_braces(code)
+        else:
+            braces = _ends_by_indent(code, found)
+
+        self.starts = []
+        self.ends = []
+        self.kinds = []
+        self.names = []
+        self.parents = []
+        open_scopes = []
+        for start in sorted(position for position in found if position in braces):
+            while open_scopes and self.ends[open_scopes[-1]] < start:
+                open_scopes.pop()
+            kind, name = found[start]
+            self.starts.append(start)
+            self.ends.append(braces[start])
+            self.kinds.append(kind)
+            self.names.append(name)
+            self.parents.append(open_scopes[-1] if open_scopes else -1)
+            open_scopes.append(len(self.starts) - 1)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _innermost(self, pos, kind=None):
+        """Indice de la portée la plus interne contenant pos (du type kind), ou -1"""
+        index = bisect_right(self.starts, pos) - 1
+        # Une portée sœur déjà fermée : remonter jusqu'à un ancêtre ouvert
+        while index >= 0 and self.ends[index] < pos:
+            index = self.parents[index]
+        while index >= 0 and kind is not None and self.kinds[index] != kind:
+            index = self.parents[index]
+        return index
+
+    def enclosing(self, pos, kind=None):
+        """Nom de la portée la plus interne contenant pos (du type kind), ou None"""
+        index = self._innermost(pos, kind)
+        return self.names[index] if index >= 0 else None
+
+    def operation_at(self, pos):
+        """Méthode de classe, ou à défaut fonction nommée, englobant pos
+
+        Dans une classe, les fonctions imbriquées (helpers fléchés, callbacks
+        nommés) sont remontées jusqu'au membre qui les contient.
+        """
+        index = self._innermost(pos, FUNCTION)
+        member = index
+        while member >= 0 and self.parents[member] >= 0 and self.kinds[self.parents[member]] != CLASS:
+            member = self.parents[member]
+        if member >= 0 and self.parents[member] < 0:
+            # Hors classe : la fonction nommée la plus proche
+            member = index
+        return self.names[member] if member >= 0 else None
+
+    def class_at(self, pos):
+        """Classe englobant pos"""
+        return self.enclosing(pos, CLASS)
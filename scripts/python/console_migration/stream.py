@@ -0,0 +1,79 @@
+"""
+Mode filtre : tampon sur stdin, tampon migré sur stdout
+
+Un éditeur peut envoyer un tampon non enregistré et relire le résultat sans
+fichier temporaire. Le chemin annoncé ne sert qu'à choisir les règles et à
+nommer le service : le fichier n'est ni lu ni écrit, et l'artefact du
+catalogue de règles est relu sans être créé ni mis à jour. Un tampon
+impossible à décoder ou à analyser ressort tel quel, pour qu'un éditeur ne
+perde jamais son contenu.
+
+Sur demande, les modifications sont décrites en NDJSON sur un canal séparé
+(un enregistrement par modification, puis un résumé) :
+
+  {"type": "edit", "offset": 120, "length": 42, "line": 7, "replacement": "..."}
+  {"type": "summary", "path": "...", "edits": 3, "console_before": 4, ...}
+
+offset et length comptent des caractères (points de code) du tampon
+d'origine ; line est le numéro (à partir de 1) de la première ligne touchée.
+"""
+
+import difflib
+import json
+
+from .driver import CONSOLE_CALL, apply_rule_sets
+
+
+def text_edits(before, after):
+    """Modifications (offset, length, line, replacement) qui mènent de before à after
+
+    Le découpage se fait par lignes : chaque bloc de lignes remplacé donne une
+    modification, dans l'ordre du texte et sans chevauchement.
+    """
+    old_lines = before.splitlines(keepends=True)
+    new_lines = after.splitlines(keepends=True)
+    starts = [0]
+    for line in old_lines:
+        starts.append(starts[-1] + len(line))
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    edits = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        edits.append({
+            'offset': starts[i1],
+            'length': starts[i2] - starts[i1],
+            'line': i1 + 1,
+            'replacement': ''.join(new_lines[j1:j2]),
+        })
+    return edits
+
+
+def filter_stream(source, sink, path, rule_sets, edits_sink=None):
+    """Lit source (bytes), écrit le tampon migré dans sink ; renvoie le résumé"""
+    data = source.read()
+    summary = {'type': 'summary', 'path': path, 'edits': 0, 'changed': False, 'errors': [],
+               'conflicts': []}
+    try:
+        content = data.decode('utf-8')
+    except UnicodeDecodeError as exc:
+        sink.write(data)
+        summary['errors'].append(f'Décodage impossible: {exc}')
+        content = migrated = None
+    else:
+        migrated, summary['rule_sets'], summary['errors'] = apply_rule_sets(
+            content, rule_sets, conflicts=summary['conflicts'])
+        sink.write(migrated.encode('utf-8'))
+        summary['changed'] = migrated != content
+        summary['console_before'] = len(CONSOLE_CALL.findall(content))
+        summary['console_after'] = len(CONSOLE_CALL.findall(migrated))
+    sink.flush()
+
+    if edits_sink is not None:
+        records = text_edits(content, migrated) if summary['changed'] else []
+        summary['edits'] = len(records)
+        for record in records:
+            edits_sink.write(json.dumps({'type': 'edit', **record}, ensure_ascii=False) + '\n')
+        edits_sink.write(json.dumps(summary, ensure_ascii=False) + '\n')
+        edits_sink.flush()
+    return summary
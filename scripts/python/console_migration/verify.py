@@ -0,0 +1,87 @@
+"""
+Vérification des console.* restants sur tout le dépôt
+
+Seuls les appels réels sont comptés : le scanner saute commentaires, chaînes,
+templates et regex. Les fichiers sont répartis sur un pool de processus ; un
+fichier qui ne contient pas l'octet « console » n'est même pas décodé.
+"""
+
+import os
+import re
+from collections import Counter
+
+from .cache import fan_out, group_duplicates
+from .scanner import CONSOLE_LEVELS, ScanError, find_console_calls
+
+# Repli pour un fichier que le scanner ne peut pas découper
+_LEVEL_CALL = re.compile(r'console\.(log|warn|error|info|debug)\s*\(')
+
+
+def count_console_calls(source):
+    """Nombre d'appels console.* réels par niveau (Counter)"""
+    return Counter(call.level for call in find_console_calls(source))
+
+
+def verify_file(root, path):
+    """Appels restants d'un fichier : {'path', 'total', 'levels', 'errors'}"""
+    with open(os.path.join(root, path), 'rb') as f:
+        return verify_data(path, f.read())
+
+
+def verify_data(path, data):
+    """Comme verify_file, pour un contenu brut (bytes) déjà en mémoire"""
+    result = {'path': path, 'total': 0, 'levels': {}, 'errors': []}
+    if b'console' not in data:
+        return result
+
+    source = data.decode('utf-8', errors='replace')
+    try:
+        levels = count_console_calls(source)
+    except ScanError as exc:
+        # Source non analysable : décompte approché, signalé comme tel
+        result['errors'].append(f'Analyse impossible: {exc}')
+        levels = Counter(match.group(1) for match in _LEVEL_CALL.finditer(source))
+    result['levels'] = {level: levels[level] for level in CONSOLE_LEVELS if levels[level]}
+    result['total'] = sum(levels.values())
+    return result
+
+
+def _verify_path(args):
+    return verify_file(*args)
+
+
+def run_verify(paths, root='.', jobs=None):
+    """Vérifie paths sur jobs processus ; résultats triés par chemin
+
+    Seuls les fichiers contenant encore des appels (ou une erreur) figurent
+    dans les résultats. Un contenu présent sous plusieurs chemins n'est
+    analysé qu'une fois (voir group_duplicates).
+    """
+    paths = sorted(paths)
+    jobs = jobs or os.cpu_count() or 1
+    groups = group_duplicates(paths, root)
+    if jobs == 1 or len(groups) <= 1:
+        results = [verify_file(root, group[0]) for group in groups]
+    else:
+        # Import différé : un seul fichier ne paie pas le chargement du pool
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(groups) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_verify_path, [(root, group[0]) for group in groups],
+                                        chunksize=chunksize))
+    results = fan_out(results, groups)
+    return [result for result in results if result['total'] or result['errors']]
+
+
+def verify_totals(results):
+    """Totaux par niveau et global d'une vérification"""
+    levels = Counter()
+    for result in results:
+        levels.update(result['levels'])
+    return {
+        'files': len([r for r in results if r['total']]),
+        'total': sum(levels.values()),
+        'levels': {level: levels[level] for level in CONSOLE_LEVELS},
+        'errors': sum(len(r['errors']) for r in results),
+    }
@@ -0,0 +1,214 @@
+"""
+Parcours du dépôt : règles d'exclusion compilées, répertoires élagués
+
+Les motifs du .gitignore et la liste d'exclusion du projet (dépendances,
+couverture, arbres de sauvegarde .cursor.backup.*) sont traduits en une
+seule expression régulière : une alternative par motif, dans l'ordre
+inverse, si bien que la première alternative reconnue est le dernier motif
+applicable, comme dans git (« ! » compris). Un répertoire exclu n'est
+jamais ouvert : node_modules ou coverage/lcov-report ne coûtent qu'un test.
+
+Le parcours utilise os.scandir, dont les entrées portent déjà leur type :
+aucun stat par fichier. Un .gitignore rencontré dans un sous-répertoire
+s'applique à ce sous-arbre, avant ceux des répertoires parents.
+"""
+
+import os
+import re
+
+# Répertoires exclus à toute profondeur
+EXCLUDED_DIRS = {'node_modules', 'dist', 'build', 'coverage', '.git'}
+# Motifs (syntaxe .gitignore) exclus en plus du .gitignore du dépôt
+PROJECT_EXCLUDES = (
+    *(f'{name}/' for name in sorted(EXCLUDED_DIRS)),
+    '/.cursor.backup.*/',
+)
+
+
+def _translate(pattern):
+    """Expression régulière (sans groupe capturant) d'un motif .gitignore,
+    à comparer au chemin relatif suivi de « / » pour un répertoire"""
+    directory = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    # Un « / » ailleurs qu'en fin ancre le motif au répertoire du .gitignore
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i) and (i == 0 or pattern[i - 1] == '/'):
+            parts.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i) and i + 2 == len(pattern) and (i == 0 or pattern[i - 1] == '/'):
+            parts.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 2)
+            if end < 0:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body[0] in '!^':
+                    body = '^' + body[1:]
+                parts.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif char == '\\' and i + 1 < len(pattern):
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    prefix = '' if anchored else '(?:.*/)?'
+    return prefix + ''.join(parts) + ('/' if directory else '/?')
+
+
+def parse_ignore(lines):
+    """[(motif, négation)] des lignes d'un .gitignore"""
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n')
+        # Espaces finales ignorées, sauf échappées
+        while line.endswith(' ') and not line.endswith('\\ '):
+            line = line[:-1]
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate or line.startswith('\\!') or line.startswith('\\#'):
+            line = line[1:]
+        if line.strip('/'):
+            rules.append((line, negate))
+    return rules
+
+
+class IgnoreMatcher:
+    """Motifs .gitignore compilés en une seule expression ; le dernier motif
+    applicable décide"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._regex = None
+        if self.rules:
+            # Ordre inverse : la première alternative reconnue est le dernier motif
+            reverse = self.rules[::-1]
+            self._negated = [negate for _, negate in reverse]
+            self._regex = re.compile(
+                '|'.join(f'({_translate(pattern)})' for pattern, _ in reverse), re.DOTALL)
+
+    @classmethod
+    def from_file(cls, path, extra=()):
+        """Motifs de extra puis du fichier path (absent : extra seuls)"""
+        rules = parse_ignore(extra)
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                rules.extend(parse_ignore(f))
+        except OSError:
+            pass
+        return cls(rules)
+
+    def decide(self, path, is_dir=False):
+        """True (exclu), False (réinclus par « ! ») ou None (aucun motif)
+
+        path est relatif au répertoire des motifs, séparé par « / ».
+        """
+        if self._regex is None:
+            return None
+        match = self._regex.fullmatch(path + '/' if is_dir else path)
+        if match is None:
+            return None
+        return not self._negated[match.lastindex - 1]
+
+    def ignored(self, path, is_dir=False):
+        return bool(self.decide(path, is_dir))
+
+
+def project_matcher(root='.', excludes=PROJECT_EXCLUDES):
+    """Exclusions du projet suivies du .gitignore de root"""
+    return IgnoreMatcher.from_file(os.path.join(root, '.gitignore'), excludes)
+
+
+def _ignored(matchers, relative, is_dir):
+    # Le .gitignore le plus profond l'emporte
+    for base, matcher in reversed(matchers):
+        decision = matcher.decide(relative[len(base):], is_dir)
+        if decision is not None:
+            return decision
+    return False
+
+
+def walk_directories(root, relative, matchers):
+    """(répertoire, matchers, entrées) de relative et de ses sous-répertoires
+    non exclus
+
+    relative est vide (root) ou se termine par « / » ; matchers est la liste
+    [(base, IgnoreMatcher)] qui s'applique à relative, complétée au passage
+    par les .gitignore des sous-répertoires. Un répertoire illisible est sauté.
+    """
+    stack = [(relative, matchers)]
+    while stack:
+        relative, matchers = stack.pop()
+        try:
+            scanner = os.scandir(os.path.join(root, relative) if relative else root)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        with scanner:
+            entries = list(scanner)
+        if relative and any(entry.name == '.gitignore' for entry in entries):
+            local = IgnoreMatcher.from_file(os.path.join(root, relative, '.gitignore'))
+            if local.rules:
+                matchers = matchers + [(relative, local)]
+        yield relative, matchers, entries
+        for entry in entries:
+            path = relative + entry.name
+            if entry.is_dir(follow_symlinks=False) and not _ignored(matchers, path, True):
+                stack.append((path + '/', matchers))
+
+
+def walk_files(root='.', dirs=('.',), extensions=None, matcher=None):
+    """Fichiers non exclus sous dirs (relatifs à root), triés
+
+    extensions (tuple) restreint les fichiers retenus ; matcher (défaut :
+    project_matcher(root)) s'applique aux chemins relatifs à root, complété
+    par les .gitignore des sous-répertoires parcourus.
+    """
+    if matcher is None:
+        matcher = project_matcher(root)
+    found = []
+    for top in dirs:
+        top = top.strip('/').replace(os.sep, '/')
+        prefix = '' if top in ('', '.') else top + '/'
+        if prefix and _ignored([('', matcher)], prefix[:-1], True):
+            continue
+        for relative, matchers, entries in walk_directories(root, prefix, [('', matcher)]):
+            for entry in entries:
+                if (not entry.is_dir(follow_symlinks=False)
+                        and (extensions is None or entry.name.endswith(extensions))
+                        and not _ignored(matchers, relative + entry.name, False)):
+                    found.append(relative + entry.name)
+    return sorted(found)
+
+
+def filter_paths(paths, matcher):
+    """paths (relatifs, « / ») dont ni le fichier ni un répertoire parent
+    n'est exclu par matcher ; chaque répertoire n'est testé qu'une fois"""
+    decisions = {}
+
+    def excluded_dir(directory):
+        if directory not in decisions:
+            parent, _, _name = directory.rpartition('/')
+            decisions[directory] = ((parent and excluded_dir(parent))
+                                    or matcher.ignored(directory, True))
+        return decisions[directory]
+
+    kept = []
+    for path in paths:
+        directory = path.rpartition('/')[0]
+        if not (directory and excluded_dir(directory)) and not matcher.ignored(path):
+            kept.append(path)
+    return kept
@@ -0,0 +1,214 @@
+"""
+Surveillance des sources : migration à l'enregistrement
+
+Sous Linux, inotify (via ctypes, sans dépendance) signale chaque fichier
+fermé après écriture ou renommé sur sa cible, comme le font les éditeurs à
+l'enregistrement ; ailleurs, ou si inotify est indisponible, un balayage
+périodique des dates de modification le remplace. Les événements d'une même
+rafale (fichier temporaire, renommage, formatage) sont regroupés pendant un
+court délai de calme, puis seul le fichier enregistré est migré avec des
+règles déjà compilées en mémoire. La réécriture par le watcher lui-même
+produit un nouvel événement : le cache la reconnaît comme stable et
+l'ignore sans la relire.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+from .driver import SOURCE_DIRS, SOURCE_EXTENSIONS, discover_files, migrate_file
+from .walker import _ignored, project_matcher, walk_directories
+
+# Délai de calme qui clôt une rafale d'événements (secondes)
+DEBOUNCE = 0.02
+# Intervalle du balayage de repli (secondes)
+POLL_INTERVAL = 0.25
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_EVENT = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Fichiers sources enregistrés, d'après inotify (Linux)"""
+
+    def __init__(self, root='.', dirs=SOURCE_DIRS, extensions=SOURCE_EXTENSIONS, matcher=None):
+        self.root = root
+        self.dirs = dirs
+        self.extensions = extensions
+        # Mêmes exclusions que discover_files : .gitignore et exclusions du projet
+        matcher = matcher if matcher is not None else project_matcher(root)
+        name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError('inotify indisponible')
+        self.fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        # descripteur de surveillance -> (répertoire relatif à root, matchers)
+        self._watches = {}
+        try:
+            for top in dirs:
+                if os.path.isdir(os.path.join(root, top)) and not _ignored([('', matcher)], top, True):
+                    self._add_tree(top, [('', matcher)])
+        except OSError:
+            self.close()
+            raise
+
+    def _add_tree(self, relative, matchers):
+        """Surveille relative et ses sous-répertoires non exclus ; renvoie les
+        sources trouvées"""
+        found = []
+        for current, local, entries in walk_directories(self.root, relative + '/', matchers):
+            current = current[:-1]
+            wd = self._libc.inotify_add_watch(
+                self.fd, os.fsencode(os.path.join(self.root, current)), _WATCH_MASK)
+            if wd < 0:
+                # ENOSPC : limite max_user_watches atteinte
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch {current}')
+            self._watches[wd] = (current, local)
+            for entry in entries:
+                path = f'{current}/{entry.name}'
+                if (not entry.is_dir(follow_symlinks=False) and entry.name.endswith(self.extensions)
+                        and not _ignored(local, path, False)):
+                    found.append(path)
+        return found
+
+    def wait(self, timeout=None):
+        """Chemins enregistrés depuis le dernier appel (attend au plus timeout)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+                offset += _EVENT.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    # Événements perdus : tous les fichiers sont à revoir
+                    changed.update(discover_files(self.root, self.dirs, self.extensions))
+                    continue
+                if mask & _IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                watched = self._watches.get(wd)
+                if watched is None or not name:
+                    continue
+                directory, matchers = watched
+                path = f'{directory}/{os.fsdecode(name)}'
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO) and not _ignored(matchers, path, True):
+                        # Répertoire créé ou déplacé (checkout) : ses fichiers comptent aussi
+                        changed.update(self._add_tree(path, matchers))
+                elif (mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO) and path.endswith(self.extensions)
+                      and not _ignored(matchers, path, False)):
+                    changed.add(path)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Fichiers sources modifiés, d'après un balayage périodique (repli)"""
+
+    def __init__(self, root='.', dirs=SOURCE_DIRS, extensions=SOURCE_EXTENSIONS,
+                 interval=POLL_INTERVAL):
+        self.root = root
+        self.dirs = dirs
+        self.extensions = extensions
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for path in discover_files(self.root, self.dirs, self.extensions):
+            try:
+                stat = os.stat(os.path.join(self.root, path))
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """Chemins modifiés depuis le dernier balayage (attend au plus timeout)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+            snapshot = self._scan()
+            changed = {path for path, signature in snapshot.items()
+                       if self._snapshot.get(path) != signature}
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(root='.', polling=False, interval=POLL_INTERVAL):
+    """InotifyWatcher si possible, sinon PollingWatcher"""
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval=interval)
+
+
+def watch(watcher, rules_for, root='.', dry_run=False, cache=None, debounce=DEBOUNCE,
+          byte_mode=False):
+    """Migre chaque fichier enregistré ; génère ses résultats au fil de l'eau
+
+    rules_for(path) renvoie les jeux de règles (déjà compilés) du fichier ;
+    byte_mode : voir migrate_file.
+    Chaque résultat porte aussi 'elapsed' : secondes écoulées entre la fin
+    de la rafale et la fin de la migration du fichier. Un fichier illisible
+    donne un résultat dont 'errors' décrit l'erreur, sans arrêter la boucle.
+    """
+    while True:
+        changed = watcher.wait()
+        # Regroupe la rafale : écriture temporaire, renommage, formatage...
+        while True:
+            more = watcher.wait(debounce)
+            if not more:
+                break
+            changed |= more
+        start = time.perf_counter()
+        for path in sorted(changed):
+            try:
+                result = migrate_file(root, path, rules_for(path), dry_run, cache,
+                                      byte_mode=byte_mode)
+            except FileNotFoundError:
+                continue  # Supprimé ou renommé entre-temps
+            except OSError as exc:
+                # Droits, répertoire à la place du fichier... : signalé, les autres continuent
+                result = {'path': path, 'rule_sets': [], 'conflicts': [], 'changed': False,
+                          'cached': False, 'has_console': False, 'console_before': 0,
+                          'console_after': 0,
+                          'errors': [f'{path} ignoré: {type(exc).__name__}: {exc}']}
+            else:
+                if cache is not None:
+                    cache.record(result)
+            result['elapsed'] = time.perf_counter() - start
+            yield result
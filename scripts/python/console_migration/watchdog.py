@@ -0,0 +1,181 @@
+"""
+Budget de temps par règle et par fichier
+
+Une règle au retour arrière catastrophique bloque le moteur re sans jamais
+rendre la main : aucun signal ni timeout Python ne peut l'interrompre dans le
+même processus. En mode surveillé, chaque fichier est traité par un processus
+ouvrier qui publie, en mémoire partagée, la règle en cours et l'instant où
+elle a démarré ; le parent tue l'ouvrier dont une règle dépasse le budget,
+consigne la règle et le fichier fautifs, puis relance un ouvrier neuf. Les
+règles sont exécutées une à une (comme en mode profil) pour que le budget
+désigne la règle exacte ; le résultat reste celui du chemin séquentiel.
+"""
+
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from .cache import fan_out, group_duplicates, rules_fingerprint
+from .driver import CONSOLE_CALL, index_rule_sets, migrate_file
+from .profiler import RuleProfiler
+from .rules import compile_rule_sets
+
+# Taille du tampon partagé qui porte le nom de la règle en cours
+_RULE_BUFFER = 512
+_SEPARATOR = ' '
+
+
+def _worker_main(conn, rule, since, root, rules_by_path, dry_run, cache, profile):
+    def before_rule(key):
+        # Nom d'abord, instant ensuite : le parent ne voit jamais un départ
+        # récent associé à la règle précédente
+        rule.value = _SEPARATOR.join(key).encode('utf-8')[:_RULE_BUFFER - 1]
+        since.value = time.monotonic()
+
+    while True:
+        group = conn.recv()
+        if group is None:
+            break
+        path = group[0]
+        profiler = RuleProfiler(before_rule=before_rule)
+        result = migrate_file(root, path, rules_by_path.get(path, []), dry_run, cache, profiler,
+                              duplicates=group[1:])
+        since.value = 0.0
+        if profile:
+            result['profile'] = profiler.stats
+        conn.send(result)
+
+
+class _Worker:
+    """Processus ouvrier, son canal et sa règle en cours"""
+
+    def __init__(self, context, args):
+        self.conn, child = context.Pipe()
+        self.rule = context.Array('c', _RULE_BUFFER, lock=False)
+        self.since = context.Value('d', 0.0, lock=False)
+        self.process = context.Process(
+            target=_worker_main, args=(child, self.rule, self.since, *args), daemon=True)
+        self.process.start()
+        child.close()
+        self.path = None
+
+    def overrun(self, budget):
+        """(règle, secondes) si la règle en cours dépasse budget, sinon None"""
+        started = self.since.value
+        if self.path is None or not started:
+            return None
+        elapsed = time.monotonic() - started
+        if elapsed <= budget:
+            return None
+        return self.rule.value.decode('utf-8', 'replace'), elapsed
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join()
+        self.conn.close()
+
+
+def _failed_result(root, path, rule_sets, error, timeout=None):
+    """Résultat d'un fichier abandonné : laissé tel quel, compté en erreur"""
+    with open(os.path.join(root, path), 'rb') as f:
+        content = f.read().decode('utf-8', 'replace')
+    count = len(CONSOLE_CALL.findall(content))
+    return {
+        'path': path,
+        'fingerprint': rules_fingerprint(rule_sets),
+        'rule_sets': [],
+        'errors': [error],
+        'changed': False,
+        'cached': False,
+        'clean_digest': None,
+        'has_console': 'console.' in content,
+        'console_before': count,
+        'console_after': count,
+        'timeout': timeout,
+    }
+
+
+def run_guarded(paths, rule_sets, root='.', jobs=None, dry_run=False, cache=None,
+                profiler=None, budget=5.0):
+    """Comme run_migration, avec au plus budget secondes par règle et par fichier
+
+    Un fichier dont une règle dépasse le budget n'est pas modifié ; son
+    résultat porte l'erreur et la clé 'timeout' {'rule', 'seconds'}. Comme
+    dans run_migration, les fichiers identiques sous les mêmes règles ne sont
+    migrés qu'une fois et leurs copies reprennent le résultat, avec 'same_as'.
+    """
+    compile_rule_sets(rule_sets)
+    rules_by_path = index_rule_sets(rule_sets)
+    groups = group_duplicates(
+        sorted(paths), root, key=lambda path: rules_fingerprint(rules_by_path.get(path, [])))
+    # Représentant -> groupe envoyé à l'ouvrier (représentant, copies...)
+    by_path = {group[0]: group for group in groups}
+    pending = deque(by_path)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(pending)))
+    context = multiprocessing.get_context()
+    args = (root, rules_by_path, dry_run, cache, profiler is not None)
+    # Le parent vérifie les budgets au moins quatre fois par budget
+    poll = min(0.1, budget / 4)
+
+    results = {}
+    workers = [_Worker(context, args) for _ in range(jobs)] if pending else []
+    try:
+        while pending or any(worker.path is not None for worker in workers):
+            for worker in workers:
+                if worker.path is None and pending:
+                    worker.path = pending.popleft()
+                    worker.conn.send(by_path[worker.path])
+
+            busy = {worker.conn: worker for worker in workers if worker.path is not None}
+            for conn in wait(list(busy), timeout=poll):
+                worker = busy[conn]
+                try:
+                    results[worker.path] = conn.recv()
+                except EOFError:
+                    # Ouvrier mort sans réponse (mémoire, signal externe)
+                    results[worker.path] = _failed_result(
+                        root, worker.path, rules_by_path.get(worker.path, []),
+                        f'Processus ouvrier interrompu (code {worker.process.exitcode})')
+                    worker.kill()
+                    workers[workers.index(worker)] = _Worker(context, args)
+                    continue
+                worker.path = None
+
+            for index, worker in enumerate(workers):
+                overrun = worker.overrun(budget)
+                if overrun is None:
+                    continue
+                rule, elapsed = overrun
+                worker.kill()
+                results[worker.path] = _failed_result(
+                    root, worker.path, rules_by_path.get(worker.path, []),
+                    f'Budget de {budget:g} s dépassé par la règle {rule} ({elapsed:.1f} s)',
+                    {'rule': rule, 'seconds': round(elapsed, 3)})
+                workers[index] = _Worker(context, args)
+    finally:
+        for worker in workers:
+            if worker.path is None:
+                worker.stop()
+            else:
+                worker.kill()
+
+    ordered = [results[group[0]] for group in groups]
+    if profiler is not None:
+        for result in ordered:
+            profiler.merge(result.pop('profile', {}))
+    ordered = fan_out(ordered, groups)
+    if cache is not None:
+        for result in ordered:
+            cache.record(result)
+
+    return [result for result in ordered if result['changed'] or result['has_console']]
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Migration des console.* vers logger structuré sur tout le dépôt
+Découvre les fichiers de server/, client/ et shared/ et les traite en parallèle
+avec les règles des trois scripts de migration, dans leur ordre historique :
+chaque fichier est lu une fois, traverse toutes les étapes en mémoire et
+n'est écrit qu'une fois
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from console_migration.cache import DEFAULT_CACHE_PATH, MigrationCache
+from console_migration.catalog import DEFAULT_CATALOG_PATH, RuleCatalog
+from console_migration.driver import (
+    SOURCE_DIRS, discover_files, run_migration, select_sources, summarize,
+)
+from console_migration.daemon import DEFAULT_SOCKET_PATH, MigrationDaemon, call
+from console_migration.gitfiles import GitError, changed_files, staged_files
+from console_migration.profiler import RuleProfiler
+from console_migration.registry import DEFAULT_REGISTRY
+from console_migration.rules import compile_rule_sets
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*',
+                        help='Fichiers à traiter, relatifs à la racine (défaut: découverte complète)')
+    parser.add_argument('--root', default='.', help='Racine du dépôt (défaut: .)')
+    parser.add_argument('--since', default=None, metavar='REF',
+                        help='Seulement les fichiers modifiés depuis REF (commits, index, arbre de travail)')
+    parser.add_argument('--staged', action='store_true',
+                        help="Seulement les fichiers indexés (pre-commit)")
+    parser.add_argument('--git-files', action='store_true',
+                        help='Découverte par git ls-files (suivis et non suivis non ignorés), sans parcours')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='Nombre de processus (défaut: nombre de CPU)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help="N'écrit aucun fichier")
+    parser.add_argument('--cache', default=None,
+                        help=f'Fichier du cache incrémental (défaut: <root>/{DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Retraite tous les fichiers sans lire ni écrire le cache')
+    parser.add_argument('--compile-report', type=int, metavar='N', default=0,
+                        help='Affiche les N patterns les plus longs à compiler')
+    parser.add_argument('--stage', action='append', default=None, metavar='ETAPE',
+                        help='Seulement cette étape et ses prérequis (répétable ; défaut: toutes)')
+    parser.add_argument('--generic', action='store_true',
+                        help='Réécrit aussi les console.* restants de tous les fichiers')
+    parser.add_argument('--loop-logs', action='store_true',
+                        help='Regroupe les logs info/debug émis à chaque tour de boucle '
+                             'en un log de synthèse après la boucle')
+    parser.add_argument('--profile', type=int, metavar='N', default=0,
+                        help='Profile chaque règle (sans cache) et affiche les N plus coûteuses')
+    parser.add_argument('--flamegraph', default=None, metavar='FICHIER',
+                        help='Avec --profile : écrit les piles au format collapsed (flamegraph)')
+    parser.add_argument('--bytes', action='store_true',
+                        help='Règles appliquées sur les octets bruts, sans décoder les fichiers')
+    parser.add_argument('--rule-timeout', type=float, metavar='SECONDES', default=None,
+                        help='Budget par règle et par fichier ; au-delà le fichier est abandonné')
+    parser.add_argument('--watch', action='store_true',
+                        help='Reste actif et migre chaque fichier à son enregistrement')
+    parser.add_argument('--poll', type=float, metavar='SECONDES', default=None,
+                        help='Avec --watch : balayage périodique au lieu de inotify')
+    parser.add_argument('--stdin', default=None, metavar='CHEMIN',
+                        help='Filtre : migre le tampon lu sur stdin vers stdout, '
+                             'avec les règles de CHEMIN')
+    parser.add_argument('--edits', default=None, metavar='FICHIER',
+                        help='Avec --stdin : modifications en NDJSON dans FICHIER (ex. /dev/fd/3)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Démon résident : sert migrate/verify sur un socket Unix')
+    parser.add_argument('--socket', default=None, metavar='CHEMIN',
+                        help='Socket du démon (défaut: <root>/.cache/console-migration.sock) ; '
+                             'sans --daemon, envoie les fichiers au démon')
+    parser.add_argument('--verify', action='store_true',
+                        help='Compte les console.* réels restants (JSON) sans rien modifier')
+    parser.add_argument('--json', action='store_true',
+                        help='Affiche les résultats par fichier en JSON')
+    args = parser.parse_args(argv)
+    if args.bytes and (args.rule_timeout or args.profile):
+        # Règles exécutées une à une sur le texte décodé : le mode octets n'y a pas cours
+        parser.error('--bytes ne se combine ni avec --rule-timeout ni avec --profile')
+    return args
+
+def select_paths(args):
+    """Fichiers à traiter : explicites, modifiés selon git, ou découverte complète"""
+    if args.paths:
+        return sorted({path.replace(os.sep, '/') for path in args.paths})
+    if args.since or args.staged:
+        paths = set()
+        if args.since:
+            paths.update(changed_files(args.root, args.since))
+        if args.staged:
+            paths.update(staged_files(args.root))
+        return select_sources(paths, args.root)
+    return discover_files(args.root, git=args.git_files)
+
+def verify(args, paths):
+    """Appels console.* réels restants, par fichier et par niveau (JSON)"""
+    from console_migration.verify import run_verify, verify_totals
+
+    results = run_verify(paths, root=args.root, jobs=args.jobs)
+    totals = verify_totals(results)
+    print(json.dumps({'files': results, 'totals': totals}, ensure_ascii=False, indent=2))
+    return 0 if totals['total'] == 0 else 1
+
+def watch_repository(args, catalog, cache):
+    """Mode --watch : migre les fichiers enregistrés jusqu'à Ctrl+C"""
+    from console_migration.loops import LoopLogRules
+    from console_migration.rewriter import GenericRules
+    from console_migration.watch import POLL_INTERVAL, PollingWatcher, open_watcher, watch
+
+    rules_by_path = {}
+
+    def rules_for(path):
+        # Compilées au premier enregistrement du fichier puis gardées en mémoire
+        rule_sets = rules_by_path.get(path)
+        if rule_sets is None:
+            rule_sets = catalog.rule_sets([path], stages=args.stage)
+            if args.generic:
+                rule_sets = rule_sets + [GenericRules(path)]
+            if args.loop_logs:
+                rule_sets = rule_sets + [LoopLogRules(path)]
+            rule_sets = rules_by_path[path] = compile_rule_sets(rule_sets)
+        return rule_sets
+
+    # Règles ciblées compilées d'avance : le premier enregistrement ne les paie pas
+    compile_rule_sets(catalog.rule_sets(stages=args.stage))
+    watcher = open_watcher(args.root, polling=args.poll is not None,
+                           interval=args.poll or POLL_INTERVAL)
+    mode = 'balayage' if isinstance(watcher, PollingWatcher) else 'inotify'
+    print(f"👀 Surveillance de {', '.join(SOURCE_DIRS)} ({mode}), Ctrl+C pour arrêter")
+    try:
+        for result in watch(watcher, rules_for, root=args.root, dry_run=args.dry_run, cache=cache,
+                            byte_mode=args.bytes):
+            elapsed = result['elapsed'] * 1000
+            if result['changed']:
+                print(f"🔄 {result['path']}: {result['console_before']} -> "
+                      f"{result['console_after']} console.* ({elapsed:.0f} ms)")
+            elif result['console_after']:
+                print(f"⚠️  {result['path']}: {result['console_after']} console.* restants")
+            for error in result['errors']:
+                print(f"   ❌ {error}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        if cache is not None:
+            cache.save()
+    return 0
+
+def serve(args, socket_path):
+    """Mode --daemon : sert les requêtes jusqu'à Ctrl+C ou {"op": "shutdown"}"""
+    with MigrationDaemon(socket_path, root=args.root, jobs=args.jobs, generic=args.generic,
+                         loop_logs=args.loop_logs, stages=args.stage) as server:
+        print(f"🛰️  Démon à l'écoute sur {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+def delegate(args, socket_path, paths):
+    """Envoie paths au démon au lieu de les traiter dans ce processus"""
+    op = 'verify' if args.verify else 'migrate'
+    try:
+        responses = call(socket_path, [{'id': path, 'op': op, 'path': path, 'dry_run': args.dry_run}
+                                       for path in paths])
+    except OSError as exc:
+        print(f"❌ Démon injoignable sur {socket_path}: {exc}", file=sys.stderr)
+        return 2
+    failed = [response for response in responses if not response['ok']]
+    results = [response['result'] for response in responses if response['ok']]
+    for response in failed:
+        print(f"❌ {response['id']}: {response['error']}", file=sys.stderr)
+    if args.verify:
+        remaining = sum(result['total'] for result in results)
+        print(json.dumps({'files': [r for r in results if r['total'] or r['errors']],
+                          'totals': {'total': remaining}}, ensure_ascii=False, indent=2))
+        return 0 if remaining == 0 and not failed else 1
+    results = [result for result in results if result['changed'] or result['has_console']]
+    if args.json:
+        print(json.dumps({'files': results, 'totals': summarize(results)}, ensure_ascii=False, indent=2))
+    else:
+        for result in results:
+            status = '🔄' if result['changed'] else '  '
+            print(f"{status} {result['path']}: {result['console_before']} -> {result['console_after']} console.*")
+            for error in result['errors']:
+                print(f"   ❌ {error}")
+    return 1 if failed else 0
+
+def filter_stdin(args):
+    """Mode --stdin : stdin -> stdout, sans lire ni écrire le fichier ni les artefacts"""
+    from console_migration.stream import filter_stream
+
+    path = args.stdin.replace(os.sep, '/')
+    # Artefact relu s'il est à jour, jamais écrit : le filtre ne touche pas l'arbre
+    catalog = RuleCatalog(artifact=os.path.join(args.root, DEFAULT_CATALOG_PATH), read_only=True)
+    rule_sets = catalog.rule_sets([path], stages=args.stage)
+    if args.generic:
+        from console_migration.rewriter import GenericRules
+
+        rule_sets = rule_sets + [GenericRules(path)]
+    if args.loop_logs:
+        from console_migration.loops import LoopLogRules
+
+        rule_sets = rule_sets + [LoopLogRules(path)]
+    edits = open(args.edits, 'w', encoding='utf-8') if args.edits else None
+    try:
+        summary = filter_stream(sys.stdin.buffer, sys.stdout.buffer, path, rule_sets, edits)
+    finally:
+        if edits is not None:
+            edits.close()
+    for error in summary['errors']:
+        print(f"❌ {error}", file=sys.stderr)
+    return 1 if summary['errors'] else 0
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.stage:
+        try:
+            RuleCatalog(artifact=os.path.join(args.root, DEFAULT_CATALOG_PATH)).order(args.stage)
+        except ValueError as exc:
+            print(f"❌ {exc}", file=sys.stderr)
+            return 2
+    if args.stdin:
+        return filter_stdin(args)
+    socket_path = args.socket or os.path.join(args.root, DEFAULT_SOCKET_PATH)
+    if args.daemon:
+        return serve(args, socket_path)
+    try:
+        paths = select_paths(args)
+    except GitError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 2
+    if args.socket:
+        return delegate(args, socket_path, paths)
+    if args.verify:
+        return verify(args, paths)
+    cache = None
+    # Un fichier servi par le cache n'exécuterait aucune règle
+    if not args.no_cache and not args.profile:
+        cache = MigrationCache(args.cache or os.path.join(args.root, DEFAULT_CACHE_PATH))
+
+    # Seuls les groupes de règles des fichiers traités sont matérialisés
+    catalog = RuleCatalog(artifact=os.path.join(args.root, DEFAULT_CATALOG_PATH))
+    if args.stage and not args.json:
+        print(f"🧩 Étapes: {' -> '.join(catalog.order(args.stage))}")
+    if args.watch:
+        return watch_repository(args, catalog, cache)
+    rule_sets = catalog.rule_sets(paths, stages=args.stage)
+    if args.generic:
+        # Import différé : le scanner n'est chargé que pour la réécriture générique
+        from console_migration.rewriter import generic_rule_sets
+
+        # Après les règles manuelles : seuls les appels qu'elles ignorent restent
+        rule_sets = rule_sets + generic_rule_sets(paths)
+    if args.loop_logs:
+        from console_migration.loops import loop_log_rule_sets
+
+        # En dernier : les appels regroupés sont déjà des appels logger
+        rule_sets = rule_sets + loop_log_rule_sets(paths)
+    # Retour arrière catastrophique repéré à la compilation du catalogue
+    for finding in catalog.findings(paths):
+        print(f"⚠️  {finding}", file=sys.stderr)
+
+    profiler = RuleProfiler() if args.profile else None
+    if args.rule_timeout:
+        # Import différé : multiprocessing n'est chargé qu'en mode surveillé
+        from console_migration.watchdog import run_guarded
+
+        results = run_guarded(paths, rule_sets, root=args.root, jobs=args.jobs,
+                              dry_run=args.dry_run, cache=cache, profiler=profiler,
+                              budget=args.rule_timeout)
+    else:
+        results = run_migration(paths, rule_sets, root=args.root, jobs=args.jobs,
+                                dry_run=args.dry_run, cache=cache, profiler=profiler,
+                                byte_mode=args.bytes)
+    totals = summarize(results)
+
+    if cache is not None:
+        cache.save()
+    if args.compile_report:
+        DEFAULT_REGISTRY.report(args.compile_report)
+    if profiler is not None:
+        profiler.report(args.profile)
+        if args.flamegraph:
+            profiler.dump_collapsed(args.flamegraph)
+            print(f"🔥 Piles écrites dans {args.flamegraph}")
+
+    if args.json:
+        print(json.dumps({'files': results, 'totals': totals}, ensure_ascii=False, indent=2))
+        return 0
+
+    for result in results:
+        status = '🔄' if result['changed'] else '  '
+        print(f"{status} {result['path']}: {result['console_before']} -> {result['console_after']} console.*")
+        if result.get('same_as'):
+            # Copie migrée avec son représentant : erreurs déjà signalées
+            print(f"   📎 Identique à {result['same_as']}")
+            continue
+        for error in result['errors']:
+            print(f"   ❌ {error}")
+        for conflict in result.get('conflicts', ()):
+            print(f"   ⚠️  Conflit de règles: {conflict}")
+
+    print(f"\n📊 {totals['files']} fichiers, {totals['files_changed']} modifiés, "
+          f"{totals['files_cached']} en cache, "
+          f"{totals['console_before']} -> {totals['console_after']} console.*")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
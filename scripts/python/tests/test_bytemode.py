@@ -0,0 +1,63 @@
+import pytest
+
+from console_migration.bytemode import (
+    apply_rule_sets_bytes, byte_ready, byte_safe, migrate_bytes, open_source,
+)
+from console_migration.driver import apply_rule_sets
+from console_migration.rules import RuleSet
+
+SOURCE = "a\nconsole.log('é');\nlog('[SQL] ok')\n"
+
+
+def literal_rules():
+    return RuleSet('literal', 'a.ts', [([(r"console\.log\('é'\);", "logger.info('é');"),
+                                         (r"\[SQL\] ", '')], 0)])
+
+
+@pytest.mark.parametrize('pattern', [
+    r"console\.log\('é'\)", r'^foo$', r'(ab|cd)\1', r'[^\n]*', r'x(?=y)', r'.+?;',
+])
+def test_byte_safe_patterns(pattern):
+    assert byte_safe(pattern)
+
+
+@pytest.mark.parametrize('pattern, flags', [
+    (r'\s+', 0), (r'\w', 0), (r'[éa]', 0), (r'.', 0), (r'[a-z]{2}', 0),
+    (r'(?<=a)b', 0), (r'abc', 2), (r'(?i)abc', 0),
+])
+def test_unicode_sensitive_patterns_are_refused(pattern, flags):
+    assert not byte_safe(pattern, flags)
+
+
+def test_bytes_match_str_application():
+    rules = literal_rules()
+    assert byte_ready([rules])
+    migrated, applied, errors = apply_rule_sets_bytes(SOURCE.encode('utf-8'), [rules])
+    expected = apply_rule_sets(SOURCE, [literal_rules()])
+    assert (migrated.decode('utf-8'), applied, errors) == expected
+
+
+def test_unsafe_rule_set_goes_through_str():
+    rules = RuleSet('space', 'a.ts', [([(r'\s+x', 'y')], 0)])
+    result = {}
+    assert migrate_bytes(b' x', [rules], result, 'digest') is None
+    assert result == {}
+
+
+def test_migrate_bytes_reports_digest_of_clean_output():
+    result = {}
+    migrated = migrate_bytes(SOURCE.encode('utf-8'), [literal_rules()], result, 'digest')
+    assert result['changed']
+    assert (result['console_before'], result['console_after']) == (1, 0)
+    assert result['clean_digest'] != 'digest'
+    assert migrated.startswith(b'a\nlogger.info')
+
+
+def test_large_files_are_memory_mapped(tmp_path):
+    path = tmp_path / 'big.ts'
+    path.write_bytes(b'x' * 64)
+    with open_source(path, threshold=16) as data:
+        assert not isinstance(data, bytes)
+        assert data[:2] == b'xx'
+    with open_source(path) as data:
+        assert data == b'x' * 64
@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+from console_migration import catalog as catalog_module
+from console_migration.catalog import RuleCatalog, stage_order
+
+
+def write_stage(rules_dir, stage, requires=(), pattern=r"console\.log\('a'\);"):
+    document = {
+        'stage': stage,
+        'requires': list(requires),
+        'services': {
+            'svc': {
+                'path': f'server/{stage}.ts',
+                'tables': [{'rules': [{'pattern': pattern, 'replacement': "logger.info('a');"}]}],
+            },
+        },
+    }
+    (rules_dir / f'{stage}.json').write_text(json.dumps(document), encoding='utf-8')
+
+
+@pytest.fixture
+def rules_dir(tmp_path):
+    directory = tmp_path / 'rules'
+    directory.mkdir()
+    write_stage(directory, 'first')
+    write_stage(directory, 'second', requires=['first'])
+    return directory
+
+
+def open_catalog(rules_dir, **kwargs):
+    return RuleCatalog(rules_dir=str(rules_dir), stages=('second', 'first'),
+                       artifact=str(rules_dir.parent / '.cache' / 'rules.bin'), **kwargs)
+
+
+def forbid_build(monkeypatch):
+    def build(self):
+        raise AssertionError('artefact reconstruit')
+    monkeypatch.setattr(RuleCatalog, '_build', build)
+
+
+def test_stage_order_puts_prerequisites_first():
+    dependencies = {'second': ['first'], 'first': [], 'other': []}
+    assert stage_order(dependencies) == ['first', 'second', 'other']
+    assert stage_order(dependencies, ['second']) == ['first', 'second']
+    with pytest.raises(ValueError, match='inconnue'):
+        stage_order(dependencies, ['missing'])
+    with pytest.raises(ValueError, match='cycliques'):
+        stage_order({'a': ['b'], 'b': ['a']})
+
+
+def test_rule_sets_follow_stage_order_and_filters(rules_dir):
+    catalog = open_catalog(rules_dir)
+    assert [rules.path for rules in catalog.rule_sets()] == ['server/first.ts', 'server/second.ts']
+    assert [rules.path for rules in catalog.rule_sets(['server/second.ts'])] == ['server/second.ts']
+    assert [rules.path for rules in catalog.rule_sets(stages=['first'])] == ['server/first.ts']
+
+
+def test_up_to_date_artifact_is_reused(rules_dir, monkeypatch):
+    open_catalog(rules_dir).load()
+    forbid_build(monkeypatch)
+    assert open_catalog(rules_dir).targets() == ['server/first.ts', 'server/second.ts']
+
+
+def test_edited_rules_invalidate_artifact(rules_dir):
+    open_catalog(rules_dir).load()
+    write_stage(rules_dir, 'first', pattern=r"console\.log\('changé'\);")
+    (rules, _second) = open_catalog(rules_dir).rule_sets()
+    assert rules.tables[0][0][0][0] == r"console\.log\('changé'\);"
+
+
+def test_analysis_code_change_invalidates_artifact(rules_dir, monkeypatch):
+    open_catalog(rules_dir).load()
+    monkeypatch.setattr(catalog_module, 'analysis_digest', lambda: 'autre')
+    built = []
+    original = RuleCatalog._build
+    monkeypatch.setattr(RuleCatalog, '_build', lambda self: built.append(1) or original(self))
+    open_catalog(rules_dir).load()
+    assert built == [1]
+
+
+def test_read_only_catalog_writes_nothing(rules_dir):
+    catalog = open_catalog(rules_dir, read_only=True)
+    assert len(catalog.rule_sets()) == 2
+    assert not os.path.exists(catalog.artifact)
+
+
+def test_findings_are_kept_per_target(rules_dir):
+    write_stage(rules_dir, 'first', pattern='(a+)+b')
+    catalog = open_catalog(rules_dir)
+    assert catalog.findings(['server/first.ts'])
+    assert catalog.findings(['server/second.ts']) == []
@@ -0,0 +1,29 @@
+import pytest
+
+from console_migration.complexity import AMBIGUOUS, NESTED, analyze_pattern
+
+
+@pytest.mark.parametrize('pattern', [
+    r'(.*a){12}b',
+    r'(.*,)*x',
+    r'^(.*?,){11}P',
+    r'(\w+\s?)+',
+    r'(a*)*',
+])
+def test_catastrophic_shapes_are_flagged(pattern):
+    assert [finding.kind for finding in analyze_pattern(pattern)] == [NESTED]
+
+
+def test_ambiguous_alternation_under_repeat_is_flagged():
+    assert [finding.kind for finding in analyze_pattern(r'(\w+:|\d+=)*')] == [AMBIGUOUS]
+
+
+@pytest.mark.parametrize('pattern', [
+    r'(\d+\.){3}\d+',
+    r'(?:\w+\.)+\w+',
+    r'(.*a){2}b',
+    r'console\.log\(.*\);',
+    r'^\s*console\.log\([^)]*\);\n',
+])
+def test_linear_patterns_are_not_flagged(pattern):
+    assert analyze_pattern(pattern) == []
@@ -0,0 +1,53 @@
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from console_migration.daemon import MigrationDaemon, _response, call
+
+SOURCE = "export function run() {\n  console.log('Démarrage');\n}\n"
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    services = tmp_path / 'server' / 'services'
+    services.mkdir(parents=True)
+    for index in range(4):
+        (services / f's{index}.ts').write_text(SOURCE, encoding='utf-8')
+    socket_path = str(tmp_path / 'd.sock')
+    server = MigrationDaemon(socket_path, root=str(tmp_path), jobs=2, generic=True,
+                             artifact=str(tmp_path / 'rules.bin'))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def test_pipelined_responses_keep_request_order(daemon):
+    requests = [{'id': index, 'op': 'migrate', 'path': f'server/services/s{index}.ts', 'dry_run': True}
+                for index in range(4)]
+    requests.insert(2, {'id': 'bad', 'op': 'unknown'})
+    requests.append({'id': 'missing', 'path': 'server/services/missing.ts'})
+    responses = call(daemon, requests)
+    assert [response['id'] for response in responses] == [0, 1, 'bad', 2, 3, 'missing']
+    assert [response['ok'] for response in responses] == [True, True, False, True, True, False]
+    assert all(response['result']['changed'] for response in responses if response['ok'])
+
+
+def test_buffer_request_returns_content(daemon):
+    [response] = call(daemon, [{'op': 'migrate', 'path': 'server/services/x.ts', 'content': SOURCE}])
+    assert response['ok']
+    assert "logger.info('Démarrage'" in response['content']
+
+
+def test_path_outside_root_is_rejected(daemon):
+    [response] = call(daemon, [{'id': 1, 'path': '../etc/passwd'}])
+    assert response == {'id': 1, 'ok': False, 'error': 'Chemin hors de la racine: ../etc/passwd'}
+
+
+def test_failed_request_becomes_an_error_response():
+    future = Future()
+    future.set_exception(ValueError('règle en échec'))
+    assert _response(7, future) == {'id': 7, 'ok': False, 'error': 'ValueError: règle en échec'}
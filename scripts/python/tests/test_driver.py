@@ -0,0 +1,19 @@
+import os
+
+from console_migration.driver import run_migration
+from console_migration.rewriter import GenericRules
+
+SOURCE = "export function run() {\n  console.log('Démarrage');\n}\n"
+
+
+def test_duplicates_at_other_depths_get_their_own_import(tmp_path):
+    paths = ['server/services/foo.ts', 'server/services/legacy/v1/foo.ts']
+    for path in paths:
+        os.makedirs(tmp_path / os.path.dirname(path), exist_ok=True)
+        (tmp_path / path).write_text(SOURCE, encoding='utf-8')
+
+    results = run_migration(paths, [GenericRules(path) for path in paths], root=str(tmp_path), jobs=1)
+
+    assert [result.get('same_as') for result in results] == [None, None]
+    assert "from '../utils/logger';" in (tmp_path / paths[0]).read_text(encoding='utf-8')
+    assert "from '../../../utils/logger';" in (tmp_path / paths[1]).read_text(encoding='utf-8')
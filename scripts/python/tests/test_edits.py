@@ -0,0 +1,37 @@
+from console_migration.edits import EditScript, changed_span
+
+
+def test_disjoint_passes_apply_in_one_join():
+    script = EditScript()
+    assert script.merge([(0, 3, 'ONE', 'a')])
+    assert script.merge([(4, 7, 'TWO', 'b')])
+    spans = []
+    assert script.apply('one two three', spans) == 'ONE TWO three'
+    assert spans == [(0, 3), (4, 7)]
+
+
+def test_edit_inside_earlier_edit_is_shadowed():
+    script = EditScript()
+    assert script.merge([(0, 7, 'X', 'a')])
+    assert script.merge([(2, 4, 'Y', 'b')])
+    assert script.shadowed == 1
+    assert script.apply('abcdefgh') == 'Xh'
+
+
+def test_partial_overlap_is_refused_without_changes():
+    script = EditScript()
+    assert script.merge([(0, 4, 'X', 'a')])
+    assert not script.merge([(6, 7, 'Z', 'b'), (3, 6, 'Y', 'b')])
+    assert len(script) == 1
+    assert script.conflicts == [('b', 'a', 3, 6)]
+
+
+def test_bytes_are_joined_as_bytes():
+    script = EditScript()
+    script.merge([(0, 1, b'B', 'a')])
+    assert script.apply(b'abc') == b'Bbc'
+
+
+def test_changed_span():
+    assert changed_span('abcdef', 'abXYef') == (2, 4)
+    assert changed_span('same', 'same') == (4, 4)
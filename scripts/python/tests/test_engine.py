@@ -0,0 +1,37 @@
+from console_migration.engine import CombinedReplacer, sequential_sub
+
+
+def test_top_level_alternation_matches_sequential():
+    table = [('foo|bar', 'X'), ('baz1', 'Y'), ('qux', 'Z')]
+    replacer = CombinedReplacer(table, name='alternation')
+    content = 'foo bar baz1 qux fbar'
+    assert replacer.sub(content) == sequential_sub(table, content) == 'X X Y Z fX'
+
+
+def test_rule_matching_inside_another_rule_stays_sequential():
+    table = [('1', 'Y'), (r'x\d+y', 'X')]
+    replacer = CombinedReplacer(table, name='nested')
+    assert not replacer.independent
+    assert replacer.sub('x1y') == sequential_sub(table, 'x1y') == 'xYy'
+
+
+def test_output_completing_a_later_rule_stays_sequential():
+    table = [('a', 'b'), ('bc', 'X')]
+    replacer = CombinedReplacer(table, name='output')
+    assert not replacer.independent
+    assert replacer.sub('ac') == 'X'
+
+
+def test_deletion_before_later_rules_stays_sequential():
+    table = [('-', ''), ('xy', 'Z')]
+    replacer = CombinedReplacer(table, name='deletion')
+    assert not replacer.independent
+    assert replacer.sub('x-y') == 'Z'
+
+
+def test_disjoint_literal_rules_are_combined():
+    table = [(r'console\.log\(1\);', 'A'), (r'console\.warn\(2\);', 'B')]
+    replacer = CombinedReplacer(table, name='literals')
+    content = 'console.log(1); console.warn(2); console.log(1);'
+    assert replacer.independent
+    assert replacer.sub(content) == sequential_sub(table, content) == 'A B A'
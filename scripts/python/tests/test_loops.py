@@ -0,0 +1,63 @@
+import pytest
+
+from console_migration.loops import LoopLogRules, aggregate_loop_logs, find_loops
+
+EVICTION = """class ContextCacheService {
+  evict(entries) {
+    for (const item of entries) {
+      cache.delete(item.key);
+      logger.info('Éviction prédictive', {
+        metadata: {
+          service: 'ContextCacheService',
+          cacheKey: item.key
+        }
+      });
+    }
+  }
+}
+"""
+
+
+def test_loop_log_becomes_counter_sample_and_summary():
+    migrated, count = aggregate_loop_logs(EVICTION)
+    assert count == 1
+    assert 'let evictionPredictiveCount = 0;' in migrated
+    assert 'const evictionPredictiveSample: Array<Record<string, unknown>> = [];' in migrated
+    assert ('if (evictionPredictiveSample.length < 5) '
+            'evictionPredictiveSample.push({ cacheKey: item.key });') in migrated
+    # Récapitulatif unique dans le finally, clés constantes conservées
+    summary = migrated[migrated.index('} finally {'):]
+    assert "logger.info('Éviction prédictive'" in summary
+    assert "service: 'ContextCacheService'" in summary
+    assert 'count: evictionPredictiveCount' in summary
+    assert migrated.count('logger.info(') == 1
+
+
+def test_aggregation_is_stable():
+    migrated = aggregate_loop_logs(EVICTION)[0]
+    assert aggregate_loop_logs(migrated) == (migrated, 0)
+
+
+def test_untyped_declarations_for_javascript():
+    migrated = LoopLogRules('client/cache.js').apply(EVICTION)
+    assert 'const evictionPredictiveSample = [];' in migrated
+
+
+@pytest.mark.parametrize('body', [
+    # warn par élément : incident à part entière
+    "logger.warn('Entrée expirée', { metadata: { key: item.key } });",
+    # Autre log dans la boucle : l'ordre des logs changerait
+    "logger.info('A', { metadata: { key: item.key } });\n      logger.error('B');",
+    # Message non constant
+    "logger.info(`Clé ${item.key}`, { metadata: {} });",
+    # Sortie anticipée de la boucle
+    "if (!item) return;\n      logger.info('Entrée', { metadata: { key: item.key } });",
+])
+def test_loops_left_untouched(body):
+    source = f"function run(entries) {{\n  for (const item of entries) {{\n      {body}\n  }}\n}}\n"
+    assert aggregate_loop_logs(source) == (source, 0)
+
+
+def test_find_loops_kinds():
+    source = "for (const a of b) { x(); }\nitems.forEach((item) => { y(item); });\nitems.map((i) => { z(i); });\n"
+    assert [loop.kind for loop in find_loops(source)] == ['for', 'forEach', 'map']
@@ -0,0 +1,26 @@
+import io
+import os
+import sys
+
+import pytest
+
+from migrate_repository import main, parse_args
+
+
+@pytest.mark.parametrize('argv', [['--bytes', '--rule-timeout', '1'], ['--bytes', '--profile', '5']])
+def test_bytes_rejected_where_rules_run_one_by_one(argv, capsys):
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+    assert '--bytes' in capsys.readouterr().err
+
+
+def test_bytes_accepted_with_watch():
+    assert parse_args(['--bytes', '--watch']).bytes
+
+
+def test_stdin_filter_writes_no_artifact(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BytesIO(b"console.log('x');\n")))
+    monkeypatch.setattr(sys, 'stdout', io.TextIOWrapper(io.BytesIO()))
+    assert main(['--root', str(tmp_path), '--stdin', 'server/unknown.ts',
+                 '--edits', str(tmp_path / 'edits.ndjson')]) == 0
+    assert os.listdir(tmp_path) == ['edits.ndjson']
@@ -0,0 +1,41 @@
+import pytest
+
+from console_migration.engine import CombinedReplacer, sequential_sub
+from console_migration.prefilter import LiteralIndex, literal_text, required_literals
+
+
+@pytest.mark.parametrize('pattern, literals', [
+    (r"log\(\x27hello world\x27\)", ["log('hello world')"]),
+    (r'été', ['été']),
+    (r'\N{BULLET} item', ['• item']),
+    (r'\101BC', ['ABC']),
+    (r'ab?c', ['a', 'c']),
+    (r'x(ab)+y', ['x', 'ab', 'y']),
+    (r'^\s*console\.log\(', ['console.log(']),
+])
+def test_required_literals_read_escapes(pattern, literals):
+    assert required_literals(pattern) == literals
+
+
+@pytest.mark.parametrize('pattern, flags', [('a|b', 0), ('(?i)abc', 0), ('abc', 2)])
+def test_unreliable_patterns_have_no_literal(pattern, flags):
+    assert required_literals(pattern, flags) == []
+
+
+def test_literal_text_only_for_pure_literals():
+    assert literal_text(r'console\.log\(\x27x\x27\)') == "console.log('x')"
+    assert literal_text(r'console\.log\(\w+\)') is None
+
+
+def test_escaped_rule_is_not_skipped():
+    table = [(r"log\(\x27hello world\x27\)", 'X'), ('unrelated', 'Y')]
+    replacer = CombinedReplacer(table, name='escaped')
+    content = "log('hello world')"
+    assert replacer.independent
+    assert replacer.sub(content) == sequential_sub(table, content) == 'X'
+
+
+def test_candidate_rules_follow_present_literals():
+    index = LiteralIndex([r'console\.log\(1\)', r'console\.warn\(2\)', r'\w+'])
+    assert index.candidate_rules('console.warn(2)') == [1, 2]
+    assert index.candidate_rules('nothing') == [2]
@@ -0,0 +1,17 @@
+from console_migration.registry import PatternRegistry
+
+
+def test_pattern_is_compiled_once_per_source_and_flags():
+    registry = PatternRegistry()
+    first = registry.compile(r'console\.log', label='log')
+    assert registry.compile(r'console\.log', label='other') is first
+    assert registry.compile(r'console\.log', 2) is not first
+    assert len(registry) == 2
+    assert registry.labels[(r'console\.log', 0)] == 'log'
+
+
+def test_timings_cover_every_compiled_pattern():
+    registry = PatternRegistry()
+    registry.compile('a+', label='a')
+    registry.compile('b+')
+    assert sorted(row[2] for row in registry.timings()) == ['a+', 'b+']
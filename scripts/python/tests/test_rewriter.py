@@ -0,0 +1,33 @@
+from console_migration.edits import EditScript
+from console_migration.rewriter import rewrite_console_calls
+
+SERVICE_CLASS = """export class SQLEngineService {
+  run() {
+    console.log('[SQLEngine] Requête exécutée');
+    console.log('Terminé');
+  }
+}
+"""
+
+
+def test_tag_does_not_override_enclosing_class():
+    migrated, count = rewrite_console_calls(SERVICE_CLASS, 'sqlEngine')
+    assert count == 2
+    assert migrated.count("service: 'SQLEngineService'") == 2
+    assert "tag: 'SQLEngine'" in migrated
+    assert "logger.info('Requête exécutée'" in migrated
+
+
+def test_conflicting_merge_falls_back_to_sequential(monkeypatch):
+    expected = rewrite_console_calls(SERVICE_CLASS, 'sqlEngine')
+    monkeypatch.setattr(EditScript, 'merge', lambda self, edits: False)
+    assert rewrite_console_calls(SERVICE_CLASS, 'sqlEngine') == expected
+
+
+def test_service_falls_back_to_file_outside_classes():
+    source = "function f() {\n  console.warn('[Cache] vide', n);\n}\n"
+    migrated, count = rewrite_console_calls(source, 'cacheStore')
+    assert count == 1
+    assert "service: 'cacheStore'" in migrated
+    assert "tag: 'Cache'" in migrated
+    assert "operation: 'f'" in migrated
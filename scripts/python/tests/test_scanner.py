@@ -0,0 +1,57 @@
+import pytest
+
+from console_migration.scanner import (
+    ScanError, _previous_significant, find_console_calls, mask_literals, split_template,
+)
+
+
+def test_calls_inside_literals_and_comments_are_ignored():
+    source = """const a = "console.log('x')";
+// console.log('commentaire')
+const b = `${x} console.warn(1)`;
+const re = /console.error\\(/;
+this.console.log('membre');
+console.info('réel', a, b);
+"""
+    calls = find_console_calls(source)
+    assert [call.level for call in calls] == ['info']
+    assert calls[0].arg_sources(source) == ["'réel'", 'a', 'b']
+    assert calls[0].semicolon
+
+
+def test_nested_arguments_are_split_on_top_level_commas():
+    source = "console.log(f(a, b), { c: [1, 2] }, 'd,e')"
+    (call,) = find_console_calls(source)
+    assert call.arg_sources(source) == ['f(a, b)', '{ c: [1, 2] }', "'d,e'"]
+    assert not call.semicolon
+    assert call.end == len(source)
+
+
+def test_division_is_not_a_regex():
+    source = "const r = a / b; console.log(r / 2)"
+    (call,) = find_console_calls(source)
+    assert call.arg_sources(source) == ['r / 2']
+
+
+def test_unclosed_call_raises():
+    with pytest.raises(ScanError):
+        find_console_calls("console.log('ouvert'")
+
+
+def test_mask_literals_keeps_positions():
+    source = "f('a\\'b', `x\n${y}`) // c"
+    masked = mask_literals(source)
+    assert len(masked) == len(source)
+    assert masked.count('\n') == source.count('\n')
+    assert 'a' not in masked and 'c' not in masked
+
+
+def test_split_template():
+    chunks, expressions = split_template('`a${b}c${d(e)}`')
+    assert chunks == ['a', 'c', '']
+    assert expressions == [(4, 5), (9, 13)]
+
+
+def test_previous_significant_returns_an_index():
+    assert _previous_significant('a = \n /', 6) == 2
+    assert _previous_significant('  /', 2) == -1
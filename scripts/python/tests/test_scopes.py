@@ -0,0 +1,65 @@
+from console_migration.scopes import ScopeIndex
+
+SOURCE = """export class QueryService {
+  private cache = new Map<string, { rows: number }>();
+
+  async run(sql: string): Promise<void> {
+    const label = '}';
+    const helper = (row) => {
+      console.log(row);
+    };
+    rows.forEach(function each(row) {
+      console.log(row);
+    });
+  }
+}
+
+function standalone() {
+  console.log('libre');
+}
+
+const arrow = async (value: number) => {
+  console.log(value);
+};
+"""
+
+
+def at(text):
+    return SOURCE.index(text)
+
+
+def test_class_and_method_at_position():
+    scopes = ScopeIndex(SOURCE)
+    assert scopes.class_at(at("const label")) == 'QueryService'
+    assert scopes.operation_at(at("const label")) == 'run'
+
+
+def test_nested_functions_are_lifted_to_the_class_member():
+    scopes = ScopeIndex(SOURCE)
+    assert scopes.enclosing(at('console.log(row)')) == 'helper'
+    assert scopes.operation_at(at('console.log(row)')) == 'run'
+    assert scopes.operation_at(SOURCE.rindex('console.log(row)')) == 'run'
+
+
+def test_functions_outside_classes():
+    scopes = ScopeIndex(SOURCE)
+    assert scopes.class_at(at("console.log('libre')")) is None
+    assert scopes.operation_at(at("console.log('libre')")) == 'standalone'
+    assert scopes.operation_at(at('console.log(value)')) == 'arrow'
+    assert scopes.operation_at(0) is None
+
+
+def test_unbalanced_braces_fall_back_to_indentation():
+    source = """class Broken {
+  first() {
+    console.log('a');
+  });
+
+  second() {
+    console.log('b');
+  }
+}
+"""
+    scopes = ScopeIndex(source)
+    assert scopes.operation_at(source.index("console.log('b')")) == 'second'
+    assert scopes.class_at(source.index("console.log('b')")) == 'Broken'
@@ -0,0 +1,52 @@
+import io
+import json
+
+from console_migration.rules import RuleSet
+from console_migration.stream import filter_stream, text_edits
+
+BUFFER = "const a = 1;\nconsole.log('é');\nconst b = 2;\n"
+
+
+def rule_sets():
+    return [RuleSet('svc', 'a.ts', [([(r"console\.log\('é'\);", "logger.info('é');")], 0)])]
+
+
+def run(data, edits=True):
+    sink = io.BytesIO()
+    edits_sink = io.StringIO() if edits else None
+    summary = filter_stream(io.BytesIO(data), sink, 'a.ts', rule_sets(), edits_sink)
+    records = [json.loads(line) for line in edits_sink.getvalue().splitlines()] if edits else None
+    return sink.getvalue(), summary, records
+
+
+def test_buffer_is_migrated_and_edits_described_as_ndjson():
+    output, summary, records = run(BUFFER.encode('utf-8'))
+    assert output.decode('utf-8') == BUFFER.replace("console.log('é');", "logger.info('é');")
+    assert summary['changed'] and summary['edits'] == 1
+    edit, last = records
+    assert edit == {'type': 'edit', 'offset': 13, 'length': 18, 'line': 2,
+                    'replacement': "logger.info('é');\n"}
+    assert last['type'] == 'summary'
+    assert (last['console_before'], last['console_after']) == (1, 0)
+
+
+def test_edits_replay_to_the_migrated_buffer():
+    after = BUFFER.replace('const a = 1;', 'let a = 1;').replace('const b', 'let b')
+    migrated = BUFFER
+    for edit in reversed(text_edits(BUFFER, after)):
+        start = edit['offset']
+        migrated = migrated[:start] + edit['replacement'] + migrated[start + edit['length']:]
+    assert migrated == after
+
+
+def test_undecodable_buffer_is_returned_unchanged():
+    data = b"console.log('\xff');\n"
+    output, summary, records = run(data)
+    assert output == data
+    assert summary['errors'] and not summary['changed']
+    assert [record['type'] for record in records] == ['summary']
+
+
+def test_no_edits_channel_by_default():
+    output, summary, records = run(BUFFER.encode('utf-8'), edits=False)
+    assert summary['edits'] == 0 and summary['changed']
@@ -0,0 +1,45 @@
+import pytest
+
+from console_migration.walker import IgnoreMatcher, filter_paths, parse_ignore, walk_files
+
+
+def matcher(*lines):
+    return IgnoreMatcher(parse_ignore(lines))
+
+
+@pytest.mark.parametrize('lines, path, is_dir, expected', [
+    (['*.log'], 'a/b/debug.log', False, True),
+    (['/build'], 'build', True, True),
+    (['/build'], 'src/build', True, None),
+    (['logs/'], 'logs', False, None),
+    (['logs/'], 'src/logs', True, True),
+    (['a/**/z.ts'], 'a/z.ts', False, True),
+    (['a/**/z.ts'], 'a/b/c/z.ts', False, True),
+    (['tmp/**'], 'tmp/x/y', False, True),
+    (['file?.ts'], 'file1.ts', False, True),
+    (['file[!0-9].ts'], 'file1.ts', False, None),
+    (['*.ts', '!keep.ts'], 'src/keep.ts', False, False),
+    (['!keep.ts', '*.ts'], 'src/keep.ts', False, True),
+    (['\\#hash'], '#hash', False, True),
+    (['# commentaire', ''], 'commentaire', False, None),
+])
+def test_last_matching_pattern_decides(lines, path, is_dir, expected):
+    assert matcher(*lines).decide(path, is_dir) is expected
+
+
+def test_walk_prunes_excluded_dirs_and_applies_nested_gitignore(tmp_path):
+    for path in ['server/a.ts', 'server/b.js', 'server/gen/x.ts', 'server/gen/keep.ts',
+                 'server/node_modules/dep/index.ts', 'coverage/lcov.ts', 'ignored/c.ts',
+                 '.cursor.backup.1/d.ts']:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text('', encoding='utf-8')
+    (tmp_path / '.gitignore').write_text('ignored/\n', encoding='utf-8')
+    (tmp_path / 'server' / 'gen' / '.gitignore').write_text('*.ts\n!keep.ts\n', encoding='utf-8')
+
+    assert walk_files(str(tmp_path), extensions=('.ts',)) == ['server/a.ts', 'server/gen/keep.ts']
+    assert walk_files(str(tmp_path), dirs=('ignored',)) == []
+
+
+def test_filter_paths_excludes_children_of_ignored_dirs():
+    paths = ['node_modules/x/a.ts', 'src/a.ts', 'src/dist/b.ts', 'src/b.log']
+    assert filter_paths(paths, matcher('node_modules/', 'dist/', '*.log')) == ['src/a.ts']
@@ -0,0 +1,62 @@
+import sys
+
+import pytest
+
+from console_migration.rewriter import GenericRules
+from console_migration.watch import InotifyWatcher, watch
+
+SOURCE = "export function run() {\n  console.log('Démarrage');\n}\n"
+
+
+class _Bursts:
+    """Watcher factice : une rafale par appel bloquant, rien pendant le délai de calme"""
+
+    def __init__(self, *bursts):
+        self.bursts = list(bursts)
+
+    def wait(self, timeout=None):
+        if timeout is not None or not self.bursts:
+            return set()
+        return set(self.bursts.pop(0))
+
+
+def _write(root, path, content=SOURCE):
+    full = root / path
+    full.parent.mkdir(parents=True, exist_ok=True)
+    full.write_text(content, encoding='utf-8')
+
+
+@pytest.mark.parametrize('byte_mode', [False, True])
+def test_saved_file_is_migrated(tmp_path, byte_mode):
+    _write(tmp_path, 'server/services/a.ts')
+    results = watch(_Bursts(['server/services/a.ts']), lambda path: [GenericRules(path)],
+                    root=str(tmp_path), byte_mode=byte_mode)
+    result = next(results)
+    assert result['changed']
+    assert 'logger.info' in (tmp_path / 'server/services/a.ts').read_text(encoding='utf-8')
+
+
+def test_unreadable_path_is_reported_and_skipped(tmp_path):
+    _write(tmp_path, 'server/services/b.ts')
+    (tmp_path / 'server/services/dir.ts').mkdir()
+    results = watch(_Bursts(['server/services/dir.ts', 'server/services/b.ts']),
+                    lambda path: [GenericRules(path)], root=str(tmp_path))
+    first, second = next(results), next(results)
+    assert first['path'] == 'server/services/b.ts' and first['changed']
+    assert second['path'] == 'server/services/dir.ts'
+    assert 'IsADirectoryError' in second['errors'][0]
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify : Linux seulement')
+def test_inotify_applies_ignore_rules(tmp_path):
+    (tmp_path / '.gitignore').write_text('server/generated/\n*.gen.ts\n', encoding='utf-8')
+    (tmp_path / 'server/generated').mkdir(parents=True)
+    (tmp_path / 'server/services').mkdir(parents=True)
+    watcher = InotifyWatcher(str(tmp_path))
+    try:
+        assert 'server/generated' not in {directory for directory, _ in watcher._watches.values()}
+        for path in ('server/generated/a.ts', 'server/services/b.ts', 'server/services/c.gen.ts'):
+            _write(tmp_path, path)
+        assert watcher.wait(1) == {'server/services/b.ts'}
+    finally:
+        watcher.close()
@@ -0,0 +1,29 @@
+from console_migration.rules import RuleSet
+from console_migration.watchdog import run_guarded
+
+CATASTROPHIC = 'b\n' + 'a' * 40 + '!\nconsole.log(1);\n'
+CLEAN = "console.log('ok');\n"
+
+
+def write(tmp_path, name, content):
+    (tmp_path / name).write_text(content, encoding='utf-8')
+    return name
+
+
+def test_overrunning_rule_is_killed_and_reported(tmp_path):
+    slow = write(tmp_path, 'slow.ts', CATASTROPHIC)
+    fast = write(tmp_path, 'tail.ts', CLEAN)
+    rule_sets = [
+        RuleSet('slow', slow, [([('(a+)+b', 'x')], 0)]),
+        RuleSet('fast', fast, [([(r"console\.log\('ok'\);", "logger.info('ok');")], 0)]),
+    ]
+    results = {result['path']: result
+               for result in run_guarded([slow, fast], rule_sets, root=str(tmp_path),
+                                         jobs=1, budget=0.3)}
+
+    assert results['slow.ts']['timeout']['rule'].startswith('slow')
+    assert results['slow.ts']['errors'] and not results['slow.ts']['changed']
+    assert (tmp_path / 'slow.ts').read_text(encoding='utf-8') == CATASTROPHIC
+    # Ouvrier unique relancé : le fichier suivant (tail.ts) est migré normalement
+    assert results['tail.ts']['changed']
+    assert (tmp_path / 'tail.ts').read_text(encoding='utf-8') == "logger.info('ok');\n"